@@ -12,6 +12,7 @@ from services.shared.base_service import BaseService, LATENCY, log_startup
 from services.shared.prompt_manager import PromptManager
 from services.shared.llm_tracker import LLMTracker
 from services.shared.llm_client import create_llm_client
+from tool_engine import ToolGraph
 
 # Initialize base service
 service = BaseService("agent-svc", "1.0.0")
@@ -27,6 +28,9 @@ llm_client = create_llm_client("agent-svc")
 
 KNOWLEDGE_ENGINE_TIMEOUT = 12.0
 
+# Reused across requests and tool threads so knowledge-engine calls keep their connections alive
+knowledge_client = httpx.Client(timeout=KNOWLEDGE_ENGINE_TIMEOUT)
+
 
 def _post_knowledge_engine(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """Helper to call the knowledge engine service."""
@@ -35,7 +39,7 @@ def _post_knowledge_engine(path: str, payload: Dict[str, Any]) -> Dict[str, Any]
 
     url = f"{KNOWLEDGE_SERVICE_URL}{path}"
     try:
-        response = httpx.post(url, json=payload, timeout=KNOWLEDGE_ENGINE_TIMEOUT)
+        response = knowledge_client.post(url, json=payload)
         response.raise_for_status()
         return response.json()
     except httpx.HTTPStatusError as exc:
@@ -52,6 +56,7 @@ def _post_knowledge_engine(path: str, payload: Dict[str, Any]) -> Dict[str, Any]
 async def lifespan(app):
     log_startup("agent-svc")
     yield
+    knowledge_client.close()
 
 # Set lifespan for the app
 app.router.lifespan_context = lifespan
@@ -111,26 +116,53 @@ def tool_crew_details(flight_no: str, date: str) -> List[Dict[str, Any]]:
         service.log_error(exc, "tool_crew_details")
         return []
 
+def tool_flight_context(flight_no: str, date: str) -> Dict[str, Any]:
+    """Flight, impact, crew details and passenger profiles in one knowledge-engine round trip."""
+    try:
+        context = _post_knowledge_engine(
+            "/tools/flight_context",
+            {"flight_no": flight_no, "date": date},
+        )
+    except Exception as exc:
+        # Fall back to the per-tool endpoints (e.g. an older knowledge-engine build)
+        service.log_error(exc, "tool_flight_context")
+        return {
+            "flight": tool_flight_lookup(flight_no, date),
+            "impact": tool_impact_assessor(flight_no, date),
+            "crew_details": tool_crew_details(flight_no, date),
+            "passenger_profiles": get_passenger_profiles(flight_no, date),
+        }
+
+    return {
+        "flight": context.get("flight") or {},
+        "impact": context["impact"],
+        "crew_details": context.get("crew_details") or [],
+        "passenger_profiles": build_passenger_profiles(context.get("passenger_profiles") or []),
+    }
+
 def tool_advanced_rebooking_optimizer(flight_no: str, date: str) -> List[Dict[str, Any]]:
     """Advanced rebooking optimization with LLM-powered analysis."""
-    # Get passenger count and connection details
-    impact = tool_impact_assessor(flight_no, date)
+    context = tool_flight_context(flight_no, date)
+    return rank_rebooking_options(
+        flight_no, date, context["flight"], context["impact"], context["passenger_profiles"]
+    )
+
+def rank_rebooking_options(flight_no: str, date: str, flight: Dict[str, Any], impact: Dict[str, Any],
+                           passenger_profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build and rank rebooking options from already fetched flight, impact and passenger data."""
     pax_count = impact.get("passengers", 0)
     connecting_pax = impact.get("connecting_passengers", 0)
-    
-    # Get flight details to determine route type
-    flight = tool_flight_lookup(flight_no, date)
     origin = flight.get("origin", "")
     destination = flight.get("destination", "")
     
-    # Get passenger preferences and loyalty data (mock)
-    passenger_profiles = get_passenger_profiles(flight_no, date)
-    
     # Determine if domestic or international
     is_domestic = origin in ["AKL", "WLG", "CHC"] and destination in ["AKL", "WLG", "CHC"]
     
     # Generate base options
-    options = generate_base_rebooking_options(flight_no, date, pax_count, connecting_pax, is_domestic)
+    options = generate_base_rebooking_options(
+        flight_no, date, pax_count, connecting_pax, is_domestic,
+        passenger_profiles=passenger_profiles, flight=flight,
+    )
     
     # Use LLM to optimize and rank options
     optimized_options = optimize_rebooking_with_llm(options, passenger_profiles, flight, impact)
@@ -148,6 +180,10 @@ def get_passenger_profiles(flight_no: str, date: str) -> List[Dict[str, Any]]:
         service.log_error(exc, "get_passenger_profiles")
         raw_profiles = []
 
+    return build_passenger_profiles(raw_profiles)
+
+def build_passenger_profiles(raw_profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Derive loyalty tier, preferences and needs from booking records (mock rules)"""
     profiles = []
     for record in raw_profiles:
         name = record.get("passenger_name") or record.get("name", "Unknown")
@@ -165,8 +201,10 @@ def get_passenger_profiles(flight_no: str, date: str) -> List[Dict[str, Any]]:
 
     return profiles
 
-def generate_base_rebooking_options(flight_no: str, date: str, pax_count: int, connecting_pax: int, is_domestic: bool) -> List[Dict[str, Any]]:
-    """Generate base rebooking options"""
+def generate_base_rebooking_options(flight_no: str, date: str, pax_count: int, connecting_pax: int, is_domestic: bool,
+                                    passenger_profiles: Optional[List[Dict[str, Any]]] = None,
+                                    flight: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Generate base rebooking options; profiles and flight are fetched only if not supplied"""
     options = []
     
     # Option 1: Next available flight
@@ -243,7 +281,9 @@ def generate_base_rebooking_options(flight_no: str, date: str, pax_count: int, c
         })
     
     # Option 4: Premium rebooking (for high-value passengers)
-    vip_passengers = len([p for p in get_passenger_profiles(flight_no, date) if p["loyalty_tier"] in ["Gold", "Platinum"]])
+    if passenger_profiles is None:
+        passenger_profiles = get_passenger_profiles(flight_no, date)
+    vip_passengers = len([p for p in passenger_profiles if p["loyalty_tier"] in ["Gold", "Platinum"]])
     if vip_passengers > 0:
         options.append({
             "plan": f"Premium rebooking for {vip_passengers} VIP passengers + standard rebooking for others",
@@ -258,7 +298,7 @@ def generate_base_rebooking_options(flight_no: str, date: str, pax_count: int, c
     # Option 5: Alternative routing
     # Get flight details to determine origin and destination
     try:
-        flight_details = tool_flight_lookup(flight_no, date)
+        flight_details = flight if flight is not None else tool_flight_lookup(flight_no, date)
         origin = flight_details.get("origin", "AKL")
         destination = flight_details.get("destination", "SYD")
     except:
@@ -433,7 +473,7 @@ def ensure_grounded(citations: List[str]) -> bool:
     return len(citations) > 0
 
 @app.post("/analyze-disruption")
-def analyze_disruption(body: Ask, request: Request):
+async def analyze_disruption(body: Ask, request: Request):
     with LATENCY.labels("agent-svc","/analyze-disruption","POST").time():
         try:
             print(f"DEBUG: /analyze-disruption endpoint called with question: {body.question}")
@@ -441,13 +481,26 @@ def analyze_disruption(body: Ask, request: Request):
             fno = body.flight_no
             date = body.date
 
-            flight = tool_flight_lookup(fno, date)
-            impact = tool_impact_assessor(fno, date)
-            crew_details = tool_crew_details(fno, date)
-            print(f"DEBUG: About to call tool_advanced_rebooking_optimizer")
-            options = tool_advanced_rebooking_optimizer(fno, date)
-            print(f"DEBUG: tool_advanced_rebooking_optimizer returned {len(options)} options")
-            policy = tool_policy_grounder(q + " policy rebooking compensation customer communication")
+            # Lookups run concurrently; rebooking waits only for the data it needs
+            tools = ToolGraph("agent-svc")
+            tools.add("flight_context", tool_flight_context, fno, date)
+            tools.add("policy", tool_policy_grounder, q + " policy rebooking compensation customer communication")
+            tools.add(
+                "options",
+                lambda flight_context: rank_rebooking_options(
+                    fno, date, flight_context["flight"], flight_context["impact"], flight_context["passenger_profiles"]
+                ),
+                deps=("flight_context",),
+            )
+            started = time.perf_counter()
+            results = await tools.run()
+
+            flight = results["flight_context"]["flight"]
+            impact = results["flight_context"]["impact"]
+            crew_details = results["flight_context"]["crew_details"]
+            options = results["options"]
+            policy = results["policy"]
+            print(f"DEBUG: rank_rebooking_options returned {len(options)} options")
 
             if not ensure_grounded(policy.get("citations", [])):
                 raise HTTPException(status_code=400, detail="Unable to verify policy grounding for this question.")
@@ -466,7 +519,11 @@ def analyze_disruption(body: Ask, request: Request):
                         "options_summary": options_summary,
                         "citations": policy.get("citations", [])
                     },
-                    "tools_payload": payload}
+                    "tools_payload": payload,
+                    "metadata": {
+                        **tools.metadata(),
+                        "tools_total_ms": round((time.perf_counter() - started) * 1000, 1),
+                    }}
             
             # Extract LLM message from options if present
             print(f"DEBUG: Checking {len(options)} options for LLM message")
@@ -556,9 +613,12 @@ def draft_comms(body: Ask, request: Request):
         fno = body.flight_no
         date = body.date
         print(f"DEBUG: draft_comms called with flight_no={fno}, date={date}, question={q}")
-        impact = tool_impact_assessor(fno, date)
-        crew_details = tool_crew_details(fno, date)
-        options = tool_advanced_rebooking_optimizer(fno, date)
+        flight_context = tool_flight_context(fno, date)
+        impact = flight_context["impact"]
+        crew_details = flight_context["crew_details"]
+        options = rank_rebooking_options(
+            fno, date, flight_context["flight"], impact, flight_context["passenger_profiles"]
+        )
         policy = tool_policy_grounder(q)
         print(f"DEBUG: Policy grounding result: {policy}")
         # Temporarily disable policy grounding for debugging
@@ -0,0 +1,104 @@
+"""
+Per-request tool execution graph for agent-svc.
+
+Tools are registered as nodes with the nodes they depend on; ``run`` starts
+every node as soon as its dependencies have finished, so independent tools
+run concurrently. Identical calls (same function and arguments) within one
+graph are executed once and shared. Synchronous tools run in worker threads.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from services.shared.base_service import TOOL_DEDUPLICATED, TOOL_LATENCY
+
+
+class ToolGraph:
+    """Dependency graph of tool calls for a single request."""
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self._nodes: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...], Tuple[str, ...]]] = {}
+        self._calls: Dict[Tuple[Any, ...], "asyncio.Future[Any]"] = {}
+        self.timings_ms: Dict[str, float] = {}
+        self.deduplicated: List[str] = []
+
+    def add(self, name: str, func: Callable[..., Any], *args: Any, deps: Sequence[str] = ()) -> None:
+        """Register node ``name``; results of ``deps`` are passed to ``func`` as keyword arguments."""
+        if name in self._nodes:
+            raise ValueError(f"Tool node '{name}' is already registered")
+        self._nodes[name] = (func, args, tuple(deps))
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Tool dependency cycle: {' -> '.join(path + (name,))}")
+            if name not in self._nodes:
+                raise ValueError(f"Unknown tool dependency '{name}' (required by '{path[-1]}')")
+            state[name] = "visiting"
+            for dep in self._nodes[name][2]:
+                visit(dep, path + (name,))
+            state[name] = "done"
+            order.append(name)
+
+        for name in self._nodes:
+            visit(name, ())
+        return order
+
+    async def _invoke(self, name: str, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            return await asyncio.to_thread(func, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings_ms[name] = round(elapsed * 1000, 1)
+            TOOL_LATENCY.labels(self.service_name, name).observe(elapsed)
+
+    async def call(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` once per graph; identical calls share the first result."""
+        key = (func, args)
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._invoke(name, func, args, {}))
+            self._calls[key] = future
+        else:
+            self.deduplicated.append(name)
+            TOOL_DEDUPLICATED.labels(self.service_name, name).inc()
+        return await asyncio.shield(future)
+
+    async def run(self) -> Dict[str, Any]:
+        """Execute all nodes and return their results keyed by node name."""
+        order = self._topological_order()
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+
+        async def run_node(name: str) -> Any:
+            func, args, deps = self._nodes[name]
+            if not deps:
+                return await self.call(name, func, *args)
+            dep_results = {dep: await tasks[dep] for dep in deps}
+            return await self._invoke(name, func, args, dep_results)
+
+        for name in order:
+            tasks[name] = asyncio.ensure_future(run_node(name))
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return dict(zip(tasks, results))
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "tool_latency_ms": dict(self.timings_ms),
+            "deduplicated_calls": list(self.deduplicated),
+        }
@@ -0,0 +1,253 @@
+"""
+In-memory crew availability index for replacement search.
+
+Crew records are bucketed by role, base and qualification so candidates are
+pruned with set intersections before any legality evaluation. Per-day sector
+counts are loaded with one query per date and then evaluated in memory with
+the same duty model as check_crew_legality. The index is refreshed
+incrementally via /index/crew (gateway notifies it on crew_roster,
+crew_details and flights changes) and fully after CREW_INDEX_TTL seconds, so
+writes that bypass the gateway are picked up as well.
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from duty_engine import duty_summary, fetch_day_flights, legality_from_duty
+
+DEFAULT_BASE = "AKL"  # Mock - crew_details has no home base column yet
+MAX_CACHED_DAYS = 14
+
+
+@dataclass
+class CrewRecord:
+    crew_id: str
+    name: Optional[str]
+    roles: Set[str]
+    max_duty_hours: Optional[float]
+    duty_start_time: Optional[str]
+    qualifications: List[str]
+    base: str = DEFAULT_BASE
+
+
+@dataclass
+class _DayCounts:
+    sectors: Counter
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def fetch_crew_records(cur, crew_ids: Optional[Sequence[str]] = None) -> List[Tuple[Any, ...]]:
+    """Rostered crew with all roles they fly: (crew_id, name, max_duty_hours, duty_start_time, roles)."""
+    query = """
+        SELECT cd.crew_id, cd.crew_name, cd.max_duty_hours, cd.duty_start_time, array_agg(DISTINCT cr.crew_role)
+        FROM crew_details cd
+        JOIN crew_roster cr ON cd.crew_id = cr.crew_id
+    """
+    params: List[Any] = []
+    if crew_ids is not None:
+        query += " WHERE cd.crew_id = ANY(%s)"
+        params.append(list(crew_ids))
+    cur.execute(query + " GROUP BY cd.crew_id", params)
+    return cur.fetchall()
+
+
+class CrewIndex:
+    """Thread-safe crew index keyed by role, base and qualification."""
+
+    def __init__(
+        self,
+        connection: Callable[[], Any],
+        qualifications: Callable[[str], List[str]],
+        ttl_seconds: float = 300.0,
+    ) -> None:
+        self._connection = connection
+        self._qualifications = qualifications
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._crew: Dict[str, CrewRecord] = {}
+        self._by_role: Dict[str, Set[str]] = {}
+        self._by_base: Dict[str, Set[str]] = {}
+        self._by_qualification: Dict[str, Set[str]] = {}
+        self._days: Dict[date, _DayCounts] = {}
+        self._loaded_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _add_locked(self, record: CrewRecord) -> None:
+        self._remove_locked(record.crew_id)
+        self._crew[record.crew_id] = record
+        for role in record.roles:
+            self._by_role.setdefault(role, set()).add(record.crew_id)
+        self._by_base.setdefault(record.base, set()).add(record.crew_id)
+        for qualification in record.qualifications:
+            self._by_qualification.setdefault(qualification, set()).add(record.crew_id)
+
+    def _remove_locked(self, crew_id: str) -> None:
+        record = self._crew.pop(crew_id, None)
+        if record is None:
+            return
+        buckets = [(self._by_role, role) for role in record.roles]
+        buckets.append((self._by_base, record.base))
+        buckets.extend((self._by_qualification, qualification) for qualification in record.qualifications)
+        for index, key in buckets:
+            members = index.get(key)
+            if members is not None:
+                members.discard(crew_id)
+                if not members:
+                    del index[key]
+
+    def _record_from_row(self, row: Tuple[Any, ...]) -> CrewRecord:
+        crew_id, name, max_duty_hours, duty_start_time, roles = row
+        return CrewRecord(
+            crew_id=crew_id,
+            name=name,
+            roles={role for role in roles or [] if role},
+            max_duty_hours=max_duty_hours,
+            duty_start_time=duty_start_time,
+            qualifications=self._qualifications(crew_id),
+        )
+
+    def rebuild(self) -> None:
+        """Reload every crew record and drop cached day counts."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                rows = fetch_crew_records(cur)
+
+        fresh = CrewIndex(self._connection, self._qualifications, self.ttl_seconds)
+        for row in rows:
+            fresh._add_locked(fresh._record_from_row(row))
+
+        with self._lock:
+            self._crew = fresh._crew
+            self._by_role = fresh._by_role
+            self._by_base = fresh._by_base
+            self._by_qualification = fresh._by_qualification
+            self._days = {}
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, crew_ids: Iterable[str] = (), dates: Iterable[date] = ()) -> Dict[str, int]:
+        """Reload the given crew (records and cached sector counts) and drop cached days."""
+        crew_ids = list(dict.fromkeys(crew_ids))
+        with self._lock:
+            for day in dates:
+                self._days.pop(day, None)
+            cached_days = list(self._days)
+
+        if not crew_ids:
+            return {"crew": 0, "days": len(cached_days)}
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                rows = fetch_crew_records(cur, crew_ids)
+                day_rows = {day: fetch_day_flights(cur, day, crew_ids) for day in cached_days}
+
+        with self._lock:
+            for crew_id in crew_ids:
+                self._remove_locked(crew_id)
+            for row in rows:
+                self._add_locked(self._record_from_row(row))
+            for day, flights in day_rows.items():
+                counts = self._days.get(day)
+                if counts is None:
+                    continue
+                for crew_id in crew_ids:
+                    counts.sectors.pop(crew_id, None)
+                counts.sectors.update(row[0] for row in flights)
+        return {"crew": len(crew_ids), "days": len(cached_days)}
+
+    def _ensure_fresh(self) -> None:
+        with self._lock:
+            stale = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+        if stale:
+            self.rebuild()
+
+    def _sectors(self, flight_date: date) -> Counter:
+        with self._lock:
+            cached = self._days.get(flight_date)
+            if cached is not None and time.monotonic() - cached.loaded_at <= self.ttl_seconds:
+                return cached.sectors
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                flights = fetch_day_flights(cur, flight_date)
+        sectors = Counter(row[0] for row in flights)
+
+        with self._lock:
+            self._days[flight_date] = _DayCounts(sectors)
+            while len(self._days) > MAX_CACHED_DAYS:
+                oldest = min(self._days, key=lambda day: self._days[day].loaded_at)
+                del self._days[oldest]
+        return sectors
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def duty_info(self, crew_id: str, flight_date: date) -> Dict[str, Any]:
+        self._ensure_fresh()
+        sectors = self._sectors(flight_date)
+        with self._lock:
+            record = self._crew.get(crew_id)
+        max_duty_hours = record.max_duty_hours if record else None
+        duty_start_time = record.duty_start_time if record else None
+        return duty_summary(sectors.get(crew_id, 0), max_duty_hours, duty_start_time)
+
+    def legality(self, crew_id: str, flight_date: date) -> Dict[str, Any]:
+        return legality_from_duty(self.duty_info(crew_id, flight_date))
+
+    def candidates(
+        self,
+        role: str,
+        flight_date: date,
+        exclude: Iterable[str] = (),
+        any_qualification: Sequence[str] = (),
+        base: Optional[str] = None,
+        k: int = 5,
+    ) -> List[Tuple[CrewRecord, Dict[str, Any]]]:
+        """Top ``k`` legal crew for ``role``, ranked by (duty hours, -qualification count, name).
+
+        Crew are pruned by role, base and qualification buckets first; only
+        the survivors get a (purely in-memory) legality evaluation.
+        """
+        self._ensure_fresh()
+        sectors = self._sectors(flight_date)
+
+        with self._lock:
+            pool = set(self._by_role.get(role, ()))
+            if base is not None:
+                pool &= self._by_base.get(base, set())
+            if any_qualification:
+                qualified: Set[str] = set()
+                for qualification in any_qualification:
+                    qualified |= self._by_qualification.get(qualification, set())
+                pool &= qualified
+            pool -= set(exclude)
+            records = [self._crew[crew_id] for crew_id in pool]
+
+        ranked = []
+        for record in records:
+            duty_info = duty_summary(sectors.get(record.crew_id, 0), record.max_duty_hours, record.duty_start_time)
+            if not legality_from_duty(duty_info)["is_legal"]:
+                continue
+            # Same order as the previous sort over name-ordered rows; crew_id keeps ties deterministic
+            key = (duty_info["duty_hours"], -len(record.qualifications), record.name is None, record.name or "", record.crew_id)
+            ranked.append((key, record, duty_info))
+
+        return [(record, duty_info) for _key, record, duty_info in heapq.nsmallest(k, ranked, key=lambda item: item[0])]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "crew": len(self._crew),
+                "roles": {role: len(members) for role, members in self._by_role.items()},
+                "bases": {base: len(members) for base, members in self._by_base.items()},
+                "cached_days": sorted(day.isoformat() for day in self._days),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark crew availability: per-row (N+1) duty queries vs the set-based engine.
+
+With --dsn the synthetic roster is loaded into TEMP tables (which shadow the
+real crew_roster/crew_details/flights tables for this session only) and both
+approaches run real queries. Without a database the per-query round trip is
+modelled with --query-latency-ms and only the in-memory work is measured.
+
+    python duty_benchmark.py --sizes 1000 10000 100000
+    python duty_benchmark.py --dsn "host=localhost dbname=aeroops user=postgres" --sizes 1000 10000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from duty_engine import crew_availability, duty_summary, fetch_day_flights, fetch_rostered_crew
+
+BENCH_DATE = date(2025, 1, 17)
+ROLES = ["Captain", "First Officer", "Cabin Crew"]
+SECTORS_PER_CREW = 4
+
+
+def synthetic_data(roster_rows: int) -> Tuple[List[Tuple], List[Tuple], List[Tuple]]:
+    """Crew details, roster and flights with ``roster_rows`` roster entries (half on BENCH_DATE)."""
+    rng = random.Random(roster_rows)
+    crew_count = max(1, roster_rows // SECTORS_PER_CREW)
+    crew = [
+        (f"C{i:06d}", f"Crew {i}", "06:00", rng.choice([8, 10, 12, 14]))
+        for i in range(crew_count)
+    ]
+    flights = []
+    roster = []
+    for i in range(roster_rows):
+        flight_date = BENCH_DATE if i % 2 == 0 else BENCH_DATE - timedelta(days=1)
+        flight_no = f"NZ{i:06d}"
+        dep = datetime.combine(flight_date, datetime.min.time()) + timedelta(hours=rng.randint(5, 20))
+        flights.append((flight_no, flight_date, "AKL", "WLG", dep, dep + timedelta(hours=1)))
+        roster.append((flight_no, flight_date, crew[i % crew_count][0], ROLES[i % len(ROLES)]))
+    return crew, roster, flights
+
+
+def legacy_in_memory(crew, roster, flights) -> Tuple[List[Dict[str, Any]], int]:
+    """Previous algorithm: two lookups per roster row; returns results and query count."""
+    details = {c[0]: c for c in crew}
+    flights_by_key = {(f[0], f[1]): f for f in flights}
+    roster_by_crew: Dict[str, List[Tuple]] = {}
+    for row in roster:
+        roster_by_crew.setdefault(row[2], []).append(row)
+
+    results = []
+    queries = 1
+    for _flight_no, _flight_date, crew_id, role in roster:
+        queries += 2
+        day_flights = [
+            flights_by_key[(r[0], r[1])]
+            for r in roster_by_crew[crew_id]
+            if r[1] == BENCH_DATE and (r[0], r[1]) in flights_by_key
+        ]
+        detail = details[crew_id]
+        duty = duty_summary(len(day_flights), detail[3], None)
+        results.append({"crew_id": crew_id, "role": role, "duty_hours": duty["duty_hours"]})
+    return results, queries
+
+
+def bench_in_memory(sizes: List[int], latency_ms: float) -> None:
+    print(f"Modelled round trip: {latency_ms} ms/query (no database)")
+    print(f"{'rows':>8} {'legacy queries':>15} {'legacy ms':>11} {'engine queries':>15} {'engine ms':>10} {'speedup':>8}")
+    for size in sizes:
+        crew, roster, flights = synthetic_data(size)
+
+        start = time.perf_counter()
+        _, legacy_queries = legacy_in_memory(crew, roster, flights)
+        legacy_ms = (time.perf_counter() - start) * 1000 + legacy_queries * latency_ms
+
+        start = time.perf_counter()
+        crew_rows = [(c[0], c[1], ROLES[0], c[3], None) for c in crew]
+        flight_rows = [(r[2], None, None, "AKL", "WLG") for r in roster if r[1] == BENCH_DATE]
+        crew_availability(crew_rows, flight_rows, lambda crew_id: ["Basic"])
+        engine_ms = (time.perf_counter() - start) * 1000 + 2 * latency_ms
+
+        print(f"{size:>8} {legacy_queries:>15} {legacy_ms:>11.1f} {2:>15} {engine_ms:>10.1f} {legacy_ms / engine_ms:>7.1f}x")
+
+
+def bench_database(dsn: str, sizes: List[int], legacy_limit: int) -> None:
+    import psycopg
+
+    print(f"{'rows':>8} {'legacy ms':>11} {'engine ms':>10} {'speedup':>8}")
+    with psycopg.connect(dsn) as conn:
+        for size in sizes:
+            crew, roster, flights = synthetic_data(size)
+            with conn.cursor() as cur:
+                cur.execute("DROP TABLE IF EXISTS pg_temp.crew_details, pg_temp.crew_roster, pg_temp.flights")
+                cur.execute("CREATE TEMP TABLE crew_details (crew_id TEXT PRIMARY KEY, crew_name TEXT, duty_start_time TEXT, max_duty_hours INTEGER)")
+                cur.execute("CREATE TEMP TABLE crew_roster (flight_no TEXT, flight_date DATE, crew_id TEXT, crew_role TEXT)")
+                cur.execute("CREATE TEMP TABLE flights (flight_no TEXT, flight_date DATE, origin TEXT, destination TEXT, sched_dep_time TIMESTAMP, sched_arr_time TIMESTAMP)")
+                cur.executemany("INSERT INTO crew_details VALUES (%s, %s, %s, %s)", crew)
+                cur.executemany("INSERT INTO crew_roster VALUES (%s, %s, %s, %s)", roster)
+                cur.executemany("INSERT INTO flights VALUES (%s, %s, %s, %s, %s, %s)", flights)
+                cur.execute("CREATE INDEX ON crew_roster (crew_id, flight_date)")
+                cur.execute("CREATE INDEX ON flights (flight_no, flight_date)")
+                cur.execute("ANALYZE crew_details; ANALYZE crew_roster; ANALYZE flights")
+
+                # Legacy: join query, then two queries per roster row (capped, then extrapolated)
+                start = time.perf_counter()
+                cur.execute("SELECT cd.crew_id FROM crew_details cd JOIN crew_roster cr ON cd.crew_id = cr.crew_id")
+                crew_ids = [row[0] for row in cur.fetchall()]
+                sample = crew_ids[:legacy_limit]
+                for crew_id in sample:
+                    cur.execute(
+                        "SELECT f.sched_dep_time FROM crew_roster cr JOIN flights f "
+                        "ON cr.flight_no = f.flight_no AND cr.flight_date = f.flight_date "
+                        "WHERE cr.crew_id = %s AND cr.flight_date = %s",
+                        (crew_id, BENCH_DATE),
+                    )
+                    cur.fetchall()
+                    cur.execute("SELECT max_duty_hours, duty_start_time FROM crew_details WHERE crew_id = %s", (crew_id,))
+                    cur.fetchone()
+                legacy_ms = (time.perf_counter() - start) * 1000 * len(crew_ids) / max(1, len(sample))
+
+                start = time.perf_counter()
+                crew_rows = fetch_rostered_crew(cur)
+                flight_rows = fetch_day_flights(cur, BENCH_DATE)
+                crew_availability(crew_rows, flight_rows, lambda crew_id: ["Basic"])
+                engine_ms = (time.perf_counter() - start) * 1000
+
+            note = " (extrapolated)" if len(sample) < len(crew_ids) else ""
+            print(f"{size:>8} {legacy_ms:>11.1f} {engine_ms:>10.1f} {legacy_ms / engine_ms:>7.1f}x{note}")
+            conn.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark set-based crew duty computation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Roster row counts")
+    parser.add_argument("--dsn", help="Postgres DSN; run real queries against TEMP tables")
+    parser.add_argument("--query-latency-ms", type=float, default=0.5, help="Modelled round trip without --dsn")
+    parser.add_argument("--legacy-limit", type=int, default=5000, help="Max legacy per-row lookups before extrapolating")
+    args = parser.parse_args()
+
+    if args.dsn:
+        bench_database(args.dsn, args.sizes, args.legacy_limit)
+    else:
+        bench_in_memory(args.sizes, args.query_latency_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Set-based crew duty computation for crew-svc.
+
+Instead of one pair of queries per crew member, a day's roster flights and
+the crew duty limits are fetched in bulk and duty hours for every crew
+member are computed in memory.
+"""
+
+from collections import Counter
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Mock duty model - in production, use actual block times
+FLIGHT_DUTY_HOURS = 2.5 + 1.0  # flight duration plus pre/post flight duties
+DEFAULT_MAX_DUTY_HOURS = 8
+DEFAULT_DUTY_START = "06:00"
+MIN_REST_HOURS = 12
+MAX_FLIGHTS_PER_DAY = 4
+
+DutyLimits = Dict[str, Tuple[Optional[float], Optional[str]]]
+
+
+def duty_summary(flights_today: int, max_duty_hours: Optional[float], duty_start_time: Optional[str]) -> Dict[str, Any]:
+    """Duty hours and rest requirement for a crew member flying ``flights_today`` sectors."""
+    total_duty_hours = flights_today * FLIGHT_DUTY_HOURS
+    max_duty_hours = max_duty_hours or DEFAULT_MAX_DUTY_HOURS
+    rest_required = max(0, MIN_REST_HOURS - (max_duty_hours - total_duty_hours)) if total_duty_hours > 0 else 0
+    return {
+        "duty_hours": total_duty_hours,
+        "max_duty_hours": max_duty_hours,
+        "rest_required": rest_required,
+        "duty_start_time": duty_start_time or DEFAULT_DUTY_START,
+        "flights_today": flights_today,
+    }
+
+
+def legality_from_duty(duty_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Basic legality checks against a duty summary."""
+    violations = []
+
+    # Duty time check
+    if duty_info["duty_hours"] >= duty_info["max_duty_hours"]:
+        violations.append("Exceeded maximum duty hours")
+
+    # Rest requirement check
+    if duty_info["rest_required"] > 0:
+        violations.append(f"Requires {duty_info['rest_required']} hours rest")
+
+    # Flight duty period check (simplified)
+    if duty_info["flights_today"] >= MAX_FLIGHTS_PER_DAY:
+        violations.append("Exceeded maximum flights per day")
+
+    return {
+        "is_legal": not violations,
+        "violations": violations,
+        "duty_info": duty_info,
+    }
+
+
+def compute_duty(
+    crew_ids: Iterable[str],
+    flight_rows: Iterable[Tuple[Any, ...]],
+    limits: DutyLimits,
+) -> Dict[str, Dict[str, Any]]:
+    """Duty summaries keyed by crew_id; ``flight_rows`` start with the crew_id of each rostered flight."""
+    flights_per_crew = Counter(row[0] for row in flight_rows)
+    duty: Dict[str, Dict[str, Any]] = {}
+    for crew_id in crew_ids:
+        if crew_id in duty:
+            continue
+        max_duty_hours, duty_start_time = limits.get(crew_id, (None, None))
+        duty[crew_id] = duty_summary(flights_per_crew.get(crew_id, 0), max_duty_hours, duty_start_time)
+    return duty
+
+
+def fetch_day_flights(cur, flight_date: date, crew_ids: Optional[Sequence[str]] = None) -> List[Tuple[Any, ...]]:
+    """All rostered flights on ``flight_date`` as (crew_id, dep, arr, origin, destination)."""
+    query = """
+        SELECT cr.crew_id, f.sched_dep_time, f.sched_arr_time, f.origin, f.destination
+        FROM crew_roster cr
+        JOIN flights f ON cr.flight_no = f.flight_no AND cr.flight_date = f.flight_date
+        WHERE cr.flight_date = %s
+    """
+    params: List[Any] = [flight_date]
+    if crew_ids is not None:
+        query += " AND cr.crew_id = ANY(%s)"
+        params.append(list(crew_ids))
+    cur.execute(query + " ORDER BY cr.crew_id, f.sched_dep_time", params)
+    return cur.fetchall()
+
+
+def fetch_duty_limits(cur, crew_ids: Optional[Sequence[str]] = None) -> DutyLimits:
+    """Max duty hours and duty start time per crew member."""
+    query = "SELECT crew_id, max_duty_hours, duty_start_time FROM crew_details"
+    params: List[Any] = []
+    if crew_ids is not None:
+        query += " WHERE crew_id = ANY(%s)"
+        params.append(list(crew_ids))
+    cur.execute(query, params)
+    return {crew_id: (max_hours, start) for crew_id, max_hours, start in cur.fetchall()}
+
+
+def fetch_rostered_crew(cur, role: Optional[str] = None) -> List[Tuple[Any, ...]]:
+    """Rostered crew, one row per crew_id: (crew_id, name, role, max_duty_hours, duty_start_time)."""
+    query = """
+        SELECT DISTINCT ON (cd.crew_id) cd.crew_id, cd.crew_name, cr.crew_role, cd.max_duty_hours, cd.duty_start_time
+        FROM crew_details cd
+        JOIN crew_roster cr ON cd.crew_id = cr.crew_id
+    """
+    params: List[Any] = []
+    if role:
+        query += " WHERE cr.crew_role = %s"
+        params.append(role)
+    cur.execute(query + " ORDER BY cd.crew_id, cr.crew_role", params)
+    return cur.fetchall()
+
+
+def crew_availability(
+    crew_rows: Sequence[Tuple[Any, ...]],
+    flight_rows: Iterable[Tuple[Any, ...]],
+    qualifications: Callable[[str], List[str]],
+) -> List[Dict[str, Any]]:
+    """Availability records for ``crew_rows`` (as returned by fetch_rostered_crew), sorted by name."""
+    limits = {row[0]: (row[3], row[4]) for row in crew_rows}
+    duty = compute_duty(limits.keys(), flight_rows, limits)
+
+    available_crew = []
+    for crew_id, name, role, _max_hours, _duty_start in crew_rows:
+        duty_info = duty[crew_id]
+        available_crew.append({
+            "crew_id": crew_id,
+            "name": name or "Unknown",
+            "role": role,
+            "qualifications": qualifications(crew_id),
+            "duty_hours": duty_info["duty_hours"],
+            "max_duty_hours": duty_info["max_duty_hours"],
+            "is_available": duty_info["duty_hours"] < duty_info["max_duty_hours"] * 0.9,
+            "rest_required": duty_info["rest_required"],
+        })
+    available_crew.sort(key=lambda crew: crew["name"])
+    return available_crew
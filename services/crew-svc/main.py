@@ -5,12 +5,21 @@ from typing import List, Dict, Any, Optional
 
 import psycopg
 from fastapi import HTTPException, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from psycopg_pool import ConnectionPool
 
 from services.shared.base_service import BaseService, LATENCY, log_startup
 from services.shared.prompt_manager import PromptManager
 from services.shared.llm_client import create_llm_client
+from crew_index import CrewIndex
+from duty_engine import (
+    compute_duty,
+    crew_availability,
+    fetch_day_flights,
+    fetch_duty_limits,
+    fetch_rostered_crew,
+    legality_from_duty,
+)
 
 # Initialize base service
 service = BaseService("crew-svc", "1.0.0")
@@ -22,6 +31,7 @@ DB_PORT = service.get_env_int("DB_PORT")
 DB_NAME = service.get_env_var("DB_NAME")
 DB_USER = service.get_env_var("DB_USER")
 DB_PASS = service.get_env_var("DB_PASS")
+CREW_INDEX_TTL = service.get_env_int("CREW_INDEX_TTL", 300)
 
 # Initialize LLM client
 llm_client = create_llm_client("crew-svc")
@@ -42,6 +52,10 @@ class CrewSwapRequest(BaseModel):
     unavailable_crew_id: str
     reason: str
 
+class CrewIndexRefreshRequest(BaseModel):
+    crew_ids: List[str] = Field(default_factory=list, description="Crew whose roster or details changed")
+    dates: List[str] = Field(default_factory=list, description="Flight dates whose schedule changed")
+
 class CrewMember(BaseModel):
     crew_id: str
     name: str
@@ -61,6 +75,11 @@ async def lifespan(app):
     
     # Initialize connection pool
     db_pool = ConnectionPool(DB_CONN_STRING, min_size=2, max_size=10)
+
+    try:
+        crew_index.rebuild()
+    except Exception as e:
+        service.log_error(e, "crew index warm-up")
     
     yield
     
@@ -109,126 +128,50 @@ def get_crew_qualifications(crew_id: str) -> List[str]:
     }
     return qualifications_map.get(crew_id, ["Basic"])
 
+crew_index = CrewIndex(lambda: db_pool.connection(), get_crew_qualifications, ttl_seconds=CREW_INDEX_TTL)
+
 def calculate_duty_hours(crew_id: str, date: str) -> Dict[str, Any]:
     """Calculate current duty hours and rest requirements"""
     flight_dt = _parse_date(date)
     with db_pool.connection() as conn:
         with conn.cursor() as cur:
-            # Get crew's flights for the day
-            cur.execute("""
-                SELECT f.sched_dep_time, f.sched_arr_time, f.origin, f.destination
-                FROM crew_roster cr
-                JOIN flights f ON cr.flight_no = f.flight_no AND cr.flight_date = f.flight_date
-                WHERE cr.crew_id = %s AND cr.flight_date = %s
-                ORDER BY f.sched_dep_time
-            """, (crew_id, flight_dt))
-            flights = cur.fetchall()
-            
-            # Calculate duty hours (simplified)
-            total_duty_hours = 0
-            for flight in flights:
-                dep_time, arr_time, origin, destination = flight
-                # Mock calculation - in production, use actual time calculations
-                flight_duration = 2.5  # hours
-                duty_hours = flight_duration + 1.0  # include pre/post flight duties
-                total_duty_hours += duty_hours
-            
-            # Get max duty hours from crew details
-            cur.execute("""
-                SELECT max_duty_hours, duty_start_time
-                FROM crew_details
-                WHERE crew_id = %s
-            """, (crew_id,))
-            result = cur.fetchone()
-            max_duty_hours = result[0] if result and result[0] else 8
-            duty_start_time = result[1] if result and result[1] else "06:00"
-            
-            # Calculate rest required
-            rest_required = max(0, 12 - (max_duty_hours - total_duty_hours)) if total_duty_hours > 0 else 0
-            
-            return {
-                "duty_hours": total_duty_hours,
-                "max_duty_hours": max_duty_hours,
-                "rest_required": rest_required,
-                "duty_start_time": duty_start_time,
-                "flights_today": len(flights)
-            }
+            flights = fetch_day_flights(cur, flight_dt, [crew_id])
+            limits = fetch_duty_limits(cur, [crew_id])
+    return compute_duty([crew_id], flights, limits)[crew_id]
 
 def check_crew_legality(crew_id: str, flight_no: str, date: str) -> Dict[str, Any]:
     """Check if crew member is legally allowed to operate the flight"""
-    duty_info = calculate_duty_hours(crew_id, date)
-    
-    # Basic legality checks
-    violations = []
-    is_legal = True
-    
-    # Duty time check
-    if duty_info["duty_hours"] >= duty_info["max_duty_hours"]:
-        violations.append("Exceeded maximum duty hours")
-        is_legal = False
-    
-    # Rest requirement check
-    if duty_info["rest_required"] > 0:
-        violations.append(f"Requires {duty_info['rest_required']} hours rest")
-        is_legal = False
-    
-    # Flight duty period check (simplified)
-    if duty_info["flights_today"] >= 4:
-        violations.append("Exceeded maximum flights per day")
-        is_legal = False
-    
-    return {
-        "is_legal": is_legal,
-        "violations": violations,
-        "duty_info": duty_info
-    }
+    return legality_from_duty(calculate_duty_hours(crew_id, date))
 
 def find_replacement_crew(unavailable_crew_id: str, flight_no: str, date: str, 
                          required_role: str, required_qualifications: List[str]) -> List[CrewMember]:
     """Find suitable replacement crew members"""
-    with db_pool.connection() as conn:
-        with conn.cursor() as cur:
-            # Get all crew members with the required role
-            cur.execute("""
-                SELECT cd.crew_id, cd.crew_name, cr.crew_role, cd.max_duty_hours
-                FROM crew_details cd
-                JOIN crew_roster cr ON cd.crew_id = cr.crew_id
-                WHERE cr.crew_role = %s AND cr.crew_id != %s
-                ORDER BY cd.crew_name
-            """, (required_role, unavailable_crew_id))
-            crew_candidates = cur.fetchall()
-    
-    replacements = []
-    for crew_id, name, role, max_hours in crew_candidates:
-        # Check legality
-        legality = check_crew_legality(crew_id, flight_no, date)
-        
-        if legality["is_legal"]:
-            # Get qualifications
-            qualifications = get_crew_qualifications(crew_id)
-            
-            # Check if qualified for the aircraft type
-            aircraft_type = "B777"  # Mock - in production, get from flight data
-            is_qualified = aircraft_type in qualifications or "Captain" in qualifications or "First Officer" in qualifications
-            
-            if is_qualified:
-                duty_info = legality["duty_info"]
-                replacements.append(CrewMember(
-                    crew_id=crew_id,
-                    name=name,
-                    role=role,
-                    qualifications=qualifications,
-                    current_location="AKL",  # Mock
-                    duty_hours=duty_info["duty_hours"],
-                    max_duty_hours=duty_info["max_duty_hours"],
-                    rest_required=duty_info["rest_required"],
-                    availability_status="Available",
-                    last_flight="NZ456"  # Mock
-                ))
-    
-    # Sort by suitability (fewer duty hours, more qualifications)
-    replacements.sort(key=lambda x: (x.duty_hours, -len(x.qualifications)))
-    return replacements[:5]  # Return top 5 candidates
+    # Pruned by role and qualification in the index; legality is evaluated in memory
+    aircraft_type = "B777"  # Mock - in production, get from flight data
+    candidates = crew_index.candidates(
+        required_role,
+        _parse_date(date),
+        exclude=[unavailable_crew_id],
+        any_qualification=[aircraft_type, "Captain", "First Officer"],
+        k=5,
+    )
+
+    # Sorted by suitability (fewer duty hours, more qualifications); top 5 candidates
+    return [
+        CrewMember(
+            crew_id=record.crew_id,
+            name=record.name or "Unknown",
+            role=required_role,
+            qualifications=record.qualifications,
+            current_location=record.base,
+            duty_hours=duty_info["duty_hours"],
+            max_duty_hours=duty_info["max_duty_hours"],
+            rest_required=duty_info["rest_required"],
+            availability_status="Available",
+            last_flight="NZ456"  # Mock
+        )
+        for record, duty_info in candidates
+    ]
 
 def generate_llm_crew_analysis(crew_data: Dict[str, Any], disruption_context: str) -> Dict[str, Any]:
     """Use LLM to analyze crew situation and provide recommendations"""
@@ -409,7 +352,7 @@ def suggest_crew_swap(req: CrewSwapRequest, request: Request):
                     cost_impact += 100  # Relocation
                 
                 # Check legality
-                legality = check_crew_legality(replacement.crew_id, req.flight_no, req.date)
+                legality = crew_index.legality(replacement.crew_id, flight_dt)
                 
                 swaps.append(CrewSwap(
                     original_crew=CrewMember(
@@ -470,44 +413,14 @@ def get_crew_availability(date: str, role: Optional[str] = None, request: Reques
     """Get available crew members for a specific date and role"""
     with LATENCY.labels("crew-svc", "/crew_availability", "GET").time():
         try:
+            # Two set-based queries for the whole day instead of two per roster row
+            flight_dt = _parse_date(date)
             with db_pool.connection() as conn:
                 with conn.cursor() as cur:
-                    if role:
-                        cur.execute("""
-                            SELECT cd.crew_id, cd.crew_name, cr.crew_role, cd.max_duty_hours
-                            FROM crew_details cd
-                            JOIN crew_roster cr ON cd.crew_id = cr.crew_id
-                            WHERE cr.crew_role = %s
-                            ORDER BY cd.crew_name
-                        """, (role,))
-                    else:
-                        cur.execute("""
-                            SELECT cd.crew_id, cd.crew_name, cr.crew_role, cd.max_duty_hours
-                            FROM crew_details cd
-                            JOIN crew_roster cr ON cd.crew_id = cr.crew_id
-                            ORDER BY cd.crew_name
-                        """)
-                    
-                    crew_rows = cur.fetchall()
-            
-            available_crew = []
-            for crew_id, name, role, max_hours in crew_rows:
-                duty_info = calculate_duty_hours(crew_id, date)
-                qualifications = get_crew_qualifications(crew_id)
-                
-                # Check if available (simplified)
-                is_available = duty_info["duty_hours"] < max_hours * 0.9
-                
-                available_crew.append({
-                    "crew_id": crew_id,
-                    "name": name or "Unknown",
-                    "role": role,
-                    "qualifications": qualifications,
-                    "duty_hours": duty_info["duty_hours"],
-                    "max_duty_hours": max_hours,
-                    "is_available": is_available,
-                    "rest_required": duty_info["rest_required"]
-                })
+                    crew_rows = fetch_rostered_crew(cur, role)
+                    flight_rows = fetch_day_flights(cur, flight_dt)
+
+            available_crew = crew_availability(crew_rows, flight_rows, get_crew_qualifications)
             
             service.log_request(request, {"status": "success", "crew_count": len(available_crew)})
             return {
@@ -521,10 +434,27 @@ def get_crew_availability(date: str, role: Optional[str] = None, request: Reques
             service.log_error(e, "crew_availability endpoint")
             raise
 
+@app.post("/index/crew")
+def refresh_crew_index(payload: CrewIndexRefreshRequest, request: Request):
+    """Incrementally refresh the replacement index after roster, crew or flight changes"""
+    try:
+        dates = [_parse_date(value) for value in payload.dates]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    refreshed = crew_index.refresh(payload.crew_ids, dates)
+    service.log_request(request, {"status": "success", **refreshed})
+    return {"ok": True, "refreshed": refreshed, "index": crew_index.stats()}
+
+@app.post("/index/rebuild")
+def rebuild_crew_index(request: Request):
+    crew_index.rebuild()
+    service.log_request(request, {"status": "success"})
+    return {"ok": True, "index": crew_index.stats()}
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "crew-svc"}
+    return {"status": "healthy", "service": "crew-svc", "crew_index": crew_index.stats()}
 
 if __name__ == "__main__":
     log_startup("crew-svc")
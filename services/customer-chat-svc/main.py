@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 import httpx
-from fastapi import Request, HTTPException
+from fastapi import Request, HTTPException, Query
 from pydantic import BaseModel
 
 from services.shared.base_service import BaseService
@@ -14,6 +14,7 @@ from conversation_logic import (
     lookup_policy_data,
     enhance_sentiment_analysis_with_context
 )
+from session_store import create_session_store
 
 # Initialize base service
 service = BaseService("customer-chat-svc", "1.0.0")
@@ -24,9 +25,16 @@ COMMS_URL = service.get_env_var("COMMS_URL", "http://comms-svc:8083")
 AGENT_URL = service.get_env_var("AGENT_URL", "http://agent-svc:8082")
 KNOWLEDGE_SERVICE_URL = service.get_env_var("KNOWLEDGE_SERVICE_URL", "http://knowledge-engine:8081")
 
-# In-memory storage for demo purposes (in production, use Redis or database)
-chat_sessions = {}
-message_history = {}
+# Sessions and message history live in Redis when SESSION_STORE=redis so every
+# uvicorn worker and replica sees the same conversations
+session_store = create_session_store(
+    backend=service.get_env_var("SESSION_STORE", "memory"),
+    redis_url=service.get_env_var("REDIS_URL", "redis://localhost:6379"),
+    session_ttl=service.get_env_int("SESSION_TTL", 86400),
+    max_sessions=service.get_env_int("SESSION_MAX", 10000),
+    max_messages=service.get_env_int("SESSION_MAX_MESSAGES", 200),
+    max_communications=service.get_env_int("COMMUNICATION_HISTORY_MAX", 1000),
+)
 
 class ChatMessage(BaseModel):
     session_id: str
@@ -77,8 +85,7 @@ def create_chat_session(request: ChatSessionCreate, req: Request):
             "last_activity": datetime.now().isoformat()
         }
         
-        chat_sessions[session_id] = session
-        message_history[session_id] = []
+        session_store.create_session(session)
         
         service.log_request(req, {"status": "success", "session_id": session_id})
         return {"session_id": session_id, "status": "created", "session": session}
@@ -90,11 +97,10 @@ def create_chat_session(request: ChatSessionCreate, req: Request):
 def send_chat_message(message: ChatMessage, req: Request):
     """Send a message in a chat session with natural language response generation"""
     try:
-        if message.session_id not in chat_sessions:
-            raise HTTPException(status_code=404, detail="Chat session not found")
-        
         # Get session context
-        session = chat_sessions[message.session_id]
+        session = session_store.get_session(message.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found")
         
         # Analyze sentiment of customer message and get LLM-generated response
         sentiment_response = analyze_customer_sentiment(message.message, message.session_id)
@@ -145,8 +151,6 @@ def send_chat_message(message: ChatMessage, req: Request):
             "sentiment": enhanced_sentiment
         }
         
-        message_history[message.session_id].append(customer_msg)
-        
         # Create AI response with natural language
         ai_response = {
             "id": str(uuid.uuid4()),
@@ -164,13 +168,11 @@ def send_chat_message(message: ChatMessage, req: Request):
             }
         }
         
-        message_history[message.session_id].append(ai_response)
-        chat_sessions[message.session_id]["last_activity"] = datetime.now().isoformat()
+        message_count = session_store.append_messages(message.session_id, [customer_msg, ai_response])
+        session_store.update_session(message.session_id, {"last_activity": datetime.now().isoformat()})
         
         # Update session with sentiment insights
-        if "sentiment_insights" not in chat_sessions[message.session_id]:
-            chat_sessions[message.session_id]["sentiment_insights"] = []
-        chat_sessions[message.session_id]["sentiment_insights"].append({
+        session_store.append_insight(message.session_id, {
             "timestamp": datetime.now().isoformat(),
             "sentiment": enhanced_sentiment.get("sentiment"),
             "urgency": enhanced_sentiment.get("urgency_level"),
@@ -190,7 +192,7 @@ def send_chat_message(message: ChatMessage, req: Request):
             "session_id": message.session_id,
             "customer_message": customer_msg,
             "ai_response": ai_response,
-            "message_count": len(message_history[message.session_id]),
+            "message_count": message_count,
             "sentiment_analysis": enhanced_sentiment
         }
         
@@ -204,7 +206,7 @@ def analyze_customer_sentiment(message: str, session_id: str) -> Dict[str, Any]:
     """Analyze customer sentiment using comms service"""
     try:
         # Get session context
-        session = chat_sessions.get(session_id, {})
+        session = session_store.get_session(session_id) or {}
         context = {
             "flight_no": session.get("flight_no", "Unknown"),
             "customer_name": session.get("customer_name", "Customer"),
@@ -266,20 +268,26 @@ def analyze_sentiment_fallback(message: str) -> Dict[str, Any]:
 
 
 @app.get("/chat/session/{session_id}")
-def get_chat_session(session_id: str, req: Request):
-    """Get chat session details and message history"""
+def get_chat_session(
+    session_id: str,
+    req: Request,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Get chat session details and a page of its message history, oldest first"""
     try:
-        if session_id not in chat_sessions:
+        session = session_store.get_session(session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Chat session not found")
         
-        session = chat_sessions[session_id]
-        messages = message_history.get(session_id, [])
+        messages, next_cursor, message_count = session_store.get_messages(session_id, cursor, limit)
         
         service.log_request(req, {"status": "success", "session_id": session_id})
         return {
             "session": session,
             "messages": messages,
-            "message_count": len(messages)
+            "message_count": message_count,
+            "next_cursor": next_cursor
         }
     except HTTPException:
         raise
@@ -369,6 +377,8 @@ AeroOps: {sms_content[:100]}... - Flight {request.flight_no} on {request.date}""
             "tone": request.tone
         }
         
+        session_store.add_communication(result)
+        
         service.log_request(req, {"status": "success", "communication_id": communication_id})
         return result
         
@@ -379,53 +389,41 @@ AeroOps: {sms_content[:100]}... - Flight {request.flight_no} on {request.date}""
         raise HTTPException(status_code=500, detail="Failed to send communication")
 
 @app.get("/communication/history")
-def get_communication_history(req: Request):
-    """Get communication history (demo data)"""
+def get_communication_history(
+    req: Request,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Get sent communications, newest first"""
     try:
-        # In production, this would query a database
-        demo_history = [
-            {
-                "communication_id": "demo-1",
-                "type": "email",
-                "customer_name": "John Doe",
-                "customer_email": "john.doe@example.com",
-                "flight_no": "NZ123",
-                "date": "2025-09-17",
-                "status": "sent",
-                "sent_at": "2025-09-16T10:30:00Z",
-                "tone": "empathetic"
-            },
-            {
-                "communication_id": "demo-2",
-                "type": "sms",
-                "customer_name": "Jane Smith",
-                "customer_phone": "+1234567890",
-                "flight_no": "NZ456",
-                "date": "2025-09-17",
-                "status": "sent",
-                "sent_at": "2025-09-16T11:15:00Z",
-                "tone": "urgent"
-            }
-        ]
-        
-        service.log_request(req, {"status": "success"})
-        return {"communications": demo_history}
+        communications, next_cursor = session_store.list_communications(cursor, limit)
+        service.log_request(req, {"status": "success", "count": len(communications)})
+        return {"communications": communications, "next_cursor": next_cursor}
         
     except Exception as e:
         service.log_error(e, "get_communication_history")
         raise HTTPException(status_code=500, detail="Failed to get communication history")
 
 @app.get("/chat/sessions")
-def list_chat_sessions(req: Request):
-    """List all active chat sessions"""
+def list_chat_sessions(
+    req: Request,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """List active chat sessions, newest first"""
     try:
-        sessions = list(chat_sessions.values())
+        sessions, next_cursor = session_store.list_sessions(cursor, limit)
         service.log_request(req, {"status": "success", "count": len(sessions)})
-        return {"sessions": sessions, "count": len(sessions)}
+        return {"sessions": sessions, "count": len(sessions), "next_cursor": next_cursor}
     except Exception as e:
         service.log_error(e, "list_chat_sessions")
         raise HTTPException(status_code=500, detail="Failed to list chat sessions")
 
+@app.get("/chat/sessions/stats")
+def session_store_stats():
+    """Session store backend and sizes"""
+    return session_store.stats()
+
 @app.get("/message")
 def get_message(flight_no: str, date: str, req: Request):
     """Get latest generated email/SMS for a specific flight and date"""
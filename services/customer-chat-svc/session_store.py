@@ -0,0 +1,409 @@
+"""
+Session and message storage for customer-chat-svc.
+
+Two interchangeable backends:
+
+* ``InMemorySessionStore`` - per-process LRU of sessions with an idle TTL;
+  fine for a single worker and for local development.
+* ``RedisSessionStore`` - sessions as Redis hashes and message history as
+  Redis lists, so any number of uvicorn workers or replicas share state.
+
+Message history, sentiment insights and the communication log are capped
+lists. Every entry gets an absolute position when appended (the running
+count of entries ever written), which doubles as a pagination cursor that
+stays valid while old entries are trimmed. Sessions are paged newest first
+by creation sequence.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import redis
+from loguru import logger
+from redis.exceptions import WatchError
+
+Page = Tuple[List[Dict[str, Any]], Optional[int]]
+
+
+def page_window(total: int, retained: int, cursor: Optional[int], limit: int, newest_first: bool) -> Tuple[int, int, Optional[int]]:
+    """
+    Slice of a capped log to return for a cursor.
+
+    The log holds the last ``retained`` of ``total`` entries ever appended,
+    so the oldest retained entry has absolute position ``total - retained``.
+    Oldest-first cursors are the position of the next entry to return;
+    newest-first cursors are the (exclusive) position to page back from.
+
+    Returns:
+        (start, stop) offsets into the retained list and the next cursor (None when done)
+    """
+    first = total - retained
+    if newest_first:
+        end = total if cursor is None else max(first, min(cursor, total))
+        begin = max(first, end - limit)
+        return begin - first, end - first, begin if begin > first else None
+    begin = first if cursor is None else max(first, min(cursor, total))
+    end = min(total, begin + limit)
+    return begin - first, end - first, end if end < total else None
+
+
+class InMemorySessionStore:
+    """Process-local store: LRU-evicted sessions with an idle TTL and capped logs."""
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        session_ttl: int = 86400,
+        max_messages: int = 200,
+        max_insights: int = 50,
+        max_communications: int = 1000,
+    ):
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.max_messages = max_messages
+        self.max_insights = max_insights
+        self._lock = threading.RLock()
+        # session_id -> {"session", "messages", "message_total", "insights", "seq", "expires_at"} in LRU order
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Creation sequence index for newest-first listing; evicted ids are skipped and compacted lazily
+        self._seqs: List[int] = []
+        self._seq_ids: Dict[int, str] = {}
+        self._next_seq = 1
+        self._communications: Deque[Dict[str, Any]] = deque(maxlen=max_communications)
+        self._communication_total = 0
+        self.counts = {"evicted": 0, "expired": 0}
+
+    def _live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.time():
+            self._drop(session_id)
+            self.counts["expired"] += 1
+            return None
+        return entry
+
+    def _drop(self, session_id: str) -> None:
+        entry = self._sessions.pop(session_id)
+        self._seq_ids.pop(entry["seq"], None)
+
+    def _touch(self, session_id: str, entry: Dict[str, Any]) -> None:
+        entry["expires_at"] = time.time() + self.session_ttl
+        self._sessions.move_to_end(session_id)
+
+    def create_session(self, session: Dict[str, Any]) -> None:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._sessions[session["session_id"]] = {
+                "session": dict(session),
+                "messages": deque(maxlen=self.max_messages),
+                "message_total": 0,
+                "insights": deque(maxlen=self.max_insights),
+                "seq": seq,
+                "expires_at": time.time() + self.session_ttl,
+            }
+            self._seqs.append(seq)
+            self._seq_ids[seq] = session["session_id"]
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+                self.counts["evicted"] += 1
+            # Not done in _drop, which list_sessions can reach while walking _seqs
+            if len(self._seqs) > 2 * len(self._seq_ids) + 64:
+                self._seqs = [seq for seq in self._seqs if seq in self._seq_ids]
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._live(session_id)
+            if entry is None:
+                return None
+            session = dict(entry["session"])
+            if entry["insights"]:
+                session["sentiment_insights"] = list(entry["insights"])
+            return session
+
+    def update_session(self, session_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = self._live(session_id)
+            if entry is not None:
+                entry["session"].update(fields)
+                self._touch(session_id, entry)
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Append to the session's history; returns the number of messages ever sent in it."""
+        with self._lock:
+            entry = self._live(session_id)
+            if entry is None:
+                return 0
+            entry["messages"].extend(messages)
+            entry["message_total"] += len(messages)
+            self._touch(session_id, entry)
+            return entry["message_total"]
+
+    def append_insight(self, session_id: str, insight: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = self._live(session_id)
+            if entry is not None:
+                entry["insights"].append(insight)
+
+    def get_messages(self, session_id: str, cursor: Optional[int] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int], int]:
+        """Messages oldest first from ``cursor``; returns (messages, next_cursor, total ever sent)."""
+        with self._lock:
+            entry = self._live(session_id)
+            if entry is None:
+                return [], None, 0
+            messages = entry["messages"]
+            start, stop, next_cursor = page_window(entry["message_total"], len(messages), cursor, limit, newest_first=False)
+            return [messages[i] for i in range(start, stop)], next_cursor, entry["message_total"]
+
+    def list_sessions(self, cursor: Optional[int] = None, limit: int = 50) -> Page:
+        """Sessions newest first; ``cursor`` is the creation sequence to page back from."""
+        with self._lock:
+            end = len(self._seqs) if cursor is None else bisect_left(self._seqs, cursor)
+            sessions: List[Dict[str, Any]] = []
+            index = end - 1
+            while index >= 0 and len(sessions) < limit:
+                session_id = self._seq_ids.get(self._seqs[index])
+                if session_id is not None and self._live(session_id) is not None:
+                    sessions.append(dict(self._sessions[session_id]["session"]))
+                index -= 1
+            next_cursor = self._seqs[index + 1] if index >= 0 and len(sessions) == limit else None
+            return sessions, next_cursor
+
+    def add_communication(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._communications.append(record)
+            self._communication_total += 1
+
+    def list_communications(self, cursor: Optional[int] = None, limit: int = 50) -> Page:
+        """Sent communications newest first."""
+        with self._lock:
+            start, stop, next_cursor = page_window(
+                self._communication_total, len(self._communications), cursor, limit, newest_first=True
+            )
+            return [self._communications[i] for i in range(stop - 1, start - 1, -1)], next_cursor
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "sessions": len(self._sessions),
+                "communications": len(self._communications),
+                **self.counts,
+            }
+
+
+class RedisSessionStore:
+    """Redis-backed store shared by every worker and replica."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = "customer-chat",
+        session_ttl: int = 86400,
+        max_messages: int = 200,
+        max_insights: int = 50,
+        max_communications: int = 1000,
+    ):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.session_ttl = session_ttl
+        self.max_messages = max_messages
+        self.max_insights = max_insights
+        self.max_communications = max_communications
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}:messages"
+
+    def _insights_key(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}:insights"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.prefix}:sessions"
+
+    @property
+    def _communications_key(self) -> str:
+        return f"{self.prefix}:communications"
+
+    def _expire_all(self, pipe, session_id: str) -> None:
+        for key in (self._session_key(session_id), self._messages_key(session_id), self._insights_key(session_id)):
+            pipe.expire(key, self.session_ttl)
+
+    def create_session(self, session: Dict[str, Any]) -> None:
+        session_id = session["session_id"]
+        seq = self.redis.incr(f"{self.prefix}:session_seq")
+        fields = {name: json.dumps(value) for name, value in session.items()}
+        fields["_seq"] = seq
+        fields["_message_total"] = 0
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._session_key(session_id), mapping=fields)
+        pipe.expire(self._session_key(session_id), self.session_ttl)
+        pipe.zadd(self._index_key, {session_id: seq})
+        pipe.execute()
+
+    def _decode(self, raw: Dict[str, str]) -> Dict[str, Any]:
+        return {name: json.loads(value) for name, value in raw.items() if not name.startswith("_")}
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self._session_key(session_id))
+        pipe.lrange(self._insights_key(session_id), 0, -1)
+        raw, insights = pipe.execute()
+        if not raw:
+            return None
+        session = self._decode(raw)
+        if insights:
+            session["sentiment_insights"] = [json.loads(item) for item in insights]
+        return session
+
+    def update_session(self, session_id: str, fields: Dict[str, Any]) -> None:
+        if not self.redis.exists(self._session_key(session_id)):
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._session_key(session_id), mapping={name: json.dumps(value) for name, value in fields.items()})
+        self._expire_all(pipe, session_id)
+        pipe.execute()
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Append to the session's history; returns the number of messages ever sent in it."""
+        if not messages or not self.redis.exists(self._session_key(session_id)):
+            return 0
+        key = self._messages_key(session_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(key, *[json.dumps(message) for message in messages])
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.hincrby(self._session_key(session_id), "_message_total", len(messages))
+        self._expire_all(pipe, session_id)
+        return int(pipe.execute()[2])
+
+    def append_insight(self, session_id: str, insight: Dict[str, Any]) -> None:
+        key = self._insights_key(session_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(key, json.dumps(insight))
+        pipe.ltrim(key, -self.max_insights, -1)
+        pipe.expire(key, self.session_ttl)
+        pipe.execute()
+
+    def _read_page(
+        self,
+        list_key: str,
+        total_key: str,
+        total_field: Optional[str],
+        cursor: Optional[int],
+        limit: int,
+        newest_first: bool,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], int]:
+        """
+        Read one page of a capped list and its running total consistently.
+
+        Appends trim the head of the list, so an append between reading the
+        length and the range would shift the offsets; the keys are WATCHed and
+        the read is retried if either changes before the LRANGE runs.
+        """
+        with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(list_key, total_key)
+                    total = pipe.hget(total_key, total_field) if total_field else pipe.get(total_key)
+                    total = int(total or 0)
+                    start, stop, next_cursor = page_window(total, pipe.llen(list_key), cursor, limit, newest_first)
+                    if stop <= start:
+                        return [], next_cursor, total
+                    pipe.multi()
+                    pipe.lrange(list_key, start, stop - 1)
+                    items = pipe.execute()[0]
+                    return [json.loads(item) for item in items], next_cursor, total
+                except WatchError:
+                    continue
+
+    def get_messages(self, session_id: str, cursor: Optional[int] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int], int]:
+        """Messages oldest first from ``cursor``; returns (messages, next_cursor, total ever sent)."""
+        return self._read_page(
+            self._messages_key(session_id), self._session_key(session_id), "_message_total", cursor, limit, newest_first=False
+        )
+
+    def list_sessions(self, cursor: Optional[int] = None, limit: int = 50) -> Page:
+        """Sessions newest first; ``cursor`` is the creation sequence to page back from."""
+        sessions: List[Dict[str, Any]] = []
+        upper = "+inf" if cursor is None else f"({cursor}"
+        while len(sessions) < limit:
+            batch = self.redis.zrevrangebyscore(self._index_key, upper, "-inf", start=0, num=limit - len(sessions), withscores=True)
+            if not batch:
+                return sessions, None
+            pipe = self.redis.pipeline(transaction=False)
+            for session_id, _ in batch:
+                pipe.hgetall(self._session_key(session_id))
+            expired = []
+            for (session_id, _), raw in zip(batch, pipe.execute()):
+                if raw:
+                    sessions.append(self._decode(raw))
+                else:
+                    expired.append(session_id)
+            if expired:
+                # Session hashes expire by TTL; drop them from the index as they are found
+                self.redis.zrem(self._index_key, *expired)
+            upper = f"({int(batch[-1][1])}"
+        return sessions, int(upper[1:])
+
+    def add_communication(self, record: Dict[str, Any]) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(self._communications_key, json.dumps(record))
+        pipe.ltrim(self._communications_key, -self.max_communications, -1)
+        pipe.incr(f"{self._communications_key}:total")
+        pipe.execute()
+
+    def list_communications(self, cursor: Optional[int] = None, limit: int = 50) -> Page:
+        """Sent communications newest first."""
+        communications, next_cursor, _ = self._read_page(
+            self._communications_key, f"{self._communications_key}:total", None, cursor, limit, newest_first=True
+        )
+        return communications[::-1], next_cursor
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "sessions": self.redis.zcard(self._index_key),
+            "communications": self.redis.llen(self._communications_key),
+        }
+
+
+def create_session_store(
+    backend: str = "memory",
+    redis_url: Optional[str] = None,
+    **options: Any,
+):
+    """
+    Build the configured store; falls back to memory when Redis is unreachable.
+
+    Args:
+        backend: "memory" or "redis"
+        redis_url: Redis URL for the redis backend
+        **options: session_ttl, max_messages, max_insights, max_communications
+            (and max_sessions for memory)
+    """
+    max_sessions = options.pop("max_sessions", 10000)
+    if backend == "redis":
+        try:
+            client = redis.Redis.from_url(redis_url or "redis://localhost:6379", decode_responses=True)
+            client.ping()
+            logger.info("Customer chat sessions stored in Redis at {url}", url=redis_url)
+            return RedisSessionStore(client, **options)
+        except Exception as exc:
+            logger.warning(
+                "Redis session store unavailable ({error}); using in-memory sessions, "
+                "which are not shared between workers",
+                error=exc,
+            )
+    return InMemorySessionStore(max_sessions=max_sessions, **options)
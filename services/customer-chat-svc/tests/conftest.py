@@ -0,0 +1,9 @@
+"""
+Pytest configuration for customer-chat-svc tests.
+"""
+
+import os
+import sys
+
+# Add the parent directory to the path so we can import the service modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
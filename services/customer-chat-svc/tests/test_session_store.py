@@ -0,0 +1,375 @@
+"""Tests for customer-chat-svc session storage."""
+
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError, WatchError
+
+import session_store
+from session_store import InMemorySessionStore, RedisSessionStore, create_session_store, page_window
+
+
+class FakeRedis:
+    """In-process stand-in for the subset of redis.Redis the store uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.data = {}
+        self.versions = {}
+        self.ttls = {}
+        self.on_llen = None
+
+    def _write(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    @staticmethod
+    def _range(items, start, stop):
+        length = len(items)
+        start = max(0, start + length if start < 0 else start)
+        stop = stop + length if stop < 0 else stop
+        return items[start:stop + 1]
+
+    def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        for key in keys:
+            if self.data.pop(key, None) is not None:
+                self._write(key)
+
+    def expire(self, key, seconds):
+        if key in self.data:
+            self.ttls[key] = seconds
+            self._write(key)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        self._write(key)
+        return value
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+        self._write(key)
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        self._write(key)
+        return int(fields[field])
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+        self._write(key)
+        return len(self.data[key])
+
+    def ltrim(self, key, start, stop):
+        if key in self.data:
+            self.data[key] = self._range(self.data[key], start, stop)
+            self._write(key)
+
+    def llen(self, key):
+        if self.on_llen is not None:
+            self.on_llen()
+        return len(self.data.get(key, []))
+
+    def lrange(self, key, start, stop):
+        return self._range(self.data.get(key, []), start, stop)
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        self._write(key)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.data.get(key, {}).pop(member, None)
+        self._write(key)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def zrevrangebyscore(self, key, max, min, start=0, num=None, withscores=False):
+        exclusive = max.startswith("(")
+        upper = float(max.lstrip("("))
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1], reverse=True)
+        members = [
+            (member, float(score)) for member, score in members
+            if score < upper or (not exclusive and score == upper)
+        ]
+        return members[start:start + num if num is not None else None]
+
+
+class FakePipeline:
+    """Buffers commands until execute(); after watch() and before multi() they run immediately."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+        self.watched = {}
+        self.immediate = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def reset(self):
+        self.commands, self.watched, self.immediate = [], {}, False
+
+    def watch(self, *keys):
+        self.watched = {key: self.redis.versions.get(key, 0) for key in keys}
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def execute(self):
+        commands = self.commands
+        changed = any(self.redis.versions.get(key, 0) != version for key, version in self.watched.items())
+        self.reset()
+        if changed:
+            raise WatchError("Watched variable changed.")
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        def call(*args, **kwargs):
+            if self.immediate:
+                return command(*args, **kwargs)
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return call
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    options = {"session_ttl": 3600, "max_messages": 4, "max_insights": 2, "max_communications": 3}
+    if request.param == "memory":
+        return InMemorySessionStore(**options)
+    return RedisSessionStore(FakeRedis(), **options)
+
+
+def _create(store, *session_ids):
+    for session_id in session_ids:
+        store.create_session({"session_id": session_id, "customer_name": f"Customer {session_id}"})
+
+
+class TestPageWindow:
+    """Cursor arithmetic over capped logs."""
+
+    @pytest.mark.parametrize("total, retained, cursor, limit, expected", [
+        # Untrimmed log
+        (5, 5, None, 2, (0, 2, 2)),
+        (5, 5, 2, 2, (2, 4, 4)),
+        (5, 5, 4, 2, (4, 5, None)),
+        (0, 0, None, 2, (0, 0, None)),
+        # Trimmed log: positions 6-9 retained
+        (10, 4, None, 3, (0, 3, 9)),
+        (10, 4, 9, 3, (3, 4, None)),
+        # A cursor into the trimmed part resumes at the oldest retained entry
+        (10, 4, 2, 3, (0, 3, 9)),
+        (10, 4, 12, 3, (4, 4, None)),
+    ])
+    def test_oldest_first(self, total, retained, cursor, limit, expected):
+        assert page_window(total, retained, cursor, limit, newest_first=False) == expected
+
+    @pytest.mark.parametrize("total, retained, cursor, limit, expected", [
+        # Untrimmed log
+        (5, 5, None, 2, (3, 5, 3)),
+        (5, 5, 3, 2, (1, 3, 1)),
+        (5, 5, 1, 2, (0, 1, None)),
+        (0, 0, None, 2, (0, 0, None)),
+        # Trimmed log: positions 6-9 retained
+        (10, 4, None, 3, (1, 4, 7)),
+        (10, 4, 7, 3, (0, 1, None)),
+        # Cursors past either end are clamped
+        (10, 4, 3, 3, (0, 0, None)),
+        (10, 4, 15, 3, (1, 4, 7)),
+    ])
+    def test_newest_first(self, total, retained, cursor, limit, expected):
+        assert page_window(total, retained, cursor, limit, newest_first=True) == expected
+
+
+class TestSessionStore:
+    """Behaviour shared by the in-memory and Redis backends."""
+
+    def test_list_sessions_pages_newest_first(self, store):
+        _create(store, "s0", "s1", "s2", "s3", "s4")
+
+        sessions, cursor = store.list_sessions(limit=2)
+        seen = [session["session_id"] for session in sessions]
+        while cursor is not None:
+            sessions, cursor = store.list_sessions(cursor, limit=2)
+            seen += [session["session_id"] for session in sessions]
+
+        assert seen == ["s4", "s3", "s2", "s1", "s0"]
+
+    def test_message_cursor_survives_trimming(self, store):
+        _create(store, "s0")
+        store.append_messages("s0", [{"i": 0}, {"i": 1}, {"i": 2}])
+
+        messages, cursor, total = store.get_messages("s0", limit=2)
+        assert [m["i"] for m in messages] == [0, 1] and cursor == 2 and total == 3
+
+        # Four more messages trim 0-2 away (max_messages=4); the cursor still points at message 2
+        assert store.append_messages("s0", [{"i": 3}, {"i": 4}, {"i": 5}, {"i": 6}]) == 7
+        messages, cursor, total = store.get_messages("s0", cursor, limit=2)
+        assert [m["i"] for m in messages] == [3, 4] and cursor == 5 and total == 7
+        messages, cursor, _ = store.get_messages("s0", cursor, limit=2)
+        assert [m["i"] for m in messages] == [5, 6] and cursor is None
+
+    def test_communications_page_newest_first_and_are_capped(self, store):
+        for index in range(5):
+            store.add_communication({"communication_id": index})
+
+        communications, cursor = store.list_communications(limit=2)
+        assert [c["communication_id"] for c in communications] == [4, 3] and cursor == 3
+        communications, cursor = store.list_communications(cursor, limit=2)
+        # Only the last three are retained
+        assert [c["communication_id"] for c in communications] == [2] and cursor is None
+
+    def test_session_updates_and_insights(self, store):
+        _create(store, "s0")
+        store.update_session("s0", {"last_activity": "2025-01-01T10:00:00"})
+        for index in range(3):
+            store.append_insight("s0", {"sentiment": index})
+
+        session = store.get_session("s0")
+        assert session["last_activity"] == "2025-01-01T10:00:00"
+        assert session["sentiment_insights"] == [{"sentiment": 1}, {"sentiment": 2}]
+
+    def test_unknown_session(self, store):
+        store.update_session("missing", {"last_activity": "now"})
+        assert store.get_session("missing") is None
+        assert store.append_messages("missing", [{"i": 0}]) == 0
+        assert store.get_messages("missing") == ([], None, 0)
+
+
+class TestInMemorySessionStore:
+    """LRU eviction and idle expiry."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = SimpleNamespace(now=1000.0)
+        monkeypatch.setattr(session_store.time, "time", lambda: clock.now)
+        return clock
+
+    def test_least_recently_active_session_is_evicted(self, clock):
+        store = InMemorySessionStore(max_sessions=2)
+        _create(store, "a", "b")
+        store.append_messages("a", [{"i": 0}])
+        _create(store, "c")
+
+        assert store.get_session("b") is None
+        assert store.get_session("a") is not None
+        assert store.stats()["evicted"] == 1
+        assert [s["session_id"] for s in store.list_sessions()[0]] == ["c", "a"]
+
+    def test_idle_sessions_expire_and_activity_extends_them(self, clock):
+        store = InMemorySessionStore(session_ttl=60)
+        _create(store, "a")
+        clock.now += 30
+        _create(store, "b")
+
+        clock.now += 40
+        assert store.get_session("a") is None
+        store.update_session("b", {"last_activity": "later"})
+        clock.now += 50
+        assert store.get_session("b")["last_activity"] == "later"
+        assert store.stats()["expired"] == 1
+
+    def test_list_sessions_cursor_skips_expired_sessions(self, clock):
+        store = InMemorySessionStore(session_ttl=60)
+        _create(store, "s0", "s1")
+        clock.now += 30
+        _create(store, "s2", "s3", "s4")
+        clock.now += 40
+
+        sessions, cursor = store.list_sessions(limit=2)
+        assert [s["session_id"] for s in sessions] == ["s4", "s3"]
+        sessions, cursor = store.list_sessions(cursor, limit=2)
+        assert [s["session_id"] for s in sessions] == ["s2"] and cursor is None
+
+
+class TestRedisSessionStore:
+    """Redis-specific behaviour, against an in-process fake client."""
+
+    def test_expired_sessions_are_pruned_from_the_index(self):
+        redis = FakeRedis()
+        store = RedisSessionStore(redis)
+        _create(store, "s0", "s1", "s2")
+        # The session hash expired by TTL; its index entry is left behind
+        redis.delete(store._session_key("s1"))
+
+        sessions, cursor = store.list_sessions(limit=2)
+        assert [s["session_id"] for s in sessions] == ["s2", "s0"]
+        assert store.stats()["sessions"] == 2
+
+    def test_sessions_and_messages_expire_with_the_session_ttl(self):
+        redis = FakeRedis()
+        store = RedisSessionStore(redis, session_ttl=120)
+        _create(store, "s0")
+        store.append_messages("s0", [{"i": 0}])
+
+        assert redis.ttls[store._session_key("s0")] == 120
+        assert redis.ttls[store._messages_key("s0")] == 120
+
+    def test_page_is_reread_when_an_append_trims_the_list_mid_read(self):
+        redis = FakeRedis()
+        store = RedisSessionStore(redis, max_messages=4)
+        _create(store, "s0")
+        store.append_messages("s0", [{"i": index} for index in range(4)])
+
+        def concurrent_append():
+            redis.on_llen = None
+            store.append_messages("s0", [{"i": 4}, {"i": 5}])
+        redis.on_llen = concurrent_append
+
+        # Positions 2-5 are retained once the concurrent append has trimmed 0-1
+        messages, cursor, total = store.get_messages("s0", cursor=2, limit=2)
+        assert [m["i"] for m in messages] == [2, 3]
+        assert cursor == 4 and total == 6
+
+
+class TestCreateSessionStore:
+    """Backend selection and fallback."""
+
+    def test_memory_backend(self):
+        store = create_session_store("memory", max_sessions=5, max_messages=10)
+        assert isinstance(store, InMemorySessionStore)
+        assert store.max_sessions == 5 and store.max_messages == 10
+
+    def test_redis_backend(self, monkeypatch):
+        monkeypatch.setattr(session_store.redis.Redis, "from_url", lambda url, **kwargs: FakeRedis())
+        store = create_session_store("redis", "redis://redis:6379", max_sessions=5, max_messages=10)
+        assert isinstance(store, RedisSessionStore)
+        assert store.max_messages == 10
+
+    def test_unreachable_redis_falls_back_to_memory(self, monkeypatch):
+        client = FakeRedis()
+
+        def refuse():
+            raise ConnectionError("connection refused")
+        client.ping = refuse
+        monkeypatch.setattr(session_store.redis.Redis, "from_url", lambda url, **kwargs: client)
+
+        store = create_session_store("redis", "redis://redis:6379", max_sessions=5)
+        assert isinstance(store, InMemorySessionStore)
+        assert store.max_sessions == 5
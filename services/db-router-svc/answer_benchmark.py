@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for db-router-svc /smart-query answer formatting.
+
+Sends the same structured questions with answer_style "template" and
+"conversational" and reports latency percentiles for each, so the cost of
+the LLM formatter shows up side by side:
+
+    python answer_benchmark.py --base-url http://localhost:8000 --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+QUESTIONS = [
+    "What is the status of NZ278?",
+    "Show me flights from Auckland",
+    "Flights to Wellington",
+    "Which aircraft are parked at Christchurch?",
+    "What is the status of aircraft ZK-NAA?",
+    "Look up booking PNR001",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_style(client: httpx.AsyncClient, style: str, total: int, concurrency: int) -> Dict:
+    """Send ``total`` /smart-query requests in ``style`` with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        payload = {"text": QUESTIONS[index % len(QUESTIONS)], "answer_style": style}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/smart-query", json=payload)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "style": style,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 95),
+        "max_ms": max(latencies) if latencies else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare /smart-query latency with template and LLM answers")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="db-router-svc under test")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per answer style")
+    parser.add_argument("--concurrency", type=int, default=10, help="In-flight requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    results = []
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        await client.get("/healthz")  # warm up the connection pool
+        # Styles run one after the other so they do not compete for the database
+        for style in ("template", "conversational"):
+            results.append(await run_style(client, style, args.requests, args.concurrency))
+
+    print(f"\n{'style':<16} {'reqs':>6} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for row in results:
+        print(
+            f"{row['style']:<16} {row['requests']:>6} {row['errors']:>6} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    template, conversational = results
+    if template["p95_ms"]:
+        print(f"\np95 conversational / template: {conversational['p95_ms'] / template['p95_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Deterministic answer templates for db-router-svc.
+
+Structured intents return a handful of well-known columns, so their answers
+are rendered directly from the rows instead of asking the LLM to rephrase
+them. Times are shown in Pacific/Auckland and airports by city name.
+"""
+
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from models import Intent
+from util import format_datetime_for_display, get_city_name
+
+# Rows listed in a multi-row answer before summarising the rest
+MAX_LISTED_ROWS = 10
+
+Row = Dict[str, Any]
+
+
+def _place(code: Optional[str]) -> str:
+    if not code:
+        return "unknown"
+    city = get_city_name(code)
+    return f"{city} ({code.upper()})" if city else code
+
+
+def _time(value: Any) -> str:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        return format_datetime_for_display(value)
+    return "not scheduled" if value is None else str(value)
+
+
+def _date(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value) if value else "unknown date"
+
+
+def _bullets(header: str, rows: List[Row], render_row: Callable[[Row], str]) -> str:
+    lines = [header]
+    lines.extend(f"- {render_row(row)}" for row in rows[:MAX_LISTED_ROWS])
+    if len(rows) > MAX_LISTED_ROWS:
+        lines.append(f"- ...and {len(rows) - MAX_LISTED_ROWS} more")
+    return "\n".join(lines)
+
+
+def _flight_line(row: Row) -> str:
+    return (
+        f"{row.get('flight_no')} {_place(row.get('origin'))} to {_place(row.get('destination'))}, "
+        f"departs {_time(row.get('sched_dep_time'))} ({row.get('status') or 'status unknown'})"
+    )
+
+
+def _flight_status(args: Dict[str, Any], rows: List[Row]) -> str:
+    row = rows[0]
+    lines = [
+        f"- Flight {row.get('flight_no')} on {_date(row.get('flight_date'))} is "
+        f"{row.get('status') or 'status unknown'}",
+        f"- {_place(row.get('origin'))} to {_place(row.get('destination'))}",
+        f"- Scheduled departure {_time(row.get('sched_dep_time'))}, "
+        f"arrival {_time(row.get('sched_arr_time'))}",
+    ]
+    if row.get("tail_number"):
+        lines.append(f"- Aircraft {row['tail_number']}")
+    return "\n".join(lines)
+
+
+def _next_flight(args: Dict[str, Any], rows: List[Row]) -> str:
+    return _bullets(f"Next flights to {_place(args.get('destination'))}:", rows, _flight_line)
+
+
+def _flights_from(args: Dict[str, Any], rows: List[Row]) -> str:
+    return _bullets(f"{len(rows)} flight(s) from {_place(args.get('origin'))}:", rows, _flight_line)
+
+
+def _flights_to(args: Dict[str, Any], rows: List[Row]) -> str:
+    return _bullets(f"{len(rows)} flight(s) to {_place(args.get('destination'))}:", rows, _flight_line)
+
+
+def _booking_lookup(args: Dict[str, Any], rows: List[Row]) -> str:
+    row = rows[0]
+    lines = [
+        f"- Booking {row.get('pnr')} for {row.get('passenger_name')}",
+        f"- Flight {row.get('flight_no')} on {_date(row.get('flight_date'))}",
+    ]
+    if str(row.get("has_connection") or "").lower() in ("true", "yes", "y", "1") and row.get("connecting_flight_no"):
+        lines.append(f"- Connecting to {row['connecting_flight_no']}")
+    return "\n".join(lines)
+
+
+def _crew_for_flight(args: Dict[str, Any], rows: List[Row]) -> str:
+    first = rows[0]
+    return _bullets(
+        f"Crew for {first.get('flight_no')} on {_date(first.get('flight_date'))}:",
+        rows,
+        lambda row: f"{row.get('crew_role')}: {row.get('crew_name')} ({row.get('crew_id')})",
+    )
+
+
+def _aircraft_status(args: Dict[str, Any], rows: List[Row]) -> str:
+    row = rows[0]
+    return (
+        f"- Aircraft {row.get('tail_number')} is at {_place(row.get('current_location'))}\n"
+        f"- Status: {row.get('status') or 'unknown'}"
+    )
+
+
+def _passenger_count(args: Dict[str, Any], rows: List[Row]) -> str:
+    row = rows[0]
+    return (
+        f"- {row.get('flight_no')} on {_date(row.get('flight_date'))} has "
+        f"{row.get('passenger_count')} booked passenger(s)"
+    )
+
+
+def _crew_availability(args: Dict[str, Any], rows: List[Row]) -> str:
+    return _bullets(
+        f"{len(rows)} crew member(s) available:",
+        rows,
+        lambda row: (
+            f"{row.get('crew_name')} ({row.get('crew_id')}), on duty from {_time(row.get('duty_start_time'))}, "
+            f"max {row.get('max_duty_hours')}h"
+        ),
+    )
+
+
+def _aircraft_by_location(args: Dict[str, Any], rows: List[Row]) -> str:
+    return _bullets(
+        f"{len(rows)} aircraft at {_place(args.get('location'))}:",
+        rows,
+        lambda row: f"{row.get('tail_number')} ({row.get('status') or 'status unknown'})",
+    )
+
+
+ANSWER_TEMPLATES: Dict[Intent, Callable[[Dict[str, Any], List[Row]], str]] = {
+    Intent.FLIGHT_STATUS: _flight_status,
+    Intent.NEXT_FLIGHT: _next_flight,
+    Intent.FLIGHTS_FROM: _flights_from,
+    Intent.FLIGHTS_TO: _flights_to,
+    Intent.BOOKING_LOOKUP: _booking_lookup,
+    Intent.CREW_FOR_FLIGHT: _crew_for_flight,
+    Intent.AIRCRAFT_STATUS: _aircraft_status,
+    Intent.PASSENGER_COUNT: _passenger_count,
+    Intent.CREW_AVAILABILITY: _crew_availability,
+    Intent.AIRCRAFT_BY_LOCATION: _aircraft_by_location,
+}
+
+
+def render_answer(intent: Intent, args: Dict[str, Any], rows: List[Row]) -> Optional[str]:
+    """
+    Render rows for a structured intent without the LLM.
+
+    Returns:
+        The answer, or None when the intent has no template
+    """
+    template = ANSWER_TEMPLATES.get(intent)
+    if template is None:
+        return None
+    if not rows:
+        return "No results found for your query."
+    return template(args, rows)
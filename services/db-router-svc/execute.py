@@ -2,15 +2,21 @@
 SQL execution module for db-router-svc.
 
 This module provides whitelisted SQL templates and execution functions
-for safe database queries.
+for safe database queries. Each template is prepared on a pooled
+connection the first time it runs there, and results are kept in a short-TTL cache that is also flushed
+when the tables an intent reads from change.
 """
 
 import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, List, Tuple, Optional
 import asyncpg
 from loguru import logger
 from models import Intent
+from util import mask_pii_data
+from services.shared.base_service import DB_QUERY_LATENCY
 
 
 # Whitelisted SQL templates with parameterized queries
@@ -130,21 +136,239 @@ INTENT_SQL = {
     ),
 }
 
+# Batched variants of the keyed lookups: the first INTENT_SQL parameter becomes an
+# array matched with = ANY($1), the others are shared by every item in the batch,
+# and per-item ordering and LIMITs are kept with DISTINCT ON or row_number().
+# Values are (SQL, column holding the key in each returned row).
+BATCH_SQL = {
+    Intent.FLIGHT_STATUS: (
+        """
+        SELECT DISTINCT ON (flight_no)
+               flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status, tail_number
+        FROM flights
+        WHERE flight_no = ANY($1::text[])
+          AND ($2::date IS NULL OR flight_date = $2::date)
+        ORDER BY flight_no, flight_date DESC, sched_dep_time DESC
+        """,
+        "flight_no"
+    ),
+
+    Intent.NEXT_FLIGHT: (
+        """
+        SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status
+        FROM (
+            SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status,
+                   row_number() OVER (PARTITION BY destination ORDER BY sched_dep_time ASC) AS position
+            FROM flights
+            WHERE destination = ANY($1::text[])
+              AND ($2::text IS NULL OR origin = $2::text)
+              AND sched_dep_time > $3::timestamp
+        ) ranked
+        WHERE position <= 3
+        ORDER BY destination, sched_dep_time ASC
+        """,
+        "destination"
+    ),
+
+    Intent.FLIGHTS_FROM: (
+        """
+        SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status
+        FROM (
+            SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status,
+                   row_number() OVER (PARTITION BY origin ORDER BY sched_dep_time ASC) AS position
+            FROM flights
+            WHERE origin = ANY($1::text[])
+              AND ($2::date IS NULL OR flight_date = $2::date)
+        ) ranked
+        WHERE position <= 20
+        ORDER BY origin, sched_dep_time ASC
+        """,
+        "origin"
+    ),
+
+    Intent.FLIGHTS_TO: (
+        """
+        SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status
+        FROM (
+            SELECT flight_no, flight_date, origin, destination, sched_dep_time, sched_arr_time, status,
+                   row_number() OVER (PARTITION BY destination ORDER BY sched_dep_time ASC) AS position
+            FROM flights
+            WHERE destination = ANY($1::text[])
+              AND ($2::date IS NULL OR flight_date = $2::date)
+        ) ranked
+        WHERE position <= 20
+        ORDER BY destination, sched_dep_time ASC
+        """,
+        "destination"
+    ),
+
+    Intent.BOOKING_LOOKUP: (
+        """
+        SELECT DISTINCT ON (pnr) pnr, passenger_name, flight_no, flight_date, has_connection, connecting_flight_no
+        FROM bookings
+        WHERE pnr = ANY($1::text[])
+        ORDER BY pnr
+        """,
+        "pnr"
+    ),
+
+    Intent.CREW_FOR_FLIGHT: (
+        """
+        SELECT crew_id, crew_name, flight_no, flight_date, crew_role
+        FROM (
+            SELECT r.crew_id, d.crew_name, r.flight_no, r.flight_date, r.crew_role,
+                   row_number() OVER (PARTITION BY r.flight_no) AS position
+            FROM crew_roster r
+            JOIN crew_details d USING (crew_id)
+            WHERE r.flight_no = ANY($1::text[]) AND r.flight_date = $2
+        ) ranked
+        WHERE position <= 20
+        """,
+        "flight_no"
+    ),
+
+    Intent.AIRCRAFT_STATUS: (
+        """
+        SELECT DISTINCT ON (tail_number) tail_number, current_location, status
+        FROM aircraft_status
+        WHERE tail_number = ANY($1::text[])
+        ORDER BY tail_number
+        """,
+        "tail_number"
+    ),
+
+    Intent.PASSENGER_COUNT: (
+        """
+        SELECT COUNT(*) as passenger_count, flight_no, flight_date
+        FROM bookings
+        WHERE flight_no = ANY($1::text[]) AND flight_date = $2
+        GROUP BY flight_no, flight_date
+        """,
+        "flight_no"
+    ),
+
+    Intent.AIRCRAFT_BY_LOCATION: (
+        """
+        SELECT tail_number, current_location, status
+        FROM (
+            SELECT tail_number, current_location, status,
+                   row_number() OVER (PARTITION BY current_location ORDER BY tail_number) AS position
+            FROM aircraft_status
+            WHERE current_location = ANY($1::text[])
+        ) ranked
+        WHERE position <= 20
+        ORDER BY current_location, tail_number
+        """,
+        "current_location"
+    ),
+}
+
+# Tables each whitelisted query reads; a change to any of them drops cached results
+INTENT_TABLES = {
+    Intent.FLIGHT_STATUS: ("flights",),
+    Intent.NEXT_FLIGHT: ("flights",),
+    Intent.FLIGHTS_FROM: ("flights",),
+    Intent.FLIGHTS_TO: ("flights",),
+    Intent.BOOKING_LOOKUP: ("bookings",),
+    Intent.CREW_FOR_FLIGHT: ("crew_roster", "crew_details"),
+    Intent.AIRCRAFT_STATUS: ("aircraft_status",),
+    Intent.PASSENGER_COUNT: ("bookings",),
+    Intent.CREW_AVAILABILITY: ("crew_details",),
+    Intent.AIRCRAFT_BY_LOCATION: ("aircraft_status",),
+}
+
+# Write counters per table; polled to notice changes made by other services
+TABLE_CHANGES_SQL = """
+    SELECT relname, n_tup_ins + n_tup_upd + n_tup_del AS changes
+    FROM pg_stat_user_tables
+    WHERE relname = ANY($1::text[])
+"""
+
+
+class QueryResultCache:
+    """LRU cache of query results with a TTL, invalidated per table."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.counts = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.counts["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counts["hits"] += 1
+        return entry[1]
+
+    def put(self, key: tuple, results: List[Dict[str, Any]]) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tables: Optional[List[str]] = None) -> int:
+        """Drop results read from any of ``tables`` (everything when None); returns entries dropped."""
+        if tables is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            changed = set(tables)
+            stale = [key for key in self._entries if changed.intersection(INTENT_TABLES[key[0]])]
+            for key in stale:
+                del self._entries[key]
+            dropped = len(stale)
+        if dropped:
+            self.counts["invalidations"] += 1
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counts["hits"] + self.counts["misses"]
+        return {
+            **self.counts,
+            "hit_rate": round(self.counts["hits"] / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "ttl": self.ttl,
+        }
+
 
 class DatabaseExecutor:
     """Handles database connections and query execution."""
     
-    def __init__(self, database_url: str, max_connections: int = 10):
+    def __init__(
+        self,
+        database_url: str,
+        max_connections: int = 10,
+        cache_size: int = 1024,
+        cache_ttl: float = 5.0,
+        watch_interval: float = 1.0
+    ):
         """
         Initialize database executor.
         
         Args:
             database_url: PostgreSQL connection URL
             max_connections: Maximum number of connections in pool
+            cache_size: Maximum cached query results (0 disables the cache)
+            cache_ttl: Seconds a cached result stays valid
+            watch_interval: Seconds between checks for table changes (0 disables)
         """
         self.database_url = database_url
         self.max_connections = max_connections
         self.pool: Optional[asyncpg.Pool] = None
+        self.result_cache = QueryResultCache(max_size=cache_size, ttl=cache_ttl)
+        self.watch_interval = watch_interval
+        # Prepared INTENT_SQL/BATCH_SQL statements by SQL text (None if unpreparable), per pooled connection
+        # backend PID; batch statements are only prepared on connections that have run a batch
+        self._statements: Dict[int, Dict[str, Optional[asyncpg.prepared_stmt.PreparedStatement]]] = {}
+        self._table_changes: Dict[str, int] = {}
+        self._watch_task: Optional[asyncio.Task] = None
     
     async def initialize(self):
         """Initialize database connection pool."""
@@ -163,12 +387,68 @@ class DatabaseExecutor:
         except Exception as e:
             logger.error(f"Failed to initialize database pool: {e}")
             raise
+
+        if self.watch_interval > 0 and self.result_cache.max_size > 0:
+            self._watch_task = asyncio.create_task(self._watch_tables())
     
     async def close(self):
         """Close database connection pool."""
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._watch_task = None
         if self.pool:
             await self.pool.close()
+            self.pool = None
+            self._statements.clear()
             logger.info("Database connection pool closed")
+
+    async def _statement(
+        self, conn: asyncpg.Connection, sql_template: str
+    ) -> Optional[asyncpg.prepared_stmt.PreparedStatement]:
+        """
+        The connection's prepared copy of a whitelisted statement, preparing it on first use.
+        
+        A statement that fails to prepare (e.g. its tables do not exist yet) is
+        remembered as None for the life of the connection and run unprepared,
+        so one bad template never takes the pool down.
+        """
+        pid = conn.get_server_pid()
+        statements = self._statements.get(pid)
+        if statements is None:
+            statements = self._statements[pid] = {}
+            conn.add_termination_listener(lambda _: self._statements.pop(pid, None))
+        if sql_template not in statements:
+            try:
+                statements[sql_template] = await conn.prepare(sql_template)
+            except Exception as e:
+                logger.warning(f"Could not prepare statement, running it unprepared: {e}")
+                statements[sql_template] = None
+        return statements[sql_template]
+
+    async def _watch_tables(self):
+        """Flush cached results when pg_stat_user_tables shows writes to the tables they read."""
+        tables = sorted({table for names in INTENT_TABLES.values() for table in names})
+        while True:
+            try:
+                async with self.pool.acquire() as conn:
+                    rows = await conn.fetch(TABLE_CHANGES_SQL, tables)
+                changed = [
+                    row["relname"] for row in rows
+                    if self._table_changes.get(row["relname"], row["changes"]) != row["changes"]
+                ]
+                self._table_changes = {row["relname"]: row["changes"] for row in rows}
+                if changed:
+                    dropped = self.result_cache.invalidate(changed)
+                    logger.debug(f"Tables changed: {changed}; dropped {dropped} cached results")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Table change check failed: {e}")
+            await asyncio.sleep(self.watch_interval)
     
     async def execute_query(
         self, 
@@ -185,7 +465,8 @@ class DatabaseExecutor:
             role: User role for PII masking
             
         Returns:
-            Tuple of (results, row_count)
+            Tuple of (results, row_count); cached results are shared, so
+            callers must not modify them
         """
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
@@ -193,10 +474,99 @@ class DatabaseExecutor:
         if intent not in INTENT_SQL:
             raise ValueError(f"Unknown intent: {intent}")
         
-        sql_template, param_names = INTENT_SQL[intent]
+        start_time = time.perf_counter()
+        sql_template, _ = INTENT_SQL[intent]
+        params, key_params = self._bind_params(intent, args)
+
+        cache_key = (intent, key_params, role)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            DB_QUERY_LATENCY.labels("db-router-svc", intent.value, "cache").observe(time.perf_counter() - start_time)
+            logger.debug(f"Query result cache hit for intent {intent}")
+            return cached, len(cached)
+        
+        logger.debug(f"Executing query for intent {intent} with params: {params}")
         
-        # Prepare parameters in the correct order
+        try:
+            rows = await self._fetch(sql_template, params)
+            results = self._to_results(rows, role)
+            self.result_cache.put(cache_key, results)
+            DB_QUERY_LATENCY.labels("db-router-svc", intent.value, "database").observe(time.perf_counter() - start_time)
+            logger.info(f"Query executed successfully: {len(results)} rows returned")
+            return results, len(results)
+                
+        except asyncio.TimeoutError:
+            logger.error(f"Query timeout for intent {intent}")
+            raise RuntimeError("Query execution timeout")
+        except Exception as e:
+            logger.error(f"Query execution failed for intent {intent}: {e}")
+            raise
+
+    async def execute_batch(
+        self,
+        intent: Intent,
+        args_list: List[Dict[str, Any]],
+        role: str = "public"
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Execute many lookups for one intent with as few queries as possible.
+        
+        Items are answered from the result cache where possible; the rest are
+        grouped by their shared (non-key) arguments and each group runs as a
+        single BATCH_SQL query. Intents without a batched form run item by item.
+        
+        Args:
+            intent: Query intent shared by every item
+            args_list: Query arguments per item
+            role: User role for PII masking
+            
+        Returns:
+            Result rows per item, in the order of ``args_list``
+        """
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        if intent not in BATCH_SQL:
+            outcomes = await asyncio.gather(*(self.execute_query(intent, args, role) for args in args_list))
+            return [rows for rows, _ in outcomes]
+
+        start_time = time.perf_counter()
+        batch_sql, key_column = BATCH_SQL[intent]
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(args_list)
+        # (shared cache-key params) -> (shared bound params, {key value: [item indexes]})
+        groups: Dict[tuple, Tuple[List[Any], Dict[Any, List[int]]]] = {}
+        for index, args in enumerate(args_list):
+            params, key_params = self._bind_params(intent, args)
+            cached = self.result_cache.get((intent, key_params, role))
+            if cached is not None:
+                results[index] = cached
+                continue
+            _, keys = groups.setdefault(key_params[1:], (params[1:], {}))
+            keys.setdefault(params[0], []).append(index)
+
+        for shared_key, (shared_params, keys) in groups.items():
+            try:
+                rows = await self._fetch(batch_sql, [list(keys), *shared_params])
+            except asyncio.TimeoutError:
+                logger.error(f"Batch query timeout for intent {intent}")
+                raise RuntimeError("Query execution timeout")
+            by_key: Dict[Any, List[Dict[str, Any]]] = {key: [] for key in keys}
+            for row in self._to_results(rows, role):
+                by_key.setdefault(row[key_column], []).append(row)
+            for key, indexes in keys.items():
+                self.result_cache.put((intent, (key, *shared_key), role), by_key[key])
+                for index in indexes:
+                    results[index] = by_key[key]
+
+        DB_QUERY_LATENCY.labels("db-router-svc", intent.value, "batch").observe(time.perf_counter() - start_time)
+        logger.info(f"Batch executed for intent {intent}: {len(args_list)} items in {len(groups)} queries")
+        return results
+
+    def _bind_params(self, intent: Intent, args: Dict[str, Any]) -> Tuple[List[Any], tuple]:
+        """Query parameters in INTENT_SQL order, plus the matching result-cache key parameters."""
+        _, param_names = INTENT_SQL[intent]
         params = []
+        key_params = []
         for param_name in param_names:
             value = args.get(param_name)
 
@@ -206,37 +576,31 @@ class DatabaseExecutor:
                     value = None
 
             if param_name == "after_time":
+                # Key on the phrase ("now"), not the timestamp it resolves to
+                key_params.append(str(value or "now").strip().lower())
                 value = self._normalize_after_time(value)
+            else:
+                key_params.append(value)
 
             params.append(value)
-        
-        logger.debug(f"Executing query for intent {intent} with params: {params}")
-        
-        try:
-            async with self.pool.acquire() as conn:
-                # Execute query with timeout
-                rows = await asyncio.wait_for(
-                    conn.fetch(sql_template, *params),
-                    timeout=2.0
-                )
-                
-                # Convert rows to dictionaries
-                results = [dict(row) for row in rows]
-                
-                # Apply PII masking based on role
-                if role != "agent" and role != "admin":
-                    from util import mask_pii_data
-                    results = [mask_pii_data(row, role) for row in results]
-                
-                logger.info(f"Query executed successfully: {len(results)} rows returned")
-                return results, len(results)
-                
-        except asyncio.TimeoutError:
-            logger.error(f"Query timeout for intent {intent}")
-            raise RuntimeError("Query execution timeout")
-        except Exception as e:
-            logger.error(f"Query execution failed for intent {intent}: {e}")
-            raise
+        return params, tuple(key_params)
+
+    async def _fetch(self, sql_template: str, params: List[Any]) -> List[asyncpg.Record]:
+        """Run a whitelisted statement, using the connection's prepared copy when available."""
+        async with self.pool.acquire() as conn:
+            statement = await asyncio.wait_for(self._statement(conn, sql_template), timeout=2.0)
+            # Execute query with timeout
+            return await asyncio.wait_for(
+                statement.fetch(*params) if statement else conn.fetch(sql_template, *params),
+                timeout=2.0
+            )
+
+    @staticmethod
+    def _to_results(rows: List[asyncpg.Record], role: str) -> List[Dict[str, Any]]:
+        """Convert rows to dictionaries, masking PII based on role."""
+        if role != "agent" and role != "admin":
+            return [mask_pii_data(dict(row), role) for row in rows]
+        return [dict(row) for row in rows]
 
     @staticmethod
     def _normalize_after_time(value: Optional[Any]) -> datetime:
@@ -283,16 +647,17 @@ class DatabaseExecutor:
 _executor: Optional[DatabaseExecutor] = None
 
 
-async def initialize_database(database_url: str, max_connections: int = 10):
+async def initialize_database(database_url: str, max_connections: int = 10, **cache_options):
     """
     Initialize the global database executor.
     
     Args:
         database_url: PostgreSQL connection URL
         max_connections: Maximum number of connections in pool
+        **cache_options: cache_size, cache_ttl and watch_interval for DatabaseExecutor
     """
     global _executor
-    _executor = DatabaseExecutor(database_url, max_connections)
+    _executor = DatabaseExecutor(database_url, max_connections, **cache_options)
     await _executor.initialize()
 
 
@@ -341,12 +706,48 @@ async def get_database_health() -> Dict[str, Any]:
         return {
             "status": "healthy" if is_healthy else "unhealthy",
             "pool_size": _executor.pool.get_size() if _executor.pool else 0,
-            "max_connections": _executor.max_connections
+            "max_connections": _executor.max_connections,
+            "prepared_connections": len(_executor._statements),
+            "result_cache": _executor.result_cache.stats()
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
 
+async def execute_intent_batch(
+    intent: Intent,
+    args_list: List[Dict[str, Any]],
+    role: str = "public"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Execute same-intent queries for many items, grouped into batched SQL.
+    
+    Args:
+        intent: Query intent shared by every item
+        args_list: Query arguments per item
+        role: User role for PII masking
+        
+    Returns:
+        Result rows per item, in the order of ``args_list``
+    """
+    if not _executor:
+        raise RuntimeError("Database not initialized")
+    
+    return await _executor.execute_batch(intent, args_list, role)
+
+
+def invalidate_query_cache(tables: Optional[List[str]] = None) -> int:
+    """
+    Drop cached query results that read from ``tables`` (all when None).
+    
+    Returns:
+        Number of cached results dropped
+    """
+    if not _executor:
+        return 0
+    return _executor.result_cache.invalidate(tables)
+
+
 def get_supported_intents() -> List[str]:
     """
     Get list of supported intents.
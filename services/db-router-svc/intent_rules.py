@@ -0,0 +1,217 @@
+"""
+Rule-based intent classifier for db-router-svc.
+
+A compiled fast path for the high-volume, templated intents in INTENT_SQL
+("flights from AKL", "next flight to WLG", "aircraft at CHC", "crew for
+NZ123 on 2026-03-15", ...). It runs on text whose city names have already
+been normalized to IATA codes and whose relative dates have been resolved,
+and returns a RouteResponse with a confidence score. Queries no rule is
+confident about are left to the LLM router.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+from models import Intent, RouteResponse
+from util import NZ_TZ, normalize_flight_number, normalize_time_phrase, validate_iata_code
+
+# Penalty applied per competing intent's keywords found in the query
+CONFLICT_PENALTY = 0.2
+
+FLIGHT_NO = re.compile(r"\bNZ\s?\d{2,4}\b", re.IGNORECASE)
+TAIL_NUMBER = re.compile(r"\bZK-?([A-Z]{3})\b", re.IGNORECASE)
+PNR = re.compile(r"\b(?=[A-Z0-9]*\d)(?=[A-Z0-9]*[A-Z])[A-Z0-9]{6}\b", re.IGNORECASE)
+NEXT = re.compile(r"\bnext\b", re.IGNORECASE)
+# "next week" etc. are dates, not a next-flight question
+NEXT_FLIGHT = re.compile(r"\bnext\s+(?:available\s+)?(?:flights?|departures?|services?)\b", re.IGNORECASE)
+# "after 3pm", "from 15:30", "at 9:05am"; a bare hour only counts after "after"
+EXPLICIT_TIME = re.compile(
+    r"\b(after|from|at|departing|leaving)\s+(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?(?![\w:-])", re.IGNORECASE
+)
+FLIGHT_WORDS = re.compile(r"\b(?:flights?|departures?|arrivals?|services?)\b", re.IGNORECASE)
+FROM_AIRPORT = re.compile(r"\b(?:from|out of|leaving|departing)\s+([A-Z]{3})\b", re.IGNORECASE)
+TO_AIRPORT = re.compile(r"\b(?:to|into|arriving (?:at|in)|landing (?:at|in)|bound for)\s+([A-Z]{3})\b", re.IGNORECASE)
+AIRPORT_DEPARTURES = re.compile(r"\b([A-Z]{3})\s+departures\b", re.IGNORECASE)
+AIRPORT_ARRIVALS = re.compile(r"\b([A-Z]{3})\s+arrivals\b", re.IGNORECASE)
+AIRCRAFT_WORDS = re.compile(r"\b(?:aircraft|planes?|tails?|fleet)\b", re.IGNORECASE)
+AT_AIRPORT = re.compile(r"\b(?:at|in|parked at|located at|on the ground at)\s+([A-Z]{3})\b", re.IGNORECASE)
+BOOKING_WORDS = re.compile(r"\b(?:pnr|booking|reservation|booking reference)\b", re.IGNORECASE)
+PASSENGER_COUNT_WORDS = re.compile(
+    r"\b(?:how many passengers|number of passengers|passenger count|pax count|how many pax)\b", re.IGNORECASE
+)
+
+# Keywords that point at each intent; seeing another intent's keywords lowers confidence
+INTENT_KEYWORDS = {
+    Intent.CREW_FOR_FLIGHT: re.compile(
+        r"\b(?:crew|pilots?|captain|first officer|flight attendants?|cabin crew|staffing)\b", re.IGNORECASE
+    ),
+    Intent.PASSENGER_COUNT: re.compile(r"\b(?:passengers?|pax|load factor)\b", re.IGNORECASE),
+    Intent.BOOKING_LOOKUP: BOOKING_WORDS,
+    Intent.AIRCRAFT_BY_LOCATION: AIRCRAFT_WORDS,
+}
+
+# Keywords shared by closely related intents are not treated as conflicts
+RELATED_INTENTS = {
+    Intent.AIRCRAFT_STATUS: {Intent.AIRCRAFT_BY_LOCATION},
+}
+
+RuleResult = Optional[Tuple[Dict[str, Any], float]]
+
+
+def _airport(pattern: re.Pattern, text: str) -> Optional[str]:
+    """First match of ``pattern`` that is a known IATA code."""
+    for match in pattern.finditer(text):
+        code = match.group(1).upper()
+        if validate_iata_code(code):
+            return code
+    return None
+
+
+def _explicit_time(text: str, date: Optional[str]) -> Optional[str]:
+    """UTC ISO timestamp for a clock time in the query, on ``date`` (NZ local) or today."""
+    for match in EXPLICIT_TIME.finditer(text):
+        keyword, hour, minute, meridiem = match.groups()
+        if not minute and not meridiem and keyword.lower() != "after":
+            continue
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            if not 1 <= hour <= 12:
+                continue
+            hour = hour % 12 + (12 if meridiem.lower().startswith("p") else 0)
+        if hour > 23 or minute > 59:
+            continue
+        day = datetime.strptime(date, "%Y-%m-%d") if date else datetime.now(NZ_TZ)
+        local = NZ_TZ.localize(datetime(day.year, day.month, day.day, hour, minute))
+        return local.astimezone(pytz.UTC).isoformat()
+    return None
+
+
+def _next_flight(text: str, date: Optional[str]) -> RuleResult:
+    if not NEXT_FLIGHT.search(text):
+        return None
+    destination = _airport(TO_AIRPORT, text)
+    if not destination:
+        return None
+    after_time = _explicit_time(text, date)
+    if after_time is None:
+        after_time = normalize_time_phrase(date).isoformat() if date else "now"
+    return {"destination": destination, "origin": _airport(FROM_AIRPORT, text), "after_time": after_time}, 0.9
+
+
+def _flights_from(text: str, date: Optional[str]) -> RuleResult:
+    if NEXT.search(text) or _airport(TO_AIRPORT, text):
+        return None
+    origin = _airport(AIRPORT_DEPARTURES, text)
+    if not origin and FLIGHT_WORDS.search(text):
+        origin = _airport(FROM_AIRPORT, text)
+    if not origin:
+        return None
+    return {"origin": origin, "date": date}, 0.9
+
+
+def _flights_to(text: str, date: Optional[str]) -> RuleResult:
+    if NEXT.search(text) or _airport(FROM_AIRPORT, text):
+        return None
+    destination = _airport(AIRPORT_ARRIVALS, text)
+    if not destination and FLIGHT_WORDS.search(text):
+        destination = _airport(TO_AIRPORT, text)
+    if not destination:
+        return None
+    return {"destination": destination, "date": date}, 0.9
+
+
+def _aircraft_by_location(text: str, date: Optional[str]) -> RuleResult:
+    if not AIRCRAFT_WORDS.search(text) or TAIL_NUMBER.search(text):
+        return None
+    location = _airport(AT_AIRPORT, text)
+    if not location:
+        return None
+    return {"location": location}, 0.9
+
+
+def _aircraft_status(text: str, date: Optional[str]) -> RuleResult:
+    match = TAIL_NUMBER.search(text)
+    if not match:
+        return None
+    return {"tail_number": f"ZK-{match.group(1).upper()}"}, 0.9
+
+
+def _booking_lookup(text: str, date: Optional[str]) -> RuleResult:
+    if not BOOKING_WORDS.search(text):
+        return None
+    for match in PNR.finditer(text):
+        code = match.group(0).upper()
+        if not FLIGHT_NO.fullmatch(code):
+            return {"pnr": code}, 0.9
+    return None
+
+
+def _crew_for_flight(text: str, date: Optional[str]) -> RuleResult:
+    flight_no = normalize_flight_number(text)
+    if not flight_no or not INTENT_KEYWORDS[Intent.CREW_FOR_FLIGHT].search(text):
+        return None
+    # The roster query needs a date; without one the LLM decides
+    return {"flight_no": flight_no, "date": date}, 0.9 if date else 0.6
+
+
+def _passenger_count(text: str, date: Optional[str]) -> RuleResult:
+    flight_no = normalize_flight_number(text)
+    if not flight_no or not PASSENGER_COUNT_WORDS.search(text):
+        return None
+    return {"flight_no": flight_no, "date": date}, 0.9 if date else 0.6
+
+
+RULES: List[Tuple[Intent, Callable[[str, Optional[str]], RuleResult]]] = [
+    (Intent.CREW_FOR_FLIGHT, _crew_for_flight),
+    (Intent.PASSENGER_COUNT, _passenger_count),
+    (Intent.BOOKING_LOOKUP, _booking_lookup),
+    (Intent.AIRCRAFT_STATUS, _aircraft_status),
+    (Intent.AIRCRAFT_BY_LOCATION, _aircraft_by_location),
+    (Intent.NEXT_FLIGHT, _next_flight),
+    (Intent.FLIGHTS_FROM, _flights_from),
+    (Intent.FLIGHTS_TO, _flights_to),
+]
+
+
+class IntentRuleClassifier:
+    """Compiled keyword/pattern rules with confidence scoring for templated queries."""
+
+    def __init__(self, threshold: float = 0.8):
+        """
+        Initialize the classifier.
+
+        Args:
+            threshold: Minimum confidence for a rule decision to be used instead of the LLM
+        """
+        self.threshold = threshold
+
+    def score(self, text: str, date: Optional[str] = None) -> List[RouteResponse]:
+        """All matching rule decisions for ``text``, most confident first."""
+        candidates = []
+        for intent, rule in RULES:
+            result = rule(text, date)
+            if result is None:
+                continue
+            args, confidence = result
+            conflicts = sum(
+                1 for other, keywords in INTENT_KEYWORDS.items()
+                if other != intent
+                and other not in RELATED_INTENTS.get(intent, ())
+                and keywords.search(text)
+            )
+            confidence = max(0.0, round(confidence - CONFLICT_PENALTY * conflicts, 2))
+            candidates.append(RouteResponse(intent=intent, args=args, confidence=confidence))
+        candidates.sort(key=lambda response: response.confidence, reverse=True)
+        return candidates
+
+    def classify(self, text: str, date: Optional[str] = None) -> Optional[RouteResponse]:
+        """Best rule decision if it clears the threshold and is not tied with another intent."""
+        candidates = self.score(text, date)
+        if not candidates or candidates[0].confidence < self.threshold:
+            return None
+        if len(candidates) > 1 and candidates[1].confidence == candidates[0].confidence:
+            return None
+        return candidates[0]
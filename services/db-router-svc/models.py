@@ -12,6 +12,10 @@ from datetime import datetime
 import re
 
 
+# How /smart-query turns rows into an answer
+ANSWER_STYLES = ("template", "conversational")
+
+
 class Intent(str, Enum):
     """Available database query intents."""
     FLIGHT_STATUS = "flight_status"
@@ -46,6 +50,11 @@ class SmartQueryRequest(BaseModel):
         default_factory=lambda: {"role": "public"}, 
         description="Authentication context with role information"
     )
+    answer_style: Optional[str] = Field(
+        None,
+        description="'template' renders rows directly, 'conversational' has the LLM phrase them; "
+                    "defaults to the service's ANSWER_STYLE"
+    )
 
     @validator('auth')
     def validate_auth_role(cls, v):
@@ -55,6 +64,13 @@ class SmartQueryRequest(BaseModel):
             raise ValueError(f"Role must be one of {allowed_roles}")
         return v
 
+    @validator('answer_style')
+    def validate_answer_style(cls, v):
+        """Validate that the answer style is known."""
+        if v is not None and v not in ANSWER_STYLES:
+            raise ValueError(f"answer_style must be one of {ANSWER_STYLES}")
+        return v
+
 
 class SmartQueryResponse(BaseModel):
     """Response model for /smart-query endpoint."""
@@ -65,12 +81,73 @@ class SmartQueryResponse(BaseModel):
     metadata: Dict[str, Any] = Field(..., description="Additional metadata about the query")
 
 
+class SmartQueryBatchRequest(BaseModel):
+    """Request model for /smart-query/batch endpoint."""
+    questions: List[str] = Field(
+        ..., min_length=1, max_length=100, description="Natural language query texts"
+    )
+    auth: Dict[str, str] = Field(
+        default_factory=lambda: {"role": "public"},
+        description="Authentication context with role information"
+    )
+    answer_style: Optional[str] = Field(
+        None,
+        description="'template' or 'conversational'; defaults to the service's ANSWER_STYLE"
+    )
+
+    @validator('questions')
+    def validate_questions(cls, v):
+        """Validate each question like SmartQueryRequest.text."""
+        for text in v:
+            if not text or not text.strip() or len(text) > 500:
+                raise ValueError("Each question must be 1-500 characters")
+        return v
+
+    @validator('auth')
+    def validate_auth_role(cls, v):
+        """Validate that role is one of the allowed values."""
+        allowed_roles = {"public", "agent", "admin"}
+        if v.get("role") not in allowed_roles:
+            raise ValueError(f"Role must be one of {allowed_roles}")
+        return v
+
+    @validator('answer_style')
+    def validate_answer_style(cls, v):
+        """Validate that the answer style is known."""
+        if v is not None and v not in ANSWER_STYLES:
+            raise ValueError(f"answer_style must be one of {ANSWER_STYLES}")
+        return v
+
+
+class SmartQueryBatchItem(BaseModel):
+    """Result for one question of a /smart-query/batch request."""
+    index: int = Field(..., description="Position of the question in the request")
+    text: str = Field(..., description="Question text")
+    answer: Optional[str] = Field(None, description="Formatted answer, when the question succeeded")
+    rows: List[Dict[str, Any]] = Field(default_factory=list, description="Raw database results")
+    intent: Optional[Intent] = Field(None, description="Detected intent for the question")
+    args: Dict[str, Any] = Field(default_factory=dict, description="Extracted arguments for the intent")
+    confidence: Optional[float] = Field(None, description="Routing confidence")
+    error: Optional[str] = Field(None, description="Why the question failed, if it did")
+
+
+class SmartQueryBatchResponse(BaseModel):
+    """Response model for /smart-query/batch endpoint."""
+    results: List[SmartQueryBatchItem] = Field(..., description="Per-question results in request order")
+    metadata: Dict[str, Any] = Field(..., description="Batch-level metadata")
+
+
 class HealthResponse(BaseModel):
     """Response model for health check endpoint."""
     status: str = Field(..., description="Service health status")
     timestamp: datetime = Field(..., description="Current timestamp")
 
 
+class CacheInvalidateRequest(BaseModel):
+    """Request model for dropping cached query results."""
+    tables: Optional[List[str]] = Field(None, description="Changed tables; all cached results when omitted")
+
+
 class IntentArgs(BaseModel):
     """Base model for intent arguments with common validators."""
     pass
@@ -1,32 +1,82 @@
 """
 LLM routing module for db-router-svc.
 
-This module handles natural language to intent routing using LLM function calling.
+This module handles natural language to intent routing. Knowledge base and
+flight number patterns, a compiled rule classifier and a cache of previous
+decisions are tried in turn before falling back to LLM function calling.
 """
 
 import re
 import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 from loguru import logger
 import json
 
 from models import Intent, RouteResponse
+from intent_rules import IntentRuleClassifier
 from util import normalize_city_to_iata, normalize_flight_number, normalize_time_phrase, extract_date_from_text
 from services.shared.llm_client import LLMClient
 
+RELATIVE_DATE_PATTERN = re.compile(r"\b(today|tomorrow|yesterday)\b", re.IGNORECASE)
+ROUTING_LAYERS = ("knowledge_base_pattern", "rules", "flight_number_pattern", "cache", "llm", "fallback")
+
+
+class RouteCache:
+    """LRU cache of routing decisions with a TTL, keyed on the normalized query."""
+
+    def __init__(self, max_size: int = 2048, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, RouteResponse]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[RouteResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response.model_copy(deep=True)
+
+    def put(self, key: str, response: RouteResponse) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, response.model_copy(deep=True))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class QueryRouter:
     """Handles natural language query routing to database intents."""
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        cache_size: int = 2048,
+        cache_ttl: float = 3600.0,
+        rule_threshold: float = 0.8
+    ):
         """
         Initialize query router.
         
         Args:
             llm_client: LLM client for function calling
+            cache_size: Maximum cached routing decisions (0 disables the cache)
+            cache_ttl: Seconds a cached routing decision stays valid
+            rule_threshold: Minimum rule classifier confidence to skip the LLM
         """
         self.llm_client = llm_client
         self.function_schema = self._create_function_schema()
+        self.rule_classifier = IntentRuleClassifier(threshold=rule_threshold)
+        self.route_cache = RouteCache(max_size=cache_size, ttl=cache_ttl)
+        self.layer_stats = {layer: {"hits": 0, "total_ms": 0.0} for layer in ROUTING_LAYERS}
     
     def _create_function_schema(self) -> Dict[str, Any]:
         """Create the function calling schema for LLM."""
@@ -188,6 +238,33 @@ class QueryRouter:
     def _extract_date_from_text(self, text: str) -> Optional[str]:
         """Extract date from text."""
         return extract_date_from_text(text)
+
+    def _resolve_relative_dates(self, text: str) -> str:
+        """Replace today/tomorrow/yesterday with YYYY-MM-DD dates."""
+        return RELATIVE_DATE_PATTERN.sub(lambda match: extract_date_from_text(match.group(1)), text)
+
+    def _cache_key(self, normalized_text: str) -> str:
+        """Cache key for text that already has IATA codes and resolved dates."""
+        return " ".join(re.sub(r"[^\w\s-]", " ", normalized_text.lower()).split())
+
+    def _record_layer(self, layer: str, start_time: float) -> float:
+        duration_ms = (time.time() - start_time) * 1000
+        self.layer_stats[layer]["hits"] += 1
+        self.layer_stats[layer]["total_ms"] += duration_ms
+        return duration_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-layer hit counts, hit rates and mean routing latency."""
+        total = sum(stats["hits"] for stats in self.layer_stats.values())
+        layers = {
+            layer: {
+                "hits": stats["hits"],
+                "hit_rate": round(stats["hits"] / total, 4) if total else 0.0,
+                "avg_ms": round(stats["total_ms"] / stats["hits"], 3) if stats["hits"] else 0.0,
+            }
+            for layer, stats in self.layer_stats.items()
+        }
+        return {"total_routed": total, "layers": layers, "cache_size": len(self.route_cache)}
     
     async def route_query(self, text: str) -> RouteResponse:
         """
@@ -215,7 +292,7 @@ class QueryRouter:
                 args={"query": processed_text, "k": 5},
                 confidence=0.85
             )
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = self._record_layer("knowledge_base_pattern", start_time)
             logger.info(
                 "route_query exit intent={} confidence={} reason=knowledge_base_pattern duration_ms={:.2f}",
                 response.intent,
@@ -224,7 +301,26 @@ class QueryRouter:
             )
             return response
 
-        # Check for flight number pattern first (fast path)
+        # Normalize city names to IATA codes and resolve relative dates
+        processed_text = self._normalize_city_names(processed_text)
+        resolved_text = self._resolve_relative_dates(processed_text)
+        
+        # Extract date if present
+        extracted_date = self._extract_date_from_text(resolved_text)
+
+        # Compiled rules cover the templated high-volume intents
+        response = self.rule_classifier.classify(resolved_text, extracted_date)
+        if response:
+            duration_ms = self._record_layer("rules", start_time)
+            logger.info(
+                "route_query exit intent={} confidence={} reason=rules duration_ms={:.2f}",
+                response.intent,
+                response.confidence,
+                duration_ms
+            )
+            return response
+
+        # Check for flight number pattern (fast path)
         flight_no = self._extract_flight_number(processed_text)
         if flight_no and not self._has_crew_context(processed_text):
             logger.debug(f"Detected flight number pattern: {flight_no}")
@@ -233,7 +329,7 @@ class QueryRouter:
                 args={"flight_no": flight_no, "date": None},
                 confidence=0.95
             )
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = self._record_layer("flight_number_pattern", start_time)
             logger.info(
                 "route_query exit intent={} confidence={} reason=flight_number_pattern duration_ms={:.2f}",
                 response.intent,
@@ -246,12 +342,18 @@ class QueryRouter:
                 "Detected flight number pattern but crew context present; deferring to LLM routing"
             )
 
-        
-        # Normalize city names to IATA codes
-        processed_text = self._normalize_city_names(processed_text)
-        
-        # Extract date if present
-        extracted_date = self._extract_date_from_text(processed_text)
+        # Reuse an earlier LLM decision for the same normalized query
+        cache_key = self._cache_key(resolved_text)
+        response = self.route_cache.get(cache_key)
+        if response:
+            duration_ms = self._record_layer("cache", start_time)
+            logger.info(
+                "route_query exit intent={} confidence={} reason=cache duration_ms={:.2f}",
+                response.intent,
+                response.confidence,
+                duration_ms
+            )
+            return response
         
         # Create system prompt for LLM
         system_prompt = """You are a database query router for an airline system. 
@@ -296,19 +398,19 @@ class QueryRouter:
             
             if not response or "function_call" not in response:
                 logger.warning("LLM did not return a function call")
-                return self._fallback_route(processed_text)
+                return self._route_fallback(processed_text, start_time)
             
             function_call = response["function_call"]
             if function_call.name != "route_query":
                 logger.warning(f"Unexpected function call: {function_call.name}")
-                return self._fallback_route(processed_text)
+                return self._route_fallback(processed_text, start_time)
             
             # Parse function arguments
             try:
                 args = json.loads(function_call.arguments)
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse function arguments: {e}")
-                return self._fallback_route(processed_text)
+                return self._route_fallback(processed_text, start_time)
             
             intent_str = args.get("intent")
             intent_args = args.get("args", {})
@@ -319,7 +421,7 @@ class QueryRouter:
                 intent = Intent(intent_str)
             except ValueError:
                 logger.warning(f"Invalid intent: {intent_str}")
-                return self._fallback_route(processed_text)
+                return self._route_fallback(processed_text, start_time)
             
             # Add extracted date if present and not already in args
             if extracted_date and "date" not in intent_args:
@@ -350,7 +452,8 @@ class QueryRouter:
                 args=intent_args,
                 confidence=float(confidence)
             )
-            duration_ms = (time.time() - start_time) * 1000
+            self.route_cache.put(cache_key, response)
+            duration_ms = self._record_layer("llm", start_time)
             logger.info(
                 "route_query exit intent={} confidence={} duration_ms={:.2f}",
                 response.intent,
@@ -361,7 +464,13 @@ class QueryRouter:
             
         except Exception as e:
             logger.error(f"LLM routing failed: {e}")
-            return self._fallback_route(processed_text)
+            return self._route_fallback(processed_text, start_time)
+
+    def _route_fallback(self, text: str, start_time: float) -> RouteResponse:
+        """Keyword fallback for route_query, counted in the per-layer stats."""
+        response = self._fallback_route(text)
+        self._record_layer("fallback", start_time)
+        return response
 
     def _fallback_route(self, text: str) -> RouteResponse:
         """
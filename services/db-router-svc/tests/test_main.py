@@ -2,6 +2,8 @@
 Tests for db-router-svc main FastAPI application.
 """
 
+from datetime import date, datetime
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
@@ -317,12 +319,49 @@ class TestAnswerFormatting:
             Intent.FLIGHT_STATUS,
             {"flight_no": "NZ278"},
             [{"flight_no": "NZ278", "status": "on_time"}],
-            mock_llm_client
+            mock_llm_client,
+            "conversational"
         )
         
         assert result == "Flight NZ278 is on time"
         assert mock_llm_client.calls == 1
     
+    @pytest.mark.asyncio
+    async def test_format_query_answer_template_default(self):
+        """Structured intents are rendered from templates without the LLM by default."""
+        from ..main import format_query_answer
+        
+        class DummyLLM:
+            def __init__(self):
+                self.calls = 0
+
+            async def chat_completion_async(self, **kwargs):
+                self.calls += 1
+                return {"content": "Should not be called"}
+
+        mock_llm_client = DummyLLM()
+        
+        result = await format_query_answer(
+            Intent.FLIGHT_STATUS,
+            {"flight_no": "NZ278"},
+            [{
+                "flight_no": "NZ278",
+                "flight_date": date(2024, 1, 15),
+                "origin": "AKL",
+                "destination": "WLG",
+                "sched_dep_time": datetime(2024, 1, 15, 2, 30),
+                "sched_arr_time": datetime(2024, 1, 15, 3, 35),
+                "status": "on_time",
+                "tail_number": "ZK-NAA"
+            }],
+            mock_llm_client
+        )
+        
+        assert "Flight NZ278 on 2024-01-15 is on_time" in result
+        assert "Auckland (AKL) to Wellington (WLG)" in result
+        assert "2024-01-15 15:30 NZDT" in result
+        assert mock_llm_client.calls == 0
+    
     @pytest.mark.asyncio
     async def test_format_query_answer_no_results(self):
         """Test answer formatting with no results."""
@@ -367,7 +406,8 @@ class TestAnswerFormatting:
             Intent.FLIGHT_STATUS,
             {"flight_no": "NZ278"},
             [{"flight_no": "NZ278", "status": "on_time"}],
-            mock_llm_client
+            mock_llm_client,
+            "conversational"
         )
         
         assert "Found 1 result(s)" in result
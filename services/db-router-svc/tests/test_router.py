@@ -101,29 +101,86 @@ class TestQueryRouter:
 
     @pytest.mark.asyncio
     async def test_route_query_flight_number_with_crew_context(self, query_router, mock_llm_client):
-        """Flight queries mentioning crew should defer to LLM routing."""
-        mock_llm_client.call_function.return_value = {
-            "function_call": {
-                "name": "route_query",
-                "arguments": json.dumps({
-                    "intent": "crew_for_flight",
-                    "args": {
-                        "flight_no": "NZ278",
-                        "date": "2024-01-15"
-                    },
-                    "confidence": 0.88
-                })
-            }
-        }
-
+        """Flight queries mentioning crew route to crew_for_flight without the LLM."""
         response = await query_router.route_query("Who is the crew for NZ278 on 15 Jan 2024?")
 
         assert response.intent == Intent.CREW_FOR_FLIGHT
         assert response.args["flight_no"] == "NZ278"
         assert response.args["date"] == "2024-01-15"
-        assert response.confidence == 0.88
+        assert response.confidence == 0.9
+        mock_llm_client.call_function.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_route_query_rule_classifier(self, query_router, mock_llm_client):
+        """Templated queries are classified by the compiled rules."""
+        response = await query_router.route_query("Show me flights from Christchurch on 2024-01-15")
+        assert response.intent == Intent.FLIGHTS_FROM
+        assert response.args == {"origin": "CHC", "date": "2024-01-15"}
+
+        response = await query_router.route_query("Which aircraft are parked at Wellington?")
+        assert response.intent == Intent.AIRCRAFT_BY_LOCATION
+        assert response.args == {"location": "WLG"}
+
+        response = await query_router.route_query("Look up booking PNR001")
+        assert response.intent == Intent.BOOKING_LOOKUP
+        assert response.args == {"pnr": "PNR001"}
+
+        response = await query_router.route_query("What is the status of aircraft ZK-NAA?")
+        assert response.intent == Intent.AIRCRAFT_STATUS
+        assert response.args == {"tail_number": "ZK-NAA"}
+
+        mock_llm_client.call_function.assert_not_called()
+        assert query_router.get_stats()["layers"]["rules"]["hits"] == 4
+
+    def test_rule_classifier_next_flight_times(self, query_router):
+        """Explicit clock times become after_time; a bare "next" (e.g. next week) is not a next-flight query."""
+        rules = query_router.rule_classifier
+
+        response = rules.classify("Next flight to WLG after 3pm on 2024-01-15", "2024-01-15")
+        assert response.intent == Intent.NEXT_FLIGHT
+        # 15:00 NZDT is 02:00 UTC
+        assert response.args["after_time"] == "2024-01-15T02:00:00+00:00"
+
+        response = rules.classify("next departure to WLG from AKL at 18:30 on 2024-07-01", "2024-07-01")
+        assert response.args["after_time"] == "2024-07-01T06:30:00+00:00"
+        assert response.args["origin"] == "AKL"
+
+        assert rules.classify("next flight to WLG").args["after_time"] == "now"
+        assert rules.classify("Flights to WLG next week") is None
+
+    def test_rule_classifier_defers_ambiguous_queries(self, query_router):
+        """Competing intent keywords or a missing roster date leave the query to the LLM."""
+        rules = query_router.rule_classifier
+        assert rules.classify("How many passengers and crew are on NZ278 on 2024-01-15?") is None
+        assert rules.classify("Who is the captain of NZ278?") is None
+
+    @pytest.mark.asyncio
+    async def test_route_query_cache_hit(self, query_router, mock_llm_client):
+        """Repeated LLM-routed queries are answered from the route cache."""
+        mock_llm_client.call_function.return_value = {
+            "function_call": MagicMock(
+                name="route_query",
+                arguments=json.dumps({
+                    "intent": "crew_availability",
+                    "args": {"role": "Captain"},
+                    "confidence": 0.8
+                })
+            )
+        }
+        mock_llm_client.call_function.return_value["function_call"].name = "route_query"
+
+        first = await query_router.route_query("Which captains are free tomorrow?")
+        second = await query_router.route_query("which captains are free  tomorrow")
+
+        assert first.intent == second.intent == Intent.CREW_AVAILABILITY
+        assert second.args == first.args
         mock_llm_client.call_function.assert_called_once()
 
+        stats = query_router.get_stats()
+        assert stats["layers"]["llm"]["hits"] == 1
+        assert stats["layers"]["cache"]["hits"] == 1
+        assert stats["cache_size"] == 1
+
     @pytest.mark.asyncio
     async def test_route_query_llm_routing(self, query_router, mock_llm_client):
         """Test LLM-based query routing."""
@@ -143,7 +200,7 @@ class TestQueryRouter:
             }
         }
         
-        response = await query_router.route_query("When is the next flight to Wellington?")
+        response = await query_router.route_query("Anything heading down to the capital soon?")
         
         assert response.intent == Intent.NEXT_FLIGHT
         assert response.args["destination"] == "WLG"
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for gateway-api data and proxy endpoints.
+
+Fires concurrent GET /data/flights and POST /ask requests at one or more
+gateway instances and reports throughput and latency percentiles, so a
+blocking build can be compared with the async one side by side:
+
+    python load_benchmark.py --base-url http://localhost:8080 \
+        --compare-url http://localhost:8090 --concurrency 50 --requests 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+ASK_PAYLOAD = {"question": "What is the status of flight NZ123?", "flight_no": "NZ123", "date": "2025-01-17"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, method: str, path: str, total: int, concurrency: int) -> Dict:
+    """Send ``total`` requests with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if method == "POST":
+                    response = await client.post(path, json=ASK_PAYLOAD)
+                else:
+                    response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": f"{method} {path}",
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 95),
+        "max_ms": max(latencies) if latencies else 0.0,
+    }
+
+
+async def benchmark(base_url: str, total: int, concurrency: int, timeout: float) -> List[Dict]:
+    """Run /data/flights and /ask concurrently, as mixed traffic would hit the gateway."""
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await client.get("/healthz")  # warm up the connection pool
+        return list(
+            await asyncio.gather(
+                run_endpoint(client, "GET", "/data/flights", total, concurrency),
+                run_endpoint(client, "POST", "/ask", total, concurrency),
+            )
+        )
+
+
+def print_report(label: str, results: List[Dict]) -> None:
+    print(f"\n{label}")
+    print(f"  {'endpoint':<20} {'reqs':>6} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for row in results:
+        print(
+            f"  {row['endpoint']:<20} {row['requests']:>6} {row['errors']:>6} "
+            f"{row['throughput_rps']:>9.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent gateway-api throughput")
+    parser.add_argument("--base-url", default="http://localhost:8080", help="Gateway under test")
+    parser.add_argument("--compare-url", help="Second gateway (e.g. the previous build) to compare against")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="In-flight requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    targets = [("base", args.base_url)]
+    if args.compare_url:
+        targets.append(("compare", args.compare_url))
+
+    reports = {}
+    for label, url in targets:
+        results = await benchmark(url, args.requests, args.concurrency, args.timeout)
+        reports[label] = results
+        print_report(f"{label}: {url}", results)
+
+    if "compare" in reports:
+        print("\nThroughput ratio (base / compare)")
+        for base_row, compare_row in zip(reports["base"], reports["compare"]):
+            ratio = base_row["throughput_rps"] / compare_row["throughput_rps"] if compare_row["throughput_rps"] else float("inf")
+            print(f"  {base_row['endpoint']:<20} {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
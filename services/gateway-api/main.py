@@ -1,26 +1,28 @@
+import asyncio
+import base64
 import json
 import struct
 from contextlib import asynccontextmanager
 from datetime import datetime, date, time
-from typing import List, Dict, Any, Optional
+from typing import Awaitable, List, Dict, Any, Optional
 
-import httpx
 import psycopg
-from fastapi import Request, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi import BackgroundTasks, Query, Request, HTTPException
+from fastapi.responses import RedirectResponse, StreamingResponse
 from pydantic import BaseModel
 from psycopg.errors import UndefinedTable
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool
 
 from services.shared.base_service import BaseService
+from services.shared.embedding_client import EmbeddingClient
+from services.shared.upstream_client import UpstreamClient
 from services.shared.llm_tracker import LLMTracker
+from message_store import LLMMessageStore
 
 # Initialize base service
 service = BaseService("gateway-api", "1.0.0")
 app = service.get_app()
 
-# Database connection is initialized at module load time
-
 # Get environment variables using the base service
 AGENT_URL = service.get_env_var("AGENT_URL", "http://agent-svc:8082")
 KNOWLEDGE_SERVICE_URL = service.get_env_var("KNOWLEDGE_SERVICE_URL", "http://knowledge-engine:8081")
@@ -30,6 +32,25 @@ CUSTOMER_CHAT_URL = service.get_env_var("CUSTOMER_CHAT_URL", "http://customer-ch
 PREDICTIVE_URL = service.get_env_var("PREDICTIVE_URL", "http://predictive-svc:8085")
 CREW_URL = service.get_env_var("CREW_URL", "http://crew-svc:8086")
 DB_ROUTER_URL = service.get_env_var("DB_ROUTER_URL", "http://db-router-svc:8000")
+CHATBOT_URL = service.get_env_var("CHATBOT_URL", "http://scalable-chatbot-svc:8088")
+
+# Per-upstream request timeouts (seconds); LLM-backed services get more headroom
+UPSTREAM_URLS = {
+    "agent": AGENT_URL,
+    "knowledge": KNOWLEDGE_SERVICE_URL,
+    "comms": COMMS_URL,
+    "ingest": INGEST_URL,
+    "customer_chat": CUSTOMER_CHAT_URL,
+    "predictive": PREDICTIVE_URL,
+    "crew": CREW_URL,
+    "db_router": DB_ROUTER_URL,
+    "chatbot": CHATBOT_URL,
+}
+UPSTREAM_DEFAULT_TIMEOUTS = {"agent": 60, "comms": 60, "ingest": 90}
+UPSTREAM_MAX_CONNECTIONS = service.get_env_int("UPSTREAM_MAX_CONNECTIONS", 100)
+UPSTREAM_MAX_KEEPALIVE = service.get_env_int("UPSTREAM_MAX_KEEPALIVE", 20)
+UPSTREAM_FAILURE_THRESHOLD = service.get_env_int("UPSTREAM_FAILURE_THRESHOLD", 5)
+UPSTREAM_RESET_TIMEOUT = service.get_env_int("UPSTREAM_RESET_TIMEOUT", 30)
 
 # Database configuration
 DB_HOST = service.get_env_var("DB_HOST")
@@ -46,35 +67,134 @@ EMBEDDINGS_MODEL = service.get_env_var("EMBEDDINGS_MODEL", "text-embedding-3-sma
 # Create database connection pool
 DB_CONN_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASS}"
 
-# Initialize connection pool immediately
-try:
-    db_pool = ConnectionPool(DB_CONN_STRING, min_size=2, max_size=10)
-    service.logger.info("Database connection pool initialized successfully")
-except Exception as init_error:
-    service.logger.warning(f"Failed to initialize database connection: {init_error}")
-    db_pool = None
+# /data/policies pagination
+POLICY_PAGE_SIZE = service.get_env_int("POLICY_PAGE_SIZE", 100)
+POLICY_PAGE_MAX = 1000
+POLICY_STREAM_BATCH = service.get_env_int("POLICY_STREAM_BATCH", 200)
+
+# Async connection pool, opened in the app lifespan so queries never block the event loop
+db_pool: Optional[AsyncConnectionPool] = None
+
+# Tracked LLM messages: in-memory ring buffer, optionally spilling older history to SQLite
+LLM_MESSAGE_CAPACITY = service.get_env_int("LLM_MESSAGE_CAPACITY", 1000)
+LLM_MESSAGE_SPILL_PATH = service.get_env_var("LLM_MESSAGE_SPILL_PATH", "")
+llm_messages = LLMMessageStore(LLM_MESSAGE_CAPACITY, spill_path=LLM_MESSAGE_SPILL_PATH or None)
+
+def _record_llm_messages(messages: List[Dict[str, Any]]) -> None:
+    llm_messages.append_many(messages)
+
+embedding_client = EmbeddingClient("gateway-api", api_key=OPENAI_API_KEY, model=EMBEDDINGS_MODEL)
+
+async def embed(text: str) -> List[float]:
+    """Generate embeddings through the shared cached embedding client."""
+    try:
+        return await embedding_client.embed_async(text)
+    except Exception as e:
+        service.log_error(e, "embedding generation")
+        raise e
+
+upstreams: Dict[str, UpstreamClient] = {}
+
+def _upstream(name: str) -> UpstreamClient:
+    """Return the shared, pooled client for an upstream service."""
+    client = upstreams.get(name)
+    if client is None:
+        client = UpstreamClient(
+            "gateway-api",
+            name,
+            UPSTREAM_URLS[name],
+            timeout=service.get_env_int(
+                f"UPSTREAM_TIMEOUT_{name.upper()}", UPSTREAM_DEFAULT_TIMEOUTS.get(name, 30)
+            ),
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            failure_threshold=UPSTREAM_FAILURE_THRESHOLD,
+            reset_timeout=UPSTREAM_RESET_TIMEOUT,
+        )
+        upstreams[name] = client
+    return client
 
-# Initialize database tables after connection pool is ready
-if db_pool:
+async def _open_db_pool() -> None:
+    global db_pool
     try:
-        ensure_tables_exist()
+        db_pool = AsyncConnectionPool(DB_CONN_STRING, min_size=2, max_size=10, open=False)
+        await db_pool.open()
+        service.logger.info("Database connection pool initialized successfully")
+    except Exception as init_error:
+        service.logger.warning(f"Failed to initialize database connection: {init_error}")
+        db_pool = None
+        return
+
+    try:
+        await ensure_tables_exist()
         service.logger.info("Database tables initialized successfully")
     except Exception as init_error:
         service.logger.warning(f"Failed to initialize database tables: {init_error}")
 
-# Global LLM message store (in production, use Redis or database)
-llm_messages = []
+@asynccontextmanager
+async def lifespan(app):
+    await _open_db_pool()
+    for name in UPSTREAM_URLS:
+        _upstream(name)
+    yield
+    for client in upstreams.values():
+        await client.aclose()
+    upstreams.clear()
+    llm_messages.close()
+    if db_pool is not None:
+        await db_pool.close()
+
+app.router.lifespan_context = lifespan
 
-def embed(text: str) -> List[float]:
-    """Generate embeddings using OpenAI API."""
+async def _notify_knowledge_index(path: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Keep the knowledge-engine BM25 index in sync with policy CRUD; failures are non-fatal."""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)  # Uses OPENAI_API_KEY from environment
-        resp = client.embeddings.create(input=[text], model=EMBEDDINGS_MODEL)
-        return resp.data[0].embedding
+        r = await _upstream("knowledge").post(path, json=payload, timeout=10.0)
+        r.raise_for_status()
     except Exception as e:
-        service.log_error(e, "embedding generation")
-        raise e
+        service.log_error(e, f"knowledge index refresh ({path})")
+    # After the index update, so the chatbot cannot re-cache answers from the old index
+    await _notify_response_cache()
+
+async def _notify_response_cache() -> None:
+    """Drop the chatbot's cached knowledge-base answers after policy changes; failures are non-fatal."""
+    try:
+        r = await _upstream("chatbot").post("/cache/invalidate", timeout=10.0)
+        r.raise_for_status()
+    except Exception as e:
+        service.log_error(e, "chatbot response cache invalidation")
+
+async def _notify_query_cache(tables: Optional[List[str]] = None) -> None:
+    """Drop db-router cached query results for changed tables (all when None); failures are non-fatal."""
+    try:
+        r = await _upstream("db_router").post("/cache/invalidate", json={"tables": tables}, timeout=10.0)
+        r.raise_for_status()
+    except Exception as e:
+        service.log_error(e, "db-router query cache invalidation")
+
+async def _notify_crew_index(path: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Keep the crew-svc replacement index in sync with crew and schedule CRUD; failures are non-fatal."""
+    try:
+        r = await _upstream("crew").post(path, json=payload, timeout=10.0)
+        r.raise_for_status()
+    except Exception as e:
+        service.log_error(e, f"crew index refresh ({path})")
+
+async def _notify_delay_stats(payload: Dict[str, Any]) -> None:
+    """Keep the predictive-svc delay statistics in sync with flight CRUD; failures are non-fatal."""
+    try:
+        r = await _upstream("predictive").post("/stats/refresh", json=payload, timeout=30.0)
+        r.raise_for_status()
+    except Exception as e:
+        service.log_error(e, "delay statistics refresh")
+
+async def _run_notifications(*hooks: Awaitable[None]) -> None:
+    """Run the index and cache notifications for a write concurrently; each hook handles its own errors."""
+    await asyncio.gather(*hooks)
+
+def _notify_after_response(background_tasks: BackgroundTasks, *hooks: Awaitable[None]) -> None:
+    """Schedule notifications to run once the response is sent, so writes return on DB commit."""
+    background_tasks.add_task(_run_notifications, *hooks)
 
 # Pydantic models for data operations
 class Flight(BaseModel):
@@ -119,70 +239,63 @@ class Policy(BaseModel):
     meta: Dict[str, Any]
     embedding: Optional[List[float]] = None
 
-# Database connection is initialized at module load time
+class LLMMessageBatch(BaseModel):
+    messages: List[Dict[str, Any]]
 
 # Database helper functions
-def get_db_connection():
+@asynccontextmanager
+async def get_db_connection():
     if db_pool is not None:
-        return db_pool.connection()
+        async with db_pool.connection() as conn:
+            yield conn
     else:
         # Fallback to direct connection if pool is not available
-        import psycopg
-        return psycopg.connect(DB_CONN_STRING)
+        async with await psycopg.AsyncConnection.connect(DB_CONN_STRING) as conn:
+            yield conn
 
-def _execute_with_recovery(operation):
+async def _execute_with_recovery(operation):
     try:
-        return operation()
+        return await operation()
     except UndefinedTable:
-        ensure_tables_exist()
-        return operation()
+        await ensure_tables_exist()
+        return await operation()
 
 
-def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
-    def run():
-        with get_db_connection() as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                cur.execute(query, params)
+async def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    async def run():
+        async with get_db_connection() as conn:
+            await conn.set_autocommit(True)
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
                 if cur.description:
                     columns = [desc[0] for desc in cur.description]
-                    return [dict(zip(columns, row)) for row in cur.fetchall()]
+                    return [dict(zip(columns, row)) for row in await cur.fetchall()]
                 return []
 
-    return _execute_with_recovery(run)
+    return await _execute_with_recovery(run)
 
 
-def execute_insert(query: str, params: tuple) -> int:
-    def run():
-        with get_db_connection() as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                cur.execute(query, params)
+async def _execute_write(query: str, params: tuple) -> int:
+    async def run():
+        async with get_db_connection() as conn:
+            await conn.set_autocommit(True)
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
                 return cur.rowcount
 
-    return _execute_with_recovery(run)
+    return await _execute_with_recovery(run)
 
 
-def execute_update(query: str, params: tuple) -> int:
-    def run():
-        with get_db_connection() as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.rowcount
+async def execute_insert(query: str, params: tuple) -> int:
+    return await _execute_write(query, params)
 
-    return _execute_with_recovery(run)
 
+async def execute_update(query: str, params: tuple) -> int:
+    return await _execute_write(query, params)
 
-def execute_delete(query: str, params: tuple) -> int:
-    def run():
-        with get_db_connection() as conn:
-            conn.autocommit = True
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.rowcount
 
-    return _execute_with_recovery(run)
+async def execute_delete(query: str, params: tuple) -> int:
+    return await _execute_write(query, params)
 
 
 def _coerce_date(value: Any) -> Optional[date]:
@@ -359,9 +472,54 @@ def _normalize_embedding(raw_embedding: Any, expected_dims: Optional[Any]) -> Op
         return None
 
 
-def _column_type(conn, table: str, column: str) -> Optional[str]:
-    with conn.cursor() as cur:
-        cur.execute(
+def _encode_embedding(values: List[float]) -> str:
+    """Pack an embedding as base64 little-endian float32 (~4x smaller than a JSON list)."""
+    return base64.b64encode(struct.pack(f"<{len(values)}f", *values)).decode("ascii")
+
+
+def _prepare_policy_rows(policies: List[Dict[str, Any]], embedding_format: str = "list") -> None:
+    """Decode JSON meta and, when selected, embeddings of policy rows in place."""
+    for policy in policies:
+        meta = policy.get('meta')
+        if isinstance(meta, str):
+            try:
+                policy['meta'] = json.loads(meta)
+            except json.JSONDecodeError:
+                service.logger.warning(
+                    f"Policy {policy.get('id')} meta column is not valid JSON string; leaving as-is"
+                )
+
+        if 'embedding' not in policy:
+            continue
+
+        raw_embedding = policy['embedding']
+        embedding_dims = policy.get('embedding_dims')
+        normalized_embedding = _normalize_embedding(raw_embedding, embedding_dims)
+
+        if normalized_embedding is None and raw_embedding is not None:
+            service.logger.warning(
+                f"Failed to normalize embedding for policy {policy.get('id')} (type={type(raw_embedding)})"
+            )
+        elif normalized_embedding is not None and embedding_dims is not None:
+            preview = ", ".join(f"{value:.4f}" for value in normalized_embedding[:3])
+            service.logger.debug(
+                "Embedding normalized for policy {} ({} dims expected {}, preview [{}{}])",
+                policy.get('id'),
+                len(normalized_embedding),
+                embedding_dims,
+                preview,
+                "..." if len(normalized_embedding) > 3 else "",
+            )
+
+        if embedding_format == "base64" and normalized_embedding is not None:
+            policy['embedding'] = _encode_embedding(normalized_embedding)
+        else:
+            policy['embedding'] = normalized_embedding
+
+
+async def _column_type(conn, table: str, column: str) -> Optional[str]:
+    async with conn.cursor() as cur:
+        await cur.execute(
             """
             SELECT data_type
             FROM information_schema.columns
@@ -369,18 +527,18 @@ def _column_type(conn, table: str, column: str) -> Optional[str]:
             """,
             (table, column),
         )
-        result = cur.fetchone()
+        result = await cur.fetchone()
         return result[0] if result else None
 
 
-def _alter_column(conn, table: str, column: str, target_type: str, expression: str) -> None:
-    with conn.cursor() as cur:
-        cur.execute(
+async def _alter_column(conn, table: str, column: str, target_type: str, expression: str) -> None:
+    async with conn.cursor() as cur:
+        await cur.execute(
             f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {target_type} USING {expression}"
         )
 
 
-def _migrate_legacy_columns(conn) -> None:
+async def _migrate_legacy_columns(conn) -> None:
     """Upgrade legacy TEXT-based schedule columns to DATE/TIMESTAMP."""
     migrations = [
         (
@@ -426,12 +584,12 @@ def _migrate_legacy_columns(conn) -> None:
     ]
 
     for table, column, target_type, expression in migrations:
-        current = _column_type(conn, table, column)
+        current = await _column_type(conn, table, column)
         if current is None or current == target_type:
             continue
 
         try:
-            _alter_column(conn, table, column, target_type, expression)
+            await _alter_column(conn, table, column, target_type, expression)
             service.logger.info(
                 "Migrated %s.%s from %s to %s", table, column, current, target_type
             )
@@ -439,12 +597,12 @@ def _migrate_legacy_columns(conn) -> None:
             service.logger.warning(
                 "Failed to migrate %s.%s to %s: %s", table, column, target_type, exc
             )
-            conn.rollback()
+            await conn.rollback()
         else:
-            conn.commit()
+            await conn.commit()
 
 
-def ensure_tables_exist() -> None:
+async def ensure_tables_exist() -> None:
     """Ensure core data tables exist so read endpoints do not 500 on fresh databases."""
     create_statements = [
         """
@@ -509,13 +667,13 @@ def ensure_tables_exist() -> None:
         """,
     ]
 
-    with get_db_connection() as conn:
-        conn.autocommit = False
-        with conn.cursor() as cur:
+    async with get_db_connection() as conn:
+        await conn.set_autocommit(False)
+        async with conn.cursor() as cur:
             for statement in create_statements:
-                cur.execute(statement)
-        conn.commit()
-        _migrate_legacy_columns(conn)
+                await cur.execute(statement)
+        await conn.commit()
+        await _migrate_legacy_columns(conn)
 
 
 # Database schema will be initialized in the lifespan function after connection pool is ready
@@ -525,14 +683,19 @@ def ensure_tables_exist() -> None:
 def root():
     return RedirectResponse("/docs")
 
+@app.get("/upstreams")
+def upstream_status():
+    """Circuit breaker state for each upstream service."""
+    return {name: client.status() for name, client in upstreams.items()}
+
 @app.get("/demo/seed")
 async def seed(request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{INGEST_URL}/ingest/seed", timeout=90.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("ingest").post("/ingest/seed")
+        result = r.json()
+        await _notify_query_cache()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "seed endpoint")
         raise
@@ -540,19 +703,15 @@ async def seed(request: Request):
 @app.post("/ask")
 async def ask(payload: dict, request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{AGENT_URL}/analyze-disruption", json=payload, timeout=60.0)
-            result = r.json()
+        r = await _upstream("agent").post("/analyze-disruption", json=payload)
+        result = r.json()
             
-            # Track LLM message if present in response
-            if 'llm_message' in result:
-                llm_messages.append(result['llm_message'])
-                # Keep only last 1000 messages
-                if len(llm_messages) > 1000:
-                    llm_messages[:] = llm_messages[-1000:]
+        # Track LLM message if present in response
+        if 'llm_message' in result:
+            _record_llm_messages([result['llm_message']])
             
-            service.log_request(request, {"status": "success"})
-            return result
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "ask endpoint")
         raise
@@ -567,19 +726,17 @@ async def test_llm(request: Request):
         print(f"DEBUG: Request method: {request.method}")
         print(f"DEBUG: Request URL: {request.url}")
 
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{AGENT_URL}/test_llm", timeout=60.0)
-            result = r.json()
+        r = await _upstream("agent").post("/test_llm")
+        result = r.json()
             
-            # Track LLM message if present in response
-            if 'llm_message' in result:
-                llm_messages.append(result['llm_message'])
-                # Keep only last 1000 messages
-                if len(llm_messages) > 1000:
-                    llm_messages[:] = llm_messages[-1000:]
+        # Track LLM message if present in response
+        if 'llm_message' in result:
+            _record_llm_messages([result['llm_message']])
             
-            service.log_request(request, {"status": "success"})
-            return result
+        service.log_request(request, {"status": "success"})
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "test_llm endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -589,21 +746,17 @@ async def draft_comms(payload: dict, request: Request):
     try:
         print(f"DEBUG: Gateway received draft_comms request: {payload}")
         print(f"DEBUG: AGENT_URL: {AGENT_URL}")
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{AGENT_URL}/draft_comms", json=payload, timeout=60.0)
-            print(f"DEBUG: Agent service response status: {r.status_code}")
-            result = r.json()
-            print(f"DEBUG: Agent service response: {result}")
+        r = await _upstream("agent").post("/draft_comms", json=payload)
+        print(f"DEBUG: Agent service response status: {r.status_code}")
+        result = r.json()
+        print(f"DEBUG: Agent service response: {result}")
             
-            # Track LLM message if present in response
-            if 'llm_message' in result:
-                llm_messages.append(result['llm_message'])
-                # Keep only last 1000 messages
-                if len(llm_messages) > 1000:
-                    llm_messages[:] = llm_messages[-1000:]
+        # Track LLM message if present in response
+        if 'llm_message' in result:
+            _record_llm_messages([result['llm_message']])
             
-            service.log_request(request, {"status": "success"})
-            return result
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         print(f"DEBUG: Gateway error: {e}")
         service.log_error(e, "draft_comms endpoint")
@@ -612,25 +765,24 @@ async def draft_comms(payload: dict, request: Request):
 @app.post("/search")
 async def search(payload: dict, request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{KNOWLEDGE_SERVICE_URL}/search", json=payload, timeout=30.0)
-            if r.status_code >= 400:
-                message = None
-                try:
-                    error_body = r.json()
-                    message = error_body if isinstance(error_body, str) else error_body.get("detail")
-                except ValueError:
-                    message = r.text
-
-                service.log_request(
-                    request,
-                    {"status": "error", "upstream_status": r.status_code, "upstream_detail": message},
-                )
-                raise HTTPException(status_code=r.status_code, detail=message or "Search failed")
+        r = await _upstream("knowledge").post("/search", json=payload)
+        if r.status_code >= 400:
+            message = None
+            try:
+                error_body = r.json()
+                message = error_body if isinstance(error_body, str) else error_body.get("detail")
+            except ValueError:
+                message = r.text
+
+            service.log_request(
+                request,
+                {"status": "error", "upstream_status": r.status_code, "upstream_detail": message},
+            )
+            raise HTTPException(status_code=r.status_code, detail=message or "Search failed")
 
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "search endpoint")
         raise
@@ -652,16 +804,15 @@ async def smart_ask(payload: dict, request: Request):
         if "auth" not in payload:
             payload["auth"] = {"role": "public"}
         
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{DB_ROUTER_URL}/smart-query", json=payload, timeout=30.0)
+        r = await _upstream("db_router").post("/smart-query", json=payload)
             
-            if r.status_code != 200:
-                service.logger.error(f"DB router service error: {r.status_code} - {r.text}")
-                raise HTTPException(status_code=r.status_code, detail=f"Database router error: {r.text}")
+        if r.status_code != 200:
+            service.logger.error(f"DB router service error: {r.status_code} - {r.text}")
+            raise HTTPException(status_code=r.status_code, detail=f"Database router error: {r.text}")
             
-            result = r.json()
-            service.log_request(request, {"status": "success", "intent": result.get("intent")})
-            return result
+        result = r.json()
+        service.log_request(request, {"status": "success", "intent": result.get("intent")})
+        return result
             
     except HTTPException:
         raise
@@ -674,15 +825,14 @@ async def smart_ask(payload: dict, request: Request):
 async def create_chat_session(payload: dict, request: Request):
     try:
         service.logger.info(f"Creating chat session with payload: {payload}")
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{CUSTOMER_CHAT_URL}/chat/session", json=payload, timeout=30.0)
-            service.logger.info(f"Customer chat service response: {r.status_code}")
-            if r.status_code != 200:
-                service.logger.error(f"Customer chat service error: {r.text}")
-                raise HTTPException(status_code=r.status_code, detail=f"Customer chat service error: {r.text}")
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").post("/chat/session", json=payload)
+        service.logger.info(f"Customer chat service response: {r.status_code}")
+        if r.status_code != 200:
+            service.logger.error(f"Customer chat service error: {r.text}")
+            raise HTTPException(status_code=r.status_code, detail=f"Customer chat service error: {r.text}")
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except HTTPException:
         raise
     except Exception as e:
@@ -692,11 +842,10 @@ async def create_chat_session(payload: dict, request: Request):
 @app.post("/customer-chat/message")
 async def send_chat_message(payload: dict, request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{CUSTOMER_CHAT_URL}/chat/message", json=payload, timeout=30.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").post("/chat/message", json=payload)
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "send_chat_message endpoint")
         raise
@@ -704,11 +853,10 @@ async def send_chat_message(payload: dict, request: Request):
 @app.get("/customer-chat/session/{session_id}")
 async def get_chat_session(session_id: str, request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{CUSTOMER_CHAT_URL}/chat/session/{session_id}", timeout=30.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").get(f"/chat/session/{session_id}", params=request.query_params)
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "get_chat_session endpoint")
         raise
@@ -716,11 +864,10 @@ async def get_chat_session(session_id: str, request: Request):
 @app.post("/customer-chat/communication/send")
 async def send_communication(payload: dict, request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{CUSTOMER_CHAT_URL}/communication/send", json=payload, timeout=30.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").post("/communication/send", json=payload)
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "send_communication endpoint")
         raise
@@ -728,11 +875,10 @@ async def send_communication(payload: dict, request: Request):
 @app.get("/customer-chat/communication/history")
 async def get_communication_history(request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{CUSTOMER_CHAT_URL}/communication/history", timeout=30.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").get("/communication/history", params=request.query_params)
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
     except Exception as e:
         service.log_error(e, "get_communication_history endpoint")
         raise
@@ -740,11 +886,12 @@ async def get_communication_history(request: Request):
 @app.get("/customer-chat/test")
 async def test_customer_chat(request: Request):
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(f"{CUSTOMER_CHAT_URL}/test", timeout=30.0)
-            result = r.json()
-            service.log_request(request, {"status": "success"})
-            return result
+        r = await _upstream("customer_chat").get("/test")
+        result = r.json()
+        service.log_request(request, {"status": "success"})
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "test_customer_chat endpoint")
         raise HTTPException(status_code=500, detail=f"Customer chat service not available: {str(e)}")
@@ -755,7 +902,7 @@ async def test_customer_chat(request: Request):
 @app.get("/data/flights")
 async def get_flights(request: Request):
     try:
-        rows = execute_query("SELECT * FROM flights ORDER BY flight_date, flight_no")
+        rows = await execute_query("SELECT * FROM flights ORDER BY flight_date, flight_no")
         flights = [_serialize_temporal_fields(row) for row in rows]
         service.log_request(request, {"status": "success", "count": len(flights)})
         return flights
@@ -763,8 +910,21 @@ async def get_flights(request: Request):
         service.log_error(e, "get_flights endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _previous_flights(flight_no: str) -> List[Dict[str, Any]]:
+    """Dates and routes a flight number currently has, read before an update or delete changes them."""
+    return await execute_query(
+        "SELECT DISTINCT flight_date, origin, destination FROM flights WHERE flight_no=%s", (flight_no,)
+    )
+
+def _flight_dates(rows: List[Dict[str, Any]]) -> List[str]:
+    return list(dict.fromkeys(row["flight_date"].isoformat() for row in rows if row["flight_date"] is not None))
+
+def _flight_routes(rows: List[Dict[str, Any]]) -> List[List[str]]:
+    routes = {(row["origin"], row["destination"]) for row in rows if row["origin"] and row["destination"]}
+    return [list(route) for route in sorted(routes)]
+
 @app.post("/data/flights")
-async def create_flight(flight: Flight, request: Request):
+async def create_flight(flight: Flight, background_tasks: BackgroundTasks, request: Request):
     try:
         try:
             flight_date = _coerce_date(flight.flight_date)
@@ -787,7 +947,13 @@ async def create_flight(flight: Flight, request: Request):
             flight.status,
             flight.tail_number,
         )
-        execute_insert(query, params)
+        await execute_insert(query, params)
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"dates": [flight_date.isoformat()]}),
+            _notify_delay_stats({"flight_nos": [flight.flight_no]}),
+            _notify_query_cache(["flights"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Flight created successfully"}
     except HTTPException:
@@ -797,7 +963,7 @@ async def create_flight(flight: Flight, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/flights/{flight_no}")
-async def update_flight(flight_no: str, flight: Flight, request: Request):
+async def update_flight(flight_no: str, flight: Flight, background_tasks: BackgroundTasks, request: Request):
     try:
         try:
             flight_date = _coerce_date(flight.flight_date)
@@ -806,6 +972,7 @@ async def update_flight(flight_no: str, flight: Flight, request: Request):
         except ValueError as exc:
             raise HTTPException(status_code=422, detail=str(exc)) from exc
 
+        previous = await _previous_flights(flight_no)
         query = """
             UPDATE flights SET flight_date=%s, origin=%s, destination=%s, sched_dep_time=%s, 
                    sched_arr_time=%s, status=%s, tail_number=%s WHERE flight_no=%s
@@ -820,9 +987,16 @@ async def update_flight(flight_no: str, flight: Flight, request: Request):
             flight.tail_number,
             flight_no,
         )
-        rows_affected = execute_update(query, params)
+        rows_affected = await execute_update(query, params)
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Flight not found")
+        dates = list(dict.fromkeys(_flight_dates(previous) + [flight_date.isoformat()]))
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"dates": dates}),
+            _notify_delay_stats({"flight_nos": [flight_no], "routes": _flight_routes(previous)}),
+            _notify_query_cache(["flights"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Flight updated successfully"}
     except HTTPException:
@@ -832,12 +1006,19 @@ async def update_flight(flight_no: str, flight: Flight, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/flights/{flight_no}")
-async def delete_flight(flight_no: str, request: Request):
+async def delete_flight(flight_no: str, background_tasks: BackgroundTasks, request: Request):
     try:
+        previous = await _previous_flights(flight_no)
         query = "DELETE FROM flights WHERE flight_no=%s"
-        rows_affected = execute_delete(query, (flight_no,))
+        rows_affected = await execute_delete(query, (flight_no,))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Flight not found")
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"dates": _flight_dates(previous)}),
+            _notify_delay_stats({"flight_nos": [flight_no], "routes": _flight_routes(previous)}),
+            _notify_query_cache(["flights"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Flight deleted successfully"}
     except HTTPException:
@@ -850,7 +1031,7 @@ async def delete_flight(flight_no: str, request: Request):
 @app.get("/data/bookings")
 async def get_bookings(request: Request):
     try:
-        rows = execute_query("SELECT * FROM bookings ORDER BY flight_date, flight_no")
+        rows = await execute_query("SELECT * FROM bookings ORDER BY flight_date, flight_no")
         bookings = [_serialize_temporal_fields(row) for row in rows]
         service.log_request(request, {"status": "success", "count": len(bookings)})
         return bookings
@@ -859,7 +1040,7 @@ async def get_bookings(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/data/bookings")
-async def create_booking(booking: Booking, request: Request):
+async def create_booking(booking: Booking, background_tasks: BackgroundTasks, request: Request):
     try:
         try:
             flight_date = _coerce_date(booking.flight_date)
@@ -878,7 +1059,8 @@ async def create_booking(booking: Booking, request: Request):
             booking.has_connection,
             booking.connecting_flight_no,
         )
-        execute_insert(query, params)
+        await execute_insert(query, params)
+        _notify_after_response(background_tasks, _notify_query_cache(["bookings"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Booking created successfully"}
     except HTTPException:
@@ -888,7 +1070,7 @@ async def create_booking(booking: Booking, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/bookings/{pnr}")
-async def update_booking(pnr: str, booking: Booking, request: Request):
+async def update_booking(pnr: str, booking: Booking, background_tasks: BackgroundTasks, request: Request):
     try:
         try:
             flight_date = _coerce_date(booking.flight_date)
@@ -907,9 +1089,10 @@ async def update_booking(pnr: str, booking: Booking, request: Request):
             booking.connecting_flight_no,
             pnr,
         )
-        rows_affected = execute_update(query, params)
+        rows_affected = await execute_update(query, params)
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Booking not found")
+        _notify_after_response(background_tasks, _notify_query_cache(["bookings"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Booking updated successfully"}
     except HTTPException:
@@ -919,12 +1102,13 @@ async def update_booking(pnr: str, booking: Booking, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/bookings/{pnr}")
-async def delete_booking(pnr: str, request: Request):
+async def delete_booking(pnr: str, background_tasks: BackgroundTasks, request: Request):
     try:
         query = "DELETE FROM bookings WHERE pnr=%s"
-        rows_affected = execute_delete(query, (pnr,))
+        rows_affected = await execute_delete(query, (pnr,))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Booking not found")
+        _notify_after_response(background_tasks, _notify_query_cache(["bookings"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Booking deleted successfully"}
     except HTTPException:
@@ -937,7 +1121,7 @@ async def delete_booking(pnr: str, request: Request):
 @app.get("/data/crew_roster")
 async def get_crew_roster(request: Request):
     try:
-        rows = execute_query("SELECT * FROM crew_roster ORDER BY flight_date, flight_no")
+        rows = await execute_query("SELECT * FROM crew_roster ORDER BY flight_date, flight_no")
         roster = [_serialize_temporal_fields(row) for row in rows]
         service.log_request(request, {"status": "success", "count": len(roster)})
         return roster
@@ -946,7 +1130,7 @@ async def get_crew_roster(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/data/crew_roster")
-async def create_crew_roster(roster: CrewRoster, request: Request):
+async def create_crew_roster(roster: CrewRoster, background_tasks: BackgroundTasks, request: Request):
     try:
         try:
             flight_date = _coerce_date(roster.flight_date)
@@ -958,7 +1142,12 @@ async def create_crew_roster(roster: CrewRoster, request: Request):
             VALUES (%s, %s, %s, %s)
         """
         params = (roster.flight_no, flight_date, roster.crew_id, roster.crew_role)
-        execute_insert(query, params)
+        await execute_insert(query, params)
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [roster.crew_id], "dates": [flight_date.isoformat()]}),
+            _notify_query_cache(["crew_roster"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew roster entry created successfully"}
     except HTTPException:
@@ -968,7 +1157,9 @@ async def create_crew_roster(roster: CrewRoster, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/crew_roster/{flight_no}/{crew_id}")
-async def update_crew_roster(flight_no: str, crew_id: str, roster: CrewRoster, request: Request):
+async def update_crew_roster(
+    flight_no: str, crew_id: str, roster: CrewRoster, background_tasks: BackgroundTasks, request: Request
+):
     try:
         try:
             flight_date = _coerce_date(roster.flight_date)
@@ -979,9 +1170,14 @@ async def update_crew_roster(flight_no: str, crew_id: str, roster: CrewRoster, r
             UPDATE crew_roster SET flight_date=%s, crew_role=%s WHERE flight_no=%s AND crew_id=%s
         """
         params = (flight_date, roster.crew_role, flight_no, crew_id)
-        rows_affected = execute_update(query, params)
+        rows_affected = await execute_update(query, params)
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Crew roster entry not found")
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [crew_id], "dates": [flight_date.isoformat()]}),
+            _notify_query_cache(["crew_roster"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew roster entry updated successfully"}
     except HTTPException:
@@ -991,12 +1187,17 @@ async def update_crew_roster(flight_no: str, crew_id: str, roster: CrewRoster, r
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/crew_roster/{flight_no}/{crew_id}")
-async def delete_crew_roster(flight_no: str, crew_id: str, request: Request):
+async def delete_crew_roster(flight_no: str, crew_id: str, background_tasks: BackgroundTasks, request: Request):
     try:
         query = "DELETE FROM crew_roster WHERE flight_no=%s AND crew_id=%s"
-        rows_affected = execute_delete(query, (flight_no, crew_id))
+        rows_affected = await execute_delete(query, (flight_no, crew_id))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Crew roster entry not found")
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [crew_id]}),
+            _notify_query_cache(["crew_roster"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew roster entry deleted successfully"}
     except HTTPException:
@@ -1009,7 +1210,7 @@ async def delete_crew_roster(flight_no: str, crew_id: str, request: Request):
 @app.get("/data/crew_details")
 async def get_crew_details(request: Request):
     try:
-        details = execute_query("SELECT * FROM crew_details ORDER BY crew_id")
+        details = await execute_query("SELECT * FROM crew_details ORDER BY crew_id")
         service.log_request(request, {"status": "success", "count": len(details)})
         return details
     except Exception as e:
@@ -1017,14 +1218,19 @@ async def get_crew_details(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/data/crew_details")
-async def create_crew_detail(detail: CrewDetail, request: Request):
+async def create_crew_detail(detail: CrewDetail, background_tasks: BackgroundTasks, request: Request):
     try:
         query = """
             INSERT INTO crew_details (crew_id, crew_name, duty_start_time, max_duty_hours)
             VALUES (%s, %s, %s, %s)
         """
         params = (detail.crew_id, detail.crew_name, detail.duty_start_time, detail.max_duty_hours)
-        execute_insert(query, params)
+        await execute_insert(query, params)
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [detail.crew_id]}),
+            _notify_query_cache(["crew_details"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew detail created successfully"}
     except Exception as e:
@@ -1032,15 +1238,20 @@ async def create_crew_detail(detail: CrewDetail, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/crew_details/{crew_id}")
-async def update_crew_detail(crew_id: str, detail: CrewDetail, request: Request):
+async def update_crew_detail(crew_id: str, detail: CrewDetail, background_tasks: BackgroundTasks, request: Request):
     try:
         query = """
             UPDATE crew_details SET crew_name=%s, duty_start_time=%s, max_duty_hours=%s WHERE crew_id=%s
         """
         params = (detail.crew_name, detail.duty_start_time, detail.max_duty_hours, crew_id)
-        rows_affected = execute_update(query, params)
+        rows_affected = await execute_update(query, params)
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Crew detail not found")
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [crew_id]}),
+            _notify_query_cache(["crew_details"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew detail updated successfully"}
     except HTTPException:
@@ -1050,12 +1261,17 @@ async def update_crew_detail(crew_id: str, detail: CrewDetail, request: Request)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/crew_details/{crew_id}")
-async def delete_crew_detail(crew_id: str, request: Request):
+async def delete_crew_detail(crew_id: str, background_tasks: BackgroundTasks, request: Request):
     try:
         query = "DELETE FROM crew_details WHERE crew_id=%s"
-        rows_affected = execute_delete(query, (crew_id,))
+        rows_affected = await execute_delete(query, (crew_id,))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Crew detail not found")
+        _notify_after_response(
+            background_tasks,
+            _notify_crew_index("/index/crew", {"crew_ids": [crew_id]}),
+            _notify_query_cache(["crew_details"]),
+        )
         service.log_request(request, {"status": "success"})
         return {"message": "Crew detail deleted successfully"}
     except HTTPException:
@@ -1068,7 +1284,7 @@ async def delete_crew_detail(crew_id: str, request: Request):
 @app.get("/data/aircraft_status")
 async def get_aircraft_status(request: Request):
     try:
-        status = execute_query("SELECT * FROM aircraft_status ORDER BY tail_number")
+        status = await execute_query("SELECT * FROM aircraft_status ORDER BY tail_number")
         service.log_request(request, {"status": "success", "count": len(status)})
         return status
     except Exception as e:
@@ -1076,14 +1292,15 @@ async def get_aircraft_status(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/data/aircraft_status")
-async def create_aircraft_status(status: AircraftStatus, request: Request):
+async def create_aircraft_status(status: AircraftStatus, background_tasks: BackgroundTasks, request: Request):
     try:
         query = """
             INSERT INTO aircraft_status (tail_number, current_location, status)
             VALUES (%s, %s, %s)
         """
         params = (status.tail_number, status.current_location, status.status)
-        execute_insert(query, params)
+        await execute_insert(query, params)
+        _notify_after_response(background_tasks, _notify_query_cache(["aircraft_status"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Aircraft status created successfully"}
     except Exception as e:
@@ -1091,15 +1308,18 @@ async def create_aircraft_status(status: AircraftStatus, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/aircraft_status/{tail_number}")
-async def update_aircraft_status(tail_number: str, status: AircraftStatus, request: Request):
+async def update_aircraft_status(
+    tail_number: str, status: AircraftStatus, background_tasks: BackgroundTasks, request: Request
+):
     try:
         query = """
             UPDATE aircraft_status SET current_location=%s, status=%s WHERE tail_number=%s
         """
         params = (status.current_location, status.status, tail_number)
-        rows_affected = execute_update(query, params)
+        rows_affected = await execute_update(query, params)
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Aircraft status not found")
+        _notify_after_response(background_tasks, _notify_query_cache(["aircraft_status"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Aircraft status updated successfully"}
     except HTTPException:
@@ -1109,12 +1329,13 @@ async def update_aircraft_status(tail_number: str, status: AircraftStatus, reque
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/aircraft_status/{tail_number}")
-async def delete_aircraft_status(tail_number: str, request: Request):
+async def delete_aircraft_status(tail_number: str, background_tasks: BackgroundTasks, request: Request):
     try:
         query = "DELETE FROM aircraft_status WHERE tail_number=%s"
-        rows_affected = execute_delete(query, (tail_number,))
+        rows_affected = await execute_delete(query, (tail_number,))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Aircraft status not found")
+        _notify_after_response(background_tasks, _notify_query_cache(["aircraft_status"]))
         service.log_request(request, {"status": "success"})
         return {"message": "Aircraft status deleted successfully"}
     except HTTPException:
@@ -1124,73 +1345,111 @@ async def delete_aircraft_status(tail_number: str, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Policies CRUD
-@app.get("/data/policies")
-async def get_policies(request: Request):
-    try:
-        policies = execute_query("""
-            SELECT d.id, d.title, d.content, d.meta, de.embedding, vector_dims(de.embedding) as embedding_dims
-            FROM docs d
-            LEFT JOIN doc_embeddings de ON d.id = de.doc_id
-            ORDER BY d.id
-        """)
-        
-        service.logger.info(f"Retrieved {len(policies)} policies from database")
+async def _fetch_policy_page(after_id: Optional[int], limit: int, include_embedding: bool) -> List[Dict[str, Any]]:
+    """Keyset page of policies ordered by id; vectors are only read when requested."""
+    embedding_column = "de.embedding, " if include_embedding else ""
+    return await execute_query(f"""
+        SELECT d.id, d.title, d.content, d.meta, {embedding_column}vector_dims(de.embedding) as embedding_dims
+        FROM docs d
+        LEFT JOIN doc_embeddings de ON d.id = de.doc_id
+        WHERE d.id > %s
+        ORDER BY d.id
+        LIMIT %s
+    """, (after_id or 0, limit))
 
-        for policy in policies:
-            raw_embedding = policy.get('embedding')
-            embedding_dims = policy.pop('embedding_dims', None)
-            normalized_embedding = _normalize_embedding(raw_embedding, embedding_dims)
+@app.get("/data/policies")
+async def get_policies(
+    request: Request,
+    after_id: Optional[int] = Query(None, ge=0, description="Return policies with id greater than this cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=POLICY_PAGE_MAX),
+    include_embedding: bool = False,
+    embedding_format: str = Query("base64", pattern="^(base64|list)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """List policies with keyset pagination.
+
+    JSON mode returns one page (``limit`` defaults to POLICY_PAGE_SIZE) plus
+    ``next_after_id``; NDJSON mode streams every policy after ``after_id``
+    (up to ``limit``) one object per line. Embeddings are omitted unless
+    ``include_embedding`` is set, and are then base64 float32 by default.
+    """
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_policies(request, after_id, limit, include_embedding, embedding_format),
+            media_type="application/x-ndjson",
+        )
 
-            if normalized_embedding is None and raw_embedding is not None:
-                service.logger.warning(
-                    f"Failed to normalize embedding for policy {policy.get('id')} (type={type(raw_embedding)})"
-                )
-            elif normalized_embedding is not None and embedding_dims is not None:
-                preview = ", ".join(f"{value:.4f}" for value in normalized_embedding[:3])
-                service.logger.debug(
-                    "Embedding normalized for policy {} ({} dims expected {}, preview [{}{}])",
-                    policy.get('id'),
-                    len(normalized_embedding),
-                    embedding_dims,
-                    preview,
-                    "..." if len(normalized_embedding) > 3 else "",
-                )
+    try:
+        page_size = limit or POLICY_PAGE_SIZE
+        policies = await _fetch_policy_page(after_id, page_size + 1, include_embedding)
+        has_more = len(policies) > page_size
+        policies = policies[:page_size]
 
-            policy['embedding'] = normalized_embedding
+        # Decoding vectors is CPU-bound; keep it off the event loop
+        await asyncio.to_thread(_prepare_policy_rows, policies, embedding_format)
 
-            meta = policy.get('meta')
-            if isinstance(meta, str):
-                try:
-                    policy['meta'] = json.loads(meta)
-                except json.JSONDecodeError:
-                    service.logger.warning(
-                        f"Policy {policy.get('id')} meta column is not valid JSON string; leaving as-is"
-                    )
-        
         service.log_request(request, {"status": "success", "count": len(policies)})
-        return policies
+        return {
+            "items": policies,
+            "count": len(policies),
+            "next_after_id": policies[-1]["id"] if has_more else None,
+            "embedding_format": embedding_format if include_embedding else None,
+        }
     except Exception as e:
         service.log_error(e, "get_policies endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _stream_policies(
+    request: Request,
+    after_id: Optional[int],
+    limit: Optional[int],
+    include_embedding: bool,
+    embedding_format: str,
+):
+    cursor = after_id
+    remaining = limit
+    sent = 0
+    try:
+        while remaining is None or remaining > 0:
+            batch_size = POLICY_STREAM_BATCH if remaining is None else min(POLICY_STREAM_BATCH, remaining)
+            policies = await _fetch_policy_page(cursor, batch_size, include_embedding)
+            if not policies:
+                break
+            await asyncio.to_thread(_prepare_policy_rows, policies, embedding_format)
+            yield "".join(json.dumps(policy, default=str) + "\n" for policy in policies)
+
+            sent += len(policies)
+            cursor = policies[-1]["id"]
+            if remaining is not None:
+                remaining -= len(policies)
+            if len(policies) < batch_size:
+                break
+    except Exception as e:
+        # Headers are already sent, so the stream just ends early
+        service.log_error(e, "get_policies ndjson stream")
+        return
+    service.log_request(request, {"status": "success", "count": sent, "format": "ndjson"})
+
 @app.post("/data/policies")
-async def create_policy(policy: Policy, request: Request):
+async def create_policy(policy: Policy, background_tasks: BackgroundTasks, request: Request):
     try:
         # Insert document
         doc_query = "INSERT INTO docs (title, content, meta) VALUES (%s, %s, %s) RETURNING id"
         doc_params = (policy.title, policy.content, json.dumps(policy.meta))
         
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(doc_query, doc_params)
-                doc_id = cur.fetchone()[0]
+        # Generate the embedding before taking a pooled connection
+        embedding = await embed(policy.content[:5000])  # Truncate for embedding
+
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(doc_query, doc_params)
+                doc_id = (await cur.fetchone())[0]
                 
-                # Generate and insert embedding
-                embedding = embed(policy.content[:5000])  # Truncate for embedding
                 embed_query = "INSERT INTO doc_embeddings (doc_id, embedding) VALUES (%s, %s)"
                 embed_params = (doc_id, embedding)
-                cur.execute(embed_query, embed_params)
+                await cur.execute(embed_query, embed_params)
         
+        _notify_after_response(background_tasks, _notify_knowledge_index("/index/docs", {"upsert": [doc_id]}))
         service.log_request(request, {"status": "success"})
         return {"message": "Policy created successfully", "id": doc_id}
     except Exception as e:
@@ -1198,25 +1457,26 @@ async def create_policy(policy: Policy, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/data/policies/{policy_id}")
-async def update_policy(policy_id: int, policy: Policy, request: Request):
+async def update_policy(policy_id: int, policy: Policy, background_tasks: BackgroundTasks, request: Request):
     try:
         # Update document
         doc_query = "UPDATE docs SET title=%s, content=%s, meta=%s WHERE id=%s"
         doc_params = (policy.title, policy.content, json.dumps(policy.meta), policy_id)
-        rows_affected = execute_update(doc_query, doc_params)
+        rows_affected = await execute_update(doc_query, doc_params)
         
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Policy not found")
         
         # Generate and update embedding
-        embedding = embed(policy.content[:5000])  # Truncate for embedding
+        embedding = await embed(policy.content[:5000])  # Truncate for embedding
         embed_query = """
             INSERT INTO doc_embeddings (doc_id, embedding) VALUES (%s, %s)
             ON CONFLICT (doc_id) DO UPDATE SET embedding = EXCLUDED.embedding
         """
         embed_params = (policy_id, embedding)
-        execute_insert(embed_query, embed_params)
+        await execute_insert(embed_query, embed_params)
         
+        _notify_after_response(background_tasks, _notify_knowledge_index("/index/docs", {"upsert": [policy_id]}))
         service.log_request(request, {"status": "success"})
         return {"message": "Policy updated successfully"}
     except HTTPException:
@@ -1226,12 +1486,13 @@ async def update_policy(policy_id: int, policy: Policy, request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/data/policies/{policy_id}")
-async def delete_policy(policy_id: int, request: Request):
+async def delete_policy(policy_id: int, background_tasks: BackgroundTasks, request: Request):
     try:
         query = "DELETE FROM docs WHERE id=%s"
-        rows_affected = execute_delete(query, (policy_id,))
+        rows_affected = await execute_delete(query, (policy_id,))
         if rows_affected == 0:
             raise HTTPException(status_code=404, detail="Policy not found")
+        _notify_after_response(background_tasks, _notify_knowledge_index("/index/docs", {"delete": [policy_id]}))
         service.log_request(request, {"status": "success"})
         return {"message": "Policy deleted successfully"}
     except HTTPException:
@@ -1248,7 +1509,7 @@ async def search_policies(query: dict, request: Request):
             return []
         
         # Simple text search for now - could be enhanced with vector search
-        policies = execute_query("""
+        policies = await execute_query("""
             SELECT d.id, d.title, d.content, d.meta, de.embedding, vector_dims(de.embedding) as embedding_dims
             FROM docs d
             LEFT JOIN doc_embeddings de ON d.id = de.doc_id
@@ -1256,19 +1517,7 @@ async def search_policies(query: dict, request: Request):
             ORDER BY d.id
         """, (f"%{search_term}%", f"%{search_term}%"))
         
-        for policy in policies:
-            raw_embedding = policy.get('embedding')
-            embedding_dims = policy.pop('embedding_dims', None)
-            policy['embedding'] = _normalize_embedding(raw_embedding, embedding_dims)
-
-            meta = policy.get('meta')
-            if isinstance(meta, str):
-                try:
-                    policy['meta'] = json.loads(meta)
-                except json.JSONDecodeError:
-                    service.logger.warning(
-                        f"Policy {policy.get('id')} meta column is not valid JSON string; leaving as-is"
-                    )
+        await asyncio.to_thread(_prepare_policy_rows, policies)
         
         service.log_request(request, {"status": "success", "count": len(policies)})
         return policies
@@ -1280,8 +1529,8 @@ async def search_policies(query: dict, request: Request):
 async def debug_policies(request: Request):
     """Debug endpoint to check the current state of policies and embeddings."""
     try:
-        all_docs = execute_query("SELECT id, title, content FROM docs ORDER BY id")
-        all_embeddings = execute_query("SELECT doc_id, vector_dims(embedding) as dims FROM doc_embeddings ORDER BY doc_id")
+        all_docs = await execute_query("SELECT id, title, content FROM docs ORDER BY id")
+        all_embeddings = await execute_query("SELECT doc_id, vector_dims(embedding) as dims FROM doc_embeddings ORDER BY doc_id")
         
         # Check which docs have embeddings
         docs_with_embeddings = set(row['doc_id'] for row in all_embeddings)
@@ -1303,13 +1552,13 @@ async def regenerate_embeddings(request: Request):
     """Regenerate embeddings for all policies that don't have them."""
     try:
         # First, let's check what's in the database
-        all_docs = execute_query("SELECT id, title FROM docs ORDER BY id")
-        all_embeddings = execute_query("SELECT doc_id FROM doc_embeddings ORDER BY doc_id")
+        all_docs = await execute_query("SELECT id, title FROM docs ORDER BY id")
+        all_embeddings = await execute_query("SELECT doc_id FROM doc_embeddings ORDER BY doc_id")
         
         service.logger.info(f"Total docs: {len(all_docs)}, Total embeddings: {len(all_embeddings)}")
         
         # Get all policies without embeddings - use NOT EXISTS for better reliability
-        policies_without_embeddings = execute_query("""
+        policies_without_embeddings = await execute_query("""
             SELECT d.id, d.title, d.content
             FROM docs d
             WHERE NOT EXISTS (
@@ -1320,17 +1569,16 @@ async def regenerate_embeddings(request: Request):
         
         service.logger.info(f"Policies without embeddings: {len(policies_without_embeddings)}")
         
+        # Embed before taking a pooled connection so it is not held across API calls
+        embeddings = [await embed(policy['content'][:5000]) for policy in policies_without_embeddings]
+
         updated_count = 0
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                for policy in policies_without_embeddings:
-                    # Generate embedding
-                    embedding = embed(policy['content'][:5000])
-                    
-                    # Insert embedding
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cur:
+                for policy, embedding in zip(policies_without_embeddings, embeddings):
                     embed_query = "INSERT INTO doc_embeddings (doc_id, embedding) VALUES (%s, %s)"
                     embed_params = (policy['id'], embedding)
-                    cur.execute(embed_query, embed_params)
+                    await cur.execute(embed_query, embed_params)
                     updated_count += 1
         
         service.log_request(request, {"status": "success", "updated_count": updated_count})
@@ -1348,24 +1596,22 @@ async def force_regenerate_embeddings(request: Request):
     """Force regenerate embeddings for ALL policies (delete existing and recreate)."""
     try:
         # Get all policies
-        all_docs = execute_query("SELECT id, title, content FROM docs ORDER BY id")
+        all_docs = await execute_query("SELECT id, title, content FROM docs ORDER BY id")
         
         service.logger.info(f"Force regenerating embeddings for {len(all_docs)} policies")
         
+        embeddings = [await embed(policy['content'][:5000]) for policy in all_docs]
+
         updated_count = 0
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cur:
                 # Clear all existing embeddings
-                cur.execute("DELETE FROM doc_embeddings")
+                await cur.execute("DELETE FROM doc_embeddings")
                 
-                for policy in all_docs:
-                    # Generate embedding
-                    embedding = embed(policy['content'][:5000])
-                    
-                    # Insert embedding
+                for policy, embedding in zip(all_docs, embeddings):
                     embed_query = "INSERT INTO doc_embeddings (doc_id, embedding) VALUES (%s, %s)"
                     embed_params = (policy['id'], embedding)
-                    cur.execute(embed_query, embed_params)
+                    await cur.execute(embed_query, embed_params)
                     updated_count += 1
         
         service.log_request(request, {"status": "success", "updated_count": updated_count})
@@ -1380,18 +1626,18 @@ async def force_regenerate_embeddings(request: Request):
 
 # Clear all data endpoint
 @app.delete("/data/clear")
-async def clear_all_data(request: Request):
+async def clear_all_data(background_tasks: BackgroundTasks, request: Request):
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
+        async with get_db_connection() as conn:
+            async with conn.cursor() as cur:
                 # Clear all data from tables (in order to respect foreign key constraints)
-                cur.execute("DELETE FROM doc_embeddings")
-                cur.execute("DELETE FROM docs")
-                cur.execute("DELETE FROM crew_roster")
-                cur.execute("DELETE FROM bookings")
-                cur.execute("DELETE FROM flights")
-                cur.execute("DELETE FROM crew_details")
-                cur.execute("DELETE FROM aircraft_status")
+                await cur.execute("DELETE FROM doc_embeddings")
+                await cur.execute("DELETE FROM docs")
+                await cur.execute("DELETE FROM crew_roster")
+                await cur.execute("DELETE FROM bookings")
+                await cur.execute("DELETE FROM flights")
+                await cur.execute("DELETE FROM crew_details")
+                await cur.execute("DELETE FROM aircraft_status")
                 
                 # Get counts of deleted records
                 counts = {
@@ -1403,6 +1649,13 @@ async def clear_all_data(request: Request):
                     "policies": cur.rowcount if 'docs' in locals() else 0
                 }
         
+        _notify_after_response(
+            background_tasks,
+            _notify_knowledge_index("/index/rebuild"),
+            _notify_crew_index("/index/rebuild"),
+            _notify_delay_stats({}),
+            _notify_query_cache(),
+        )
         service.log_request(request, {"status": "success", "counts": counts})
         return {
             "ok": True,
@@ -1418,9 +1671,10 @@ async def clear_all_data(request: Request):
 async def predict_disruptions(request: Request):
     """Predict potential disruptions for flights"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{PREDICTIVE_URL}/predict_disruptions", json=await request.json())
-            return response.json()
+        response = await _upstream("predictive").post("/predict_disruptions", json=await request.json())
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "predict_disruptions endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1429,9 +1683,10 @@ async def predict_disruptions(request: Request):
 async def bulk_predict_disruptions(request: Request):
     """Predict disruptions for all flights in the next 24 hours"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{PREDICTIVE_URL}/bulk_predict")
-            return response.json()
+        response = await _upstream("predictive").post("/bulk_predict")
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "bulk_predict_disruptions endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1441,9 +1696,10 @@ async def bulk_predict_disruptions(request: Request):
 async def optimize_crew_assignments(request: Request):
     """Optimize crew assignments for a flight"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{CREW_URL}/optimize_crew", json=await request.json())
-            return response.json()
+        response = await _upstream("crew").post("/optimize_crew", json=await request.json())
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "optimize_crew_assignments endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1452,9 +1708,10 @@ async def optimize_crew_assignments(request: Request):
 async def suggest_crew_swap(request: Request):
     """Suggest crew replacement for unavailable crew member"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{CREW_URL}/suggest_crew_swap", json=await request.json())
-            return response.json()
+        response = await _upstream("crew").post("/suggest_crew_swap", json=await request.json())
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "suggest_crew_swap endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1463,9 +1720,12 @@ async def suggest_crew_swap(request: Request):
 async def check_crew_legality(crew_id: str, flight_no: str, date: str, request: Request):
     """Check legality of a specific crew member for a flight"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{CREW_URL}/crew_legality/{crew_id}?flight_no={flight_no}&date={date}")
-            return response.json()
+        response = await _upstream("crew").get(
+            f"/crew_legality/{crew_id}", params={"flight_no": flight_no, "date": date}
+        )
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "check_crew_legality endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1478,9 +1738,10 @@ async def get_crew_availability(date: str, role: Optional[str] = None, request:
         if role:
             params["role"] = role
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{CREW_URL}/crew_availability", params=params)
-            return response.json()
+        response = await _upstream("crew").get("/crew_availability", params=params)
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "get_crew_availability endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1492,7 +1753,7 @@ async def get_flight_autocomplete(q: str = "", limit: int = 10, request: Request
     try:
         if not q or len(q) < 1:
             # Return recent flights if no query
-            flights = execute_query("""
+            flights = await execute_query("""
                 SELECT DISTINCT flight_no, flight_date, origin, destination, status
                 FROM flights 
                 ORDER BY flight_date DESC, flight_no 
@@ -1500,7 +1761,7 @@ async def get_flight_autocomplete(q: str = "", limit: int = 10, request: Request
             """, (limit,))
         else:
             # Search for flights matching the query
-            flights = execute_query("""
+            flights = await execute_query("""
                 SELECT DISTINCT 
                     flight_no, 
                     flight_date, 
@@ -1540,9 +1801,10 @@ async def get_flight_autocomplete(q: str = "", limit: int = 10, request: Request
 async def draft_multilingual_communication(request: Request):
     """Generate communications in multiple languages"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{COMMS_URL}/draft_multilingual", json=await request.json())
-            return response.json()
+        response = await _upstream("comms").post("/draft_multilingual", json=await request.json())
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "draft_multilingual_communication endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1551,9 +1813,10 @@ async def draft_multilingual_communication(request: Request):
 async def analyze_communication_sentiment(request: Request):
     """Analyze sentiment of customer communication"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{COMMS_URL}/analyze_sentiment", json=await request.json())
-            return response.json()
+        response = await _upstream("comms").post("/analyze_sentiment", json=await request.json())
+        return response.json()
+    except HTTPException:
+        raise
     except Exception as e:
         service.log_error(e, "analyze_communication_sentiment endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1564,30 +1827,44 @@ async def track_llm_message(request: Request):
     """Track an LLM message from a service"""
     try:
         message_data = await request.json()
-        llm_messages.append(message_data)
-        # Keep only last 1000 messages
-        if len(llm_messages) > 1000:
-            llm_messages[:] = llm_messages[-1000:]
+        _record_llm_messages([message_data])
         return {"status": "success", "message_id": message_data.get("id")}
     except Exception as e:
         service.log_error(e, "track_llm_message endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/llm/track/batch")
+async def track_llm_messages_batch(batch: LLMMessageBatch):
+    """Track a batch of LLM messages posted by a service's background tracking sink"""
+    try:
+        _record_llm_messages(batch.messages)
+        return {"status": "success", "accepted": len(batch.messages)}
+    except Exception as e:
+        service.log_error(e, "track_llm_messages_batch endpoint")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/llm/messages")
-async def get_llm_messages(limit: int = 50, service: Optional[str] = None):
-    """Get recent LLM messages"""
+async def get_llm_messages(
+    limit: int = Query(50, ge=1, le=LLM_MESSAGE_CAPACITY),
+    service_name: Optional[str] = Query(None, alias="service"),
+    after: Optional[int] = Query(None, ge=0, description="Cursor: only messages with a greater seq, oldest first"),
+    start: Optional[datetime] = Query(None, description="Received at or after (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Received before (ISO 8601)"),
+):
+    """Get LLM messages: newest first, since a cursor, or within a time window"""
     try:
-        messages = llm_messages.copy()
-        
-        # Filter by service if specified
-        if service:
-            messages = [msg for msg in messages if msg.get("service") == service]
-        
-        # Sort by timestamp (newest first) and limit
-        messages.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        messages = messages[:limit]
+        if after is not None:
+            messages = llm_messages.since(after, limit, service_name)
+            # A short page means everything up to last_seq has been seen
+            cursor = messages[-1]["seq"] if len(messages) == limit else max(after, llm_messages.last_seq)
+        elif start or end:
+            messages = llm_messages.between(start, end, limit, service_name)
+            cursor = llm_messages.last_seq
+        else:
+            messages = llm_messages.recent(limit, service_name)
+            cursor = llm_messages.last_seq
         
-        return {"messages": messages, "total": len(messages)}
+        return {"messages": messages, "total": len(messages), "cursor": cursor}
     except Exception as e:
         service.log_error(e, "get_llm_messages endpoint")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,201 @@
+"""
+Bounded LLM message store for gateway-api.
+
+Messages live in a fixed-capacity ring buffer and are numbered with a
+monotonically increasing ``seq`` on arrival, which doubles as the polling
+cursor. A per-service deque of seqs and the arrival time of every slot act as
+secondary indexes, so "newest N", "newest N for a service", "everything after
+cursor X" and arrival-time windows only touch the messages they return.
+Messages evicted from the ring can spill to an optional SQLite file holding
+the long history.
+"""
+
+import json
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+
+class LLMMessageStore:
+    """Ring buffer of tracked LLM messages with service/time indexes and cursor reads."""
+
+    def __init__(self, capacity: int = 1000, spill_path: Optional[str] = None):
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._by_service: Dict[str, Deque[int]] = {}
+        self._spill: Optional[sqlite3.Connection] = None
+        self._next_seq = 1
+        self._first_seq = 1  # oldest seq still in the ring
+
+        if spill_path:
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False)
+            self._spill.execute(
+                "CREATE TABLE IF NOT EXISTS llm_messages "
+                "(seq INTEGER PRIMARY KEY, service TEXT, received_at REAL, body TEXT)"
+            )
+            self._spill.execute("CREATE INDEX IF NOT EXISTS llm_messages_service ON llm_messages (service, seq)")
+            last = self._spill.execute("SELECT MAX(seq) FROM llm_messages").fetchone()[0]
+            self._next_seq = self._first_seq = (last or 0) + 1
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append_many(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """Store ``messages`` and return their seqs; evicts (and spills) the oldest when full."""
+        seqs = []
+        evicted = []
+        received_at = time.time()
+        for message in messages:
+            seq = self._next_seq
+            self._next_seq += 1
+            slot = seq % self.capacity
+            old = self._slots[slot]
+            if old is not None:
+                evicted.append(old)
+                # The evicted message is the oldest overall, so it is also the oldest of its service
+                service_seqs = self._by_service[old.get("service") or ""]
+                service_seqs.popleft()
+                if not service_seqs:
+                    del self._by_service[old.get("service") or ""]
+                self._first_seq = old["seq"] + 1
+            record = {**message, "seq": seq, "received_at": received_at}
+            self._slots[slot] = record
+            self._by_service.setdefault(record.get("service") or "", deque()).append(seq)
+            seqs.append(seq)
+        self._spill_records(evicted)
+        return seqs
+
+    def append(self, message: Dict[str, Any]) -> int:
+        return self.append_many([message])[0]
+
+    def clear(self) -> None:
+        """Drop every message (ring and spill); cursors keep increasing."""
+        self._slots = [None] * self.capacity
+        self._by_service.clear()
+        self._first_seq = self._next_seq
+        if self._spill is not None:
+            with self._spill:
+                self._spill.execute("DELETE FROM llm_messages")
+
+    def close(self) -> None:
+        """Spill what is still in the ring so the history survives a restart."""
+        if self._spill is None:
+            return
+        self._spill_records([self._slots[seq % self.capacity] for seq in range(self._first_seq, self._next_seq)])
+        self._spill.close()
+        self._spill = None
+
+    def _spill_records(self, records: List[Dict[str, Any]]) -> None:
+        if self._spill is None or not records:
+            return
+        with self._spill:
+            self._spill.executemany(
+                "INSERT OR REPLACE INTO llm_messages (seq, service, received_at, body) VALUES (?, ?, ?, ?)",
+                [
+                    (record["seq"], record.get("service") or "", record["received_at"], json.dumps(record, default=str))
+                    for record in records
+                ],
+            )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    def _get(self, seq: int) -> Dict[str, Any]:
+        return self._slots[seq % self.capacity]
+
+    def _spilled(self, where: str, params: List[Any], order: str, limit: int) -> List[Dict[str, Any]]:
+        if self._spill is None or limit <= 0:
+            return []
+        rows = self._spill.execute(
+            f"SELECT body FROM llm_messages WHERE {where} ORDER BY seq {order} LIMIT ?", [*params, limit]
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def recent(self, limit: int = 50, service: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest ``limit`` messages (optionally for one service), newest first."""
+        if service is not None:
+            seqs = self._by_service.get(service, ())
+            messages = [self._get(seq) for _, seq in zip(range(limit), reversed(seqs))]
+        else:
+            newest = range(self.last_seq, self._first_seq - 1, -1)
+            messages = [self._get(seq) for _, seq in zip(range(limit), newest)]
+
+        if len(messages) < limit:
+            where, params = "seq < ?", [self._first_seq]
+            if service is not None:
+                where, params = "service = ? AND seq < ?", [service, self._first_seq]
+            messages.extend(self._spilled(where, params, "DESC", limit - len(messages)))
+        return messages
+
+    def since(self, after: int, limit: int = 50, service: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Up to ``limit`` messages with seq > ``after``, oldest first (cost is O(new messages))."""
+        messages: List[Dict[str, Any]] = []
+        if after + 1 < self._first_seq:
+            where, params = "seq > ? AND seq < ?", [after, self._first_seq]
+            if service is not None:
+                where, params = "service = ? AND " + where, [service, *params]
+            messages = self._spilled(where, params, "ASC", limit)
+            if len(messages) >= limit:
+                return messages
+
+        if service is not None:
+            newer = []
+            for seq in reversed(self._by_service.get(service, ())):
+                if seq <= after:
+                    break
+                newer.append(seq)
+            seqs = reversed(newer)
+        else:
+            seqs = range(max(after + 1, self._first_seq), self._next_seq)
+        for seq in seqs:
+            if len(messages) >= limit:
+                break
+            messages.append(self._get(seq))
+        return messages
+
+    def _first_received_at_or_after(self, timestamp: float) -> int:
+        """Smallest seq in the ring received at or after ``timestamp`` (binary search over arrival order)."""
+        low, high = self._first_seq, self._next_seq
+        while low < high:
+            mid = (low + high) // 2
+            if self._get(mid)["received_at"] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        service: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Messages received in [start, end), newest first."""
+        low = self._first_received_at_or_after(start.timestamp()) if start else self._first_seq
+        high = self._first_received_at_or_after(end.timestamp()) if end else self._next_seq
+        messages = []
+        for seq in range(high - 1, low - 1, -1):
+            if len(messages) >= limit:
+                break
+            message = self._get(seq)
+            if service is None or message.get("service") == service:
+                messages.append(message)
+        return messages
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": self._next_seq - self._first_seq,
+            "capacity": self.capacity,
+            "last_seq": self.last_seq,
+            "services": {service: len(seqs) for service, seqs in self._by_service.items()},
+            "spill": self._spill is not None,
+        }
@@ -1,19 +1,24 @@
 import csv
 import glob
+import hashlib
 import json
 import os
 import re
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime, date, time
+from time import perf_counter
 from typing import Dict, List, Tuple, Optional, Any
 
+import httpx
 import psycopg
 from fastapi import Request
 from pydantic import BaseModel
 from psycopg_pool import ConnectionPool
 
 from services.shared.base_service import BaseService, log_startup
+from services.shared.embedding_client import EmbeddingClient
 
 # Initialize base service
 service = BaseService("ingest-svc", "1.0.0")
@@ -27,6 +32,29 @@ DB_USER = service.get_env_var("DB_USER")
 DB_PASS = service.get_env_var("DB_PASS")
 EMBEDDINGS_MODEL = service.get_env_var("EMBEDDINGS_MODEL")
 OPENAI_API_KEY = service.get_env_var("OPENAI_API_KEY")
+KNOWLEDGE_SERVICE_URL = service.get_env_var("KNOWLEDGE_SERVICE_URL", "http://knowledge-engine:8081")
+CHATBOT_URL = service.get_env_var("CHATBOT_URL", "http://scalable-chatbot-svc:8088")
+
+# Embedding pipeline tuning
+EMBED_BATCH_SIZE = service.get_env_int("EMBED_BATCH_SIZE", 64)
+EMBED_MAX_CONCURRENCY = service.get_env_int("EMBED_MAX_CONCURRENCY", 4)
+EMBED_MAX_RETRIES = service.get_env_int("EMBED_MAX_RETRIES", 3)
+EMBED_MAX_CHARS = 5000
+
+# ANN index on doc_embeddings.embedding ("hnsw" or "ivfflat")
+VECTOR_INDEX_TYPE = service.get_env_var("VECTOR_INDEX_TYPE", "hnsw").lower()
+VECTOR_HNSW_M = service.get_env_int("VECTOR_HNSW_M", 16)
+VECTOR_HNSW_EF_CONSTRUCTION = service.get_env_int("VECTOR_HNSW_EF_CONSTRUCTION", 64)
+VECTOR_IVFFLAT_LISTS = service.get_env_int("VECTOR_IVFFLAT_LISTS", 100)
+
+# Document chunks are embedded once per content hash, so skip the in-process cache
+embedding_client = EmbeddingClient(
+    "ingest-svc",
+    api_key=OPENAI_API_KEY,
+    model=EMBEDDINGS_MODEL,
+    cache_size=0,
+    max_retries=EMBED_MAX_RETRIES,
+)
 
 # Create database connection pool
 DB_CONN_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASS}"
@@ -34,16 +62,50 @@ db_pool = None
 
 DATA_DIR = "/data"
 
-def embed(text: str) -> List[float]:
-    """Generate embeddings using OpenAI API."""
+def embed_batch(texts: List[str]) -> List[Optional[List[float]]]:
+    """Generate embeddings for many texts with batched, bounded-concurrency API calls.
+
+    Returns one entry per input text; entries are None when their batch failed.
+    """
+    batches = [
+        [text[:EMBED_MAX_CHARS] for text in texts[start:start + EMBED_BATCH_SIZE]]
+        for start in range(0, len(texts), EMBED_BATCH_SIZE)
+    ]
+
+    def run(batch: List[str]) -> List[Optional[List[float]]]:
+        try:
+            return embedding_client.embed_many(batch)
+        except Exception as e:
+            service.log_error(e, f"embedding generation for batch of {len(batch)}")
+            return [None] * len(batch)
+
+    embeddings: List[Optional[List[float]]] = []
+    with ThreadPoolExecutor(max_workers=max(1, EMBED_MAX_CONCURRENCY)) as executor:
+        for result in executor.map(run, batches):
+            embeddings.extend(result)
+    return embeddings
+
+def notify_knowledge_index(path: str = "/index/rebuild", payload: Optional[Dict[str, Any]] = None) -> bool:
+    """Ask knowledge-engine to refresh its BM25 index after docs change."""
+    try:
+        resp = httpx.post(f"{KNOWLEDGE_SERVICE_URL}{path}", json=payload, timeout=30.0)
+        resp.raise_for_status()
+        return True
+    except Exception as e:
+        # Non-fatal: knowledge-engine rebuilds its index on startup anyway
+        service.log_error(e, f"knowledge index refresh ({path})")
+        return False
+
+def notify_response_cache() -> bool:
+    """Ask scalable-chatbot-svc to drop cached knowledge-base answers after docs change."""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)  # Uses OPENAI_API_KEY from environment
-        resp = client.embeddings.create(input=[text], model=EMBEDDINGS_MODEL)
-        return resp.data[0].embedding
+        resp = httpx.post(f"{CHATBOT_URL}/cache/invalidate", timeout=10.0)
+        resp.raise_for_status()
+        return True
     except Exception as e:
-        service.log_error(e, "embedding generation")
-        raise e
+        # Non-fatal: cached answers also expire by TTL
+        service.log_error(e, "chatbot response cache invalidation")
+        return False
 
 def parse_yaml_frontmatter(content: str) -> Tuple[Dict, str]:
     """Parse YAML frontmatter from markdown content."""
@@ -84,26 +146,38 @@ def categorize_document(filename: str) -> str:
     else:
         return "other"
 
-def chunk_text(text: str, chunk_size: int = 400, overlap: float = 0.15) -> List[str]:
-    """Split text into overlapping chunks for better knowledge search."""
-    # Simple word-based chunking
-    words = text.split()
-    chunk_size_words = chunk_size
-    overlap_words = int(chunk_size_words * overlap)
-    
+SECTION_HEADING = re.compile(r"^##\s", re.MULTILINE)
+
+def _window_words(words: List[str], chunk_size: int, overlap_words: int) -> List[str]:
     chunks = []
     start = 0
-    
+
     while start < len(words):
-        end = min(start + chunk_size_words, len(words))
-        chunk = ' '.join(words[start:end])
-        chunks.append(chunk)
-        
+        end = min(start + chunk_size, len(words))
+        chunks.append(' '.join(words[start:end]))
+
         if end >= len(words):
             break
-            
+
         start = end - overlap_words
-    
+
+    return chunks
+
+def chunk_text(text: str, chunk_size: int = 400, overlap: float = 0.15) -> List[str]:
+    """Split text into overlapping chunks for better knowledge search.
+
+    Chunks never cross a ## markdown section (text before the first one joins
+    it), so an edit only changes the chunks of its own section; sections longer
+    than chunk_size words are split into overlapping word windows.
+    """
+    overlap_words = int(chunk_size * overlap)
+    starts = [0] + [m.start() for m in SECTION_HEADING.finditer(text)][1:]
+
+    chunks = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        words = text[start:end].split()
+        if words:
+            chunks.extend(_window_words(words, chunk_size, overlap_words))
     return chunks
 
 def estimate_tokens(text: str) -> int:
@@ -316,14 +390,110 @@ def parse_csv_files() -> Dict[str, int]:
 
     return counts
 
-def parse_markdown_files(kb_only: bool = False) -> Tuple[int, bool]:
-    """Parse markdown policy files and return count of loaded docs and embeddings availability."""
+def ensure_vector_index(cur) -> None:
+    """Create the cosine ANN index used by knowledge-engine vector search."""
+    if VECTOR_INDEX_TYPE == "ivfflat":
+        # IVFFlat centroids come from existing rows, so rebuild it after loads
+        cur.execute("DROP INDEX IF EXISTS doc_embeddings_embedding_hnsw_idx")
+        cur.execute("DROP INDEX IF EXISTS doc_embeddings_embedding_ivfflat_idx")
+        cur.execute(
+            f"""
+            CREATE INDEX doc_embeddings_embedding_ivfflat_idx
+            ON doc_embeddings USING ivfflat (embedding vector_cosine_ops)
+            WITH (lists = {VECTOR_IVFFLAT_LISTS})
+            """
+        )
+    else:
+        cur.execute("DROP INDEX IF EXISTS doc_embeddings_embedding_ivfflat_idx")
+        cur.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS doc_embeddings_embedding_hnsw_idx
+            ON doc_embeddings USING hnsw (embedding vector_cosine_ops)
+            WITH (m = {VECTOR_HNSW_M}, ef_construction = {VECTOR_HNSW_EF_CONSTRUCTION})
+            """
+        )
+
+def chunk_content_hash(chunk: str) -> str:
+    """Stable hash of the embedded part of a chunk (its content).
+
+    The title ("Part N") and metadata such as chunk_index are left out so that
+    a section added or grown elsewhere in the file does not force unchanged
+    chunks to be re-embedded; title and metadata changes are written in place.
+    """
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+def _meta_fingerprint(meta: Dict[str, Any]) -> str:
+    return json.dumps(meta, sort_keys=True, default=str)
+
+def collect_markdown_chunks(kb_only: bool = False) -> Tuple[int, List[Tuple[str, str, Dict[str, Any]]]]:
+    """Parse and chunk the markdown corpus into (title, content, meta) rows."""
     doc_count = 0
-    chunk_count = 0
-    embeddings_available = True  # Will be determined by actual API call
-    
+    rows: List[Tuple[str, str, Dict[str, Any]]] = []
+    for md_file in sorted(glob.glob(f"{DATA_DIR}/docs/*.md")):
+        filename = os.path.basename(md_file)
+        
+        # Categorize document
+        doc_category = categorize_document(filename)
+
+        # Filter for knowledge base only if requested (documents 01-12)
+        if kb_only and doc_category != "customer":
+            continue
+        
+        with open(md_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Parse YAML frontmatter
+        frontmatter, content_without_frontmatter = parse_yaml_frontmatter(content)
+        
+        # Use frontmatter title if available, otherwise generate from filename
+        title = frontmatter.get('title', filename.replace(".md", "").replace("_", " ").title())
+        
+        # Create metadata with category and frontmatter
+        meta = {
+            "source": filename,
+            "category": doc_category,
+            "frontmatter": frontmatter
+        }
+        
+        # Chunk the content for better knowledge search
+        chunks = chunk_text(content_without_frontmatter, chunk_size=400, overlap=0.15)
+        
+        # Store each chunk as a separate document
+        for i, chunk in enumerate(chunks):
+            chunk_title = f"{title} (Part {i+1})" if len(chunks) > 1 else title
+            chunk_meta = meta.copy()
+            chunk_meta.update({
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                "tokens_estimated": estimate_tokens(chunk)
+            })
+            chunk_meta["content_hash"] = chunk_content_hash(chunk)
+            rows.append((chunk_title, chunk, chunk_meta))
+        
+        doc_count += 1
+    return doc_count, rows
+
+def parse_markdown_files(kb_only: bool = False, incremental: bool = True) -> Dict[str, Any]:
+    """Parse markdown policy files and sync them, with embeddings, into docs.
+
+    In incremental mode each chunk is matched to a stored chunk of the same
+    source with the same content hash, wherever it sits in the file; matched
+    chunks keep their doc ID and embedding (only their title and metadata are
+    updated if they differ). Unmatched chunks are (re-)embedded and inserted,
+    counting as updated when they replace a leftover stored chunk at the same
+    (source, chunk_index), and leftover chunks are deleted. A full reload
+    replaces everything.
+    Runs in three stages - parse/chunk, batched embedding, bulk write - and
+    reports per-stage timings in milliseconds.
+    """
+    timings: Dict[str, float] = {}
+
+    # Stage 1: parse and chunk every document
+    stage_start = perf_counter()
+    doc_count, rows = collect_markdown_chunks(kb_only)
+    timings["parse_ms"] = round((perf_counter() - stage_start) * 1000, 1)
+
     with db_pool.connection() as conn:
-        conn.autocommit = True
         with conn.cursor() as cur:
             # Enable vector extension
             cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
@@ -341,84 +511,187 @@ def parse_markdown_files(kb_only: bool = False) -> Tuple[int, bool]:
                     embedding vector(1536)
                 );
             """)
-            
-            # Clear existing data
-            cur.execute("DELETE FROM doc_embeddings")
-            cur.execute("DELETE FROM docs")
-            
-            # Process markdown files
-            for md_file in glob.glob(f"{DATA_DIR}/docs/*.md"):
-                filename = os.path.basename(md_file)
-                
-                # Filter for knowledge base only if requested (documents 01-12)
-                if kb_only:
-                    doc_category = categorize_document(filename)
-                    if doc_category != "customer":
-                        continue
-                
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Parse YAML frontmatter
-                frontmatter, content_without_frontmatter = parse_yaml_frontmatter(content)
-                
-                # Use frontmatter title if available, otherwise generate from filename
-                title = frontmatter.get('title', filename.replace(".md", "").replace("_", " ").title())
-                
-                # Categorize document
-                doc_category = categorize_document(filename)
-                
-                # Create metadata with category and frontmatter
-                meta = {
-                    "source": filename,
-                    "category": doc_category,
-                    "frontmatter": frontmatter
-                }
-                
-                # Chunk the content for better knowledge search
-                chunks = chunk_text(content_without_frontmatter, chunk_size=400, overlap=0.15)
-                
-                # Store each chunk as a separate document
-                for i, chunk in enumerate(chunks):
-                    chunk_meta = meta.copy()
-                    chunk_meta.update({
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "tokens_estimated": estimate_tokens(chunk)
-                    })
-                    
-                    # Insert document chunk
-                    cur.execute(
-                        "INSERT INTO docs(title, content, meta) VALUES (%s, %s, %s) RETURNING id",
-                        (f"{title} (Part {i+1})" if len(chunks) > 1 else title, chunk, json.dumps(chunk_meta))
-                    )
-                    doc_id = cur.fetchone()[0]
-                    chunk_count += 1
-                    
-                    # Generate and store embedding
-                    if embeddings_available:
-                        try:
-                            embedding = embed(chunk[:5000])  # Truncate for embedding
-                            cur.execute(
-                                "INSERT INTO doc_embeddings(doc_id, embedding) VALUES (%s, %s)",
-                                (doc_id, embedding)
-                            )
-                        except Exception as e:
-                            service.log_error(e, f"embedding generation for {filename} chunk {i}")
-                
-                doc_count += 1
-    
-    return doc_count, chunk_count, embeddings_available
+            conn.commit()
+
+            cur.execute("""
+                SELECT d.id, d.title, d.content, d.meta, de.doc_id IS NOT NULL
+                FROM docs d
+                LEFT JOIN doc_embeddings de ON de.doc_id = d.id
+                ORDER BY d.id
+            """)
+            existing_rows = cur.fetchall()
+
+    # Diff the parsed chunks against what is stored. The stored hash is
+    # recomputed from the row itself so edits made through the gateway
+    # policy CRUD are detected (and reverted to the file contents).
+    # Stored chunks keyed by (source, content_hash); identical chunks share a key
+    existing: Dict[Tuple[Any, str], List[Tuple[int, Any, str, bool, str]]] = {}
+    stale_ids: List[int] = []
+    for doc_id, stored_title, stored_content, stored_meta, has_embedding in existing_rows:
+        if not incremental:
+            stale_ids.append(doc_id)
+            continue
+        stored_meta = dict(stored_meta or {})
+        stored_hash = chunk_content_hash(stored_content or "")
+        stored_meta["content_hash"] = stored_hash
+        existing.setdefault((stored_meta.get("source"), stored_hash), []).append(
+            (doc_id, stored_meta.get("chunk_index"), stored_title, has_embedding, _meta_fingerprint(stored_meta))
+        )
+
+    new_rows: List[Tuple[str, str, Dict[str, Any]]] = []
+    reembed_ids: List[int] = []
+    reembed_chunks: List[str] = []
+    meta_updates: List[Tuple[str, str, int]] = []
+    retitled_ids: List[int] = []
+    unmatched: List[Tuple[str, str, Dict[str, Any]]] = []
+    for title, chunk, chunk_meta in rows:
+        matches = existing.get((chunk_meta["source"], chunk_meta["content_hash"]))
+        if not matches:
+            unmatched.append((title, chunk, chunk_meta))
+            continue
+        # Prefer the copy already at this position when the text repeats
+        index = next((i for i, m in enumerate(matches) if m[1] == chunk_meta["chunk_index"]), 0)
+        doc_id, _, stored_title, has_embedding, meta_fingerprint = matches.pop(index)
+        if stored_title != title or meta_fingerprint != _meta_fingerprint(chunk_meta):
+            # Same text, new title or metadata (e.g. chunk_index): no re-embedding needed
+            meta_updates.append((title, json.dumps(chunk_meta), doc_id))
+            if stored_title != title:
+                retitled_ids.append(doc_id)
+        if not has_embedding:
+            # Unchanged chunk whose embedding failed on a previous run
+            reembed_ids.append(doc_id)
+            reembed_chunks.append(chunk)
+    unchanged = len(rows) - len(unmatched)
+
+    # Leftover stored chunks at the position of a new chunk were edited in place
+    leftovers: Dict[Tuple[Any, Any], int] = {}
+    removed_ids: List[int] = []
+    for (source, _), matches in existing.items():
+        for doc_id, chunk_index, _, _, _ in matches:
+            if (source, chunk_index) in leftovers:
+                removed_ids.append(doc_id)
+            else:
+                leftovers[(source, chunk_index)] = doc_id
+    updated = 0
+    for title, chunk, chunk_meta in unmatched:
+        doc_id = leftovers.pop((chunk_meta["source"], chunk_meta["chunk_index"]), None)
+        if doc_id is not None:
+            updated += 1
+            stale_ids.append(doc_id)
+        new_rows.append((title, chunk, chunk_meta))
+    removed_ids.extend(leftovers.values())
+    delete_ids = stale_ids + removed_ids
+
+    # Stage 2: embed only new/changed chunks, before touching the database
+    stage_start = perf_counter()
+    embeddings = embed_batch([chunk for _, chunk, _ in new_rows] + reembed_chunks)
+    embeddings_available = all(embedding is not None for embedding in embeddings)
+    timings["embed_ms"] = round((perf_counter() - stage_start) * 1000, 1)
+
+    # Stage 3: apply the diff in bulk
+    stage_start = perf_counter()
+    with db_pool.connection() as conn:
+        with conn.cursor() as cur:
+            if delete_ids:
+                cur.execute("DELETE FROM docs WHERE id = ANY(%s)", (delete_ids,))
+
+            if meta_updates:
+                cur.executemany("UPDATE docs SET title = %s, meta = %s WHERE id = %s", meta_updates)
+
+            doc_ids: List[int] = []
+            if new_rows:
+                cur.executemany(
+                    "INSERT INTO docs(title, content, meta) VALUES (%s, %s, %s) RETURNING id",
+                    [(title, chunk, json.dumps(chunk_meta)) for title, chunk, chunk_meta in new_rows],
+                    returning=True,
+                )
+                while True:
+                    doc_ids.append(cur.fetchone()[0])
+                    if not cur.nextset():
+                        break
+
+            embedding_rows = [
+                (doc_id, embedding)
+                for doc_id, embedding in zip(doc_ids + reembed_ids, embeddings)
+                if embedding is not None
+            ]
+            if embedding_rows:
+                cur.executemany(
+                    """
+                    INSERT INTO doc_embeddings(doc_id, embedding) VALUES (%s, %s)
+                    ON CONFLICT (doc_id) DO UPDATE SET embedding = EXCLUDED.embedding
+                    """,
+                    embedding_rows,
+                )
+
+            ensure_vector_index(cur)
+    timings["write_ms"] = round((perf_counter() - stage_start) * 1000, 1)
+    timings["total_ms"] = round(sum(timings.values()), 1)
+
+    result = {
+        "documents": doc_count,
+        "chunks": len(rows),
+        "added": len(new_rows) - updated,
+        "updated": updated,
+        "unchanged": unchanged,
+        "metadata_updated": len(meta_updates),
+        "removed": len(delete_ids) - updated,
+        "embeddings_available": embeddings_available,
+        "timings": timings,
+        "inserted_ids": doc_ids,
+        "retitled_ids": retitled_ids,
+        "deleted_ids": delete_ids,
+    }
+    service.logger.info(
+        f"Markdown sync ({'incremental' if incremental else 'full'}): {len(rows)} chunks from "
+        f"{doc_count} documents, {result['added']} added, {updated} updated, {unchanged} unchanged "
+        f"({len(meta_updates)} with new metadata), "
+        f"{result['removed']} removed, {len(embedding_rows)} embedded in {timings}"
+    )
+    return result
+
+def _refresh_knowledge_index(sync: Dict[str, Any], incremental: bool) -> bool:
+    upsert_ids = sync["inserted_ids"] + sync["retitled_ids"]
+    if incremental and not upsert_ids and not sync["deleted_ids"]:
+        return True
+    if not incremental:
+        refreshed = notify_knowledge_index()
+    else:
+        refreshed = notify_knowledge_index(
+            "/index/docs",
+            {"upsert": upsert_ids, "delete": sync["deleted_ids"]},
+        )
+    # Invalidate after the index refresh so no stale answer is re-cached in between
+    notify_response_cache()
+    return refreshed
+
+def _chunk_counts(sync: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "documents": sync["documents"],
+        "chunks": sync["chunks"],
+        "chunks_added": sync["added"],
+        "chunks_updated": sync["updated"],
+        "chunks_unchanged": sync["unchanged"],
+        "chunks_removed": sync["removed"],
+    }
 
 @app.post("/ingest/seed")
-def ingest_seed(request: Request):
-    """Parse CSVs and markdown files, optionally compute embeddings."""
+def ingest_seed(request: Request, full: bool = False):
+    """Parse CSVs and markdown files, optionally compute embeddings.
+
+    Markdown chunks are synced incrementally unless ``full=true`` is passed.
+    """
     try:
         # Parse CSV files
+        csv_start = perf_counter()
         csv_counts = parse_csv_files()
+        csv_ms = round((perf_counter() - csv_start) * 1000, 1)
         
         # Parse markdown files (all documents)
-        doc_count, chunk_count, embeddings_available = parse_markdown_files(kb_only=False)
+        sync = parse_markdown_files(kb_only=False, incremental=not full)
+        timings = {"csv_ms": csv_ms, **sync["timings"]}
+        timings["total_ms"] = round(timings["total_ms"] + csv_ms, 1)
+        index_refreshed = _refresh_knowledge_index(sync, incremental=not full)
         
         # Calculate total counts
         total_csv_records = sum(csv_counts.values())
@@ -426,13 +699,15 @@ def ingest_seed(request: Request):
         result = {
             "ok": True,
             "message": "Successfully parsed CSVs and markdown files",
+            "mode": "full" if full else "incremental",
             "counts": {
                 "csv_records": csv_counts,
                 "total_csv_records": total_csv_records,
-                "documents": doc_count,
-                "chunks": chunk_count
+                **_chunk_counts(sync)
             },
-            "embeddings_available": embeddings_available
+            "embeddings_available": sync["embeddings_available"],
+            "search_index_refreshed": index_refreshed,
+            "timings_ms": timings
         }
         
         service.log_request(request, {"status": "success", "counts": result["counts"]})
@@ -443,25 +718,27 @@ def ingest_seed(request: Request):
         raise
 
 @app.post("/ingest/kb-only")
-def ingest_kb_only(request: Request):
+def ingest_kb_only(request: Request, full: bool = False):
     """Parse only knowledge base documents (01-12) with enhanced processing."""
     try:
         # Parse only knowledge base markdown files (documents 01-12)
-        doc_count, chunk_count, embeddings_available = parse_markdown_files(kb_only=True)
+        sync = parse_markdown_files(kb_only=True, incremental=not full)
+        index_refreshed = _refresh_knowledge_index(sync, incremental=not full)
         
         result = {
             "ok": True,
             "message": "Successfully parsed knowledge base documents (01-12)",
-            "counts": {
-                "documents": doc_count,
-                "chunks": chunk_count
-            },
-            "embeddings_available": embeddings_available,
+            "mode": "full" if full else "incremental",
+            "counts": _chunk_counts(sync),
+            "embeddings_available": sync["embeddings_available"],
+            "search_index_refreshed": index_refreshed,
+            "timings_ms": sync["timings"],
             "processing_features": {
                 "categorization": "Documents categorized as customer-facing",
                 "chunking": "Content chunked with 15% overlap",
                 "yaml_frontmatter": "YAML frontmatter parsed and stored in metadata",
-                "token_estimation": "Token count estimated for each chunk"
+                "token_estimation": "Token count estimated for each chunk",
+                "incremental_sync": "Unchanged chunks (by content hash) keep their doc IDs and embeddings"
             }
         }
         
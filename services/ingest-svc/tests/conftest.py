@@ -0,0 +1,13 @@
+"""
+Pytest configuration for ingest-svc tests.
+"""
+
+import os
+import sys
+
+# Add the parent directory to the path so we can import the service modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# ...and the repository root for services.shared
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+os.environ.setdefault("DB_PORT", "5432")
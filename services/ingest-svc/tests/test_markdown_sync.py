@@ -0,0 +1,145 @@
+"""
+Tests for the incremental markdown sync in ingest-svc.
+"""
+
+import json
+from contextlib import contextmanager
+
+import pytest
+
+import main
+
+
+class FakeCursor:
+    """Just enough of a psycopg cursor for parse_markdown_files against an in-memory docs table."""
+
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if sql.lstrip().startswith("SELECT d.id"):
+            self.result = [
+                (doc_id, doc["title"], doc["content"], doc["meta"], doc_id in self.db.embeddings)
+                for doc_id, doc in sorted(self.db.docs.items())
+            ]
+        elif sql.startswith("DELETE FROM docs"):
+            for doc_id in params[0]:
+                self.db.docs.pop(doc_id, None)
+                self.db.embeddings.pop(doc_id, None)
+
+    def executemany(self, sql, rows, returning=False):
+        if sql.startswith("UPDATE docs"):
+            for title, meta, doc_id in rows:
+                self.db.docs[doc_id].update(title=title, meta=json.loads(meta))
+        elif sql.startswith("INSERT INTO docs"):
+            self.result = []
+            for title, content, meta in rows:
+                self.db.next_id += 1
+                self.db.docs[self.db.next_id] = {"title": title, "content": content, "meta": json.loads(meta)}
+                self.result.append((self.db.next_id,))
+        elif "INTO doc_embeddings" in sql:
+            self.db.embeddings.update(rows)
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result.pop(0)
+
+    def nextset(self):
+        return True if self.result else None
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    def __init__(self):
+        self.docs = {}
+        self.embeddings = {}
+        self.next_id = 0
+
+    @contextmanager
+    def connection(self):
+        yield FakeConnection(self)
+
+
+SECTIONS = [
+    "## Checked Bags\nEach passenger may check two bags of up to 23 kg.",
+    "## Carry-on\nOne cabin bag and one personal item are allowed.",
+    "## Fees\nExtra bags cost 50 USD each way.",
+]
+
+
+@pytest.fixture
+def sync_env(tmp_path, monkeypatch):
+    (tmp_path / "docs").mkdir()
+    pool = FakePool()
+    embedded = []
+
+    def fake_embed_batch(texts):
+        embedded.extend(texts)
+        return [[0.0] for _ in texts]
+
+    monkeypatch.setattr(main, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "db_pool", pool)
+    monkeypatch.setattr(main, "embed_batch", fake_embed_batch)
+    return tmp_path / "docs" / "02_baggage.md", pool, embedded
+
+
+def _ids_by_content(pool):
+    return {doc["content"]: doc_id for doc_id, doc in pool.docs.items()}
+
+
+def test_paragraph_inserted_at_top_keeps_later_chunks(sync_env):
+    path, pool, embedded = sync_env
+    path.write_text("# Baggage\n\n" + "\n\n".join(SECTIONS))
+    main.parse_markdown_files()
+    before = _ids_by_content(pool)
+    assert len(before) == 3
+    embedded.clear()
+
+    path.write_text("# Baggage\n\nRead this before you pack.\n\n" + "\n\n".join(SECTIONS))
+    result = main.parse_markdown_files()
+
+    after = _ids_by_content(pool)
+    later = [" ".join(section.split()) for section in SECTIONS[1:]]
+    for content in later:
+        assert after[content] == before[content]
+    assert embedded == [content for content in after if content not in later]
+    assert (result["added"], result["updated"], result["unchanged"], result["removed"]) == (0, 1, 2, 0)
+
+
+def test_section_inserted_earlier_keeps_ids_and_renumbers(sync_env):
+    path, pool, embedded = sync_env
+    path.write_text("# Baggage\n\n" + "\n\n".join([SECTIONS[0], SECTIONS[2]]))
+    main.parse_markdown_files()
+    before = _ids_by_content(pool)
+    embedded.clear()
+
+    path.write_text("# Baggage\n\n" + "\n\n".join(SECTIONS))
+    result = main.parse_markdown_files()
+
+    after = _ids_by_content(pool)
+    assert embedded == [" ".join(SECTIONS[1].split())]
+    assert (result["added"], result["updated"], result["unchanged"], result["removed"]) == (1, 0, 2, 0)
+    fees_id = before[" ".join(SECTIONS[2].split())]
+    assert after[" ".join(SECTIONS[2].split())] == fees_id
+    assert result["retitled_ids"] == [fees_id]
+    assert pool.docs[fees_id]["title"].endswith("(Part 3)")
+    assert pool.docs[fees_id]["meta"]["chunk_index"] == 2
@@ -0,0 +1,212 @@
+"""
+Long-lived BM25 inverted index for knowledge-engine.
+
+The index is built once at startup from the ``docs`` table and then kept in
+sync incrementally (see ``/index/docs`` and ``/index/rebuild`` in main.py), so
+a search no longer needs a full table scan and a fresh ``BM25Okapi`` build.
+Documents are partitioned by ``meta->>'category'``; every partition keeps its
+own term statistics so category-filtered searches score exactly as if BM25
+had been built over that category alone.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ALL_PARTITION = "__all__"
+
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class _Partition:
+    """Inverted index and BM25 statistics for a set of documents."""
+
+    def __init__(self) -> None:
+        self.doc_len: Dict[int, int] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_len = 0
+        self._idf: Optional[Dict[str, float]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, doc_id: int, term_freqs: Counter) -> None:
+        length = sum(term_freqs.values())
+        self.doc_len[doc_id] = length
+        self.total_len += length
+        for term, freq in term_freqs.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+        self._idf = None
+
+    def remove(self, doc_id: int, term_freqs: Counter) -> None:
+        length = self.doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_len -= length
+        for term in term_freqs:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+        self._idf = None
+
+    def _compute_idf(self, epsilon: float) -> Dict[str, float]:
+        # Same IDF flooring as rank_bm25.BM25Okapi: negative IDFs are replaced
+        # by epsilon * average IDF so very common terms still score a little.
+        corpus_size = len(self.doc_len)
+        idf: Dict[str, float] = {}
+        negative: List[str] = []
+        idf_sum = 0.0
+        for term, posting in self.postings.items():
+            freq = len(posting)
+            value = math.log(corpus_size - freq + 0.5) - math.log(freq + 0.5)
+            idf[term] = value
+            idf_sum += value
+            if value < 0:
+                negative.append(term)
+        if idf:
+            eps = epsilon * idf_sum / len(idf)
+            for term in negative:
+                idf[term] = eps
+        return idf
+
+    def scores(self, query_tokens: List[str], k1: float, b: float, epsilon: float) -> Dict[int, float]:
+        if not self.doc_len:
+            return {}
+        if self._idf is None:
+            self._idf = self._compute_idf(epsilon)
+
+        avgdl = self.total_len / len(self.doc_len)
+        scores: Dict[int, float] = {}
+        for term in query_tokens:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self._idf.get(term, 0.0)
+            for doc_id, freq in posting.items():
+                denom = freq + k1 * (1 - b + b * self.doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (freq * (k1 + 1) / denom)
+        return scores
+
+
+class BM25Index:
+    """Thread-safe, category-partitioned BM25 index over the ``docs`` table."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> None:
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._lock = threading.RLock()
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._term_freqs: Dict[int, Counter] = {}
+        self._partitions: Dict[str, _Partition] = {ALL_PARTITION: _Partition()}
+        self.last_refresh: Optional[datetime] = None
+
+    @staticmethod
+    def _category(doc: Dict[str, Any]) -> str:
+        meta = doc.get("meta") or {}
+        return meta.get("category") or "unknown"
+
+    def _add_locked(self, doc: Dict[str, Any]) -> None:
+        doc_id = int(doc["doc_id"])
+        self._remove_locked(doc_id)
+
+        term_freqs = Counter(tokenize(doc.get("content") or ""))
+        self._docs[doc_id] = doc
+        self._term_freqs[doc_id] = term_freqs
+        if not term_freqs:
+            # Keep the document for result lookup but leave it out of scoring,
+            # matching the previous behaviour of skipping empty documents.
+            return
+
+        self._partitions[ALL_PARTITION].add(doc_id, term_freqs)
+        self._partitions.setdefault(self._category(doc), _Partition()).add(doc_id, term_freqs)
+
+    def _remove_locked(self, doc_id: int) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        term_freqs = self._term_freqs.pop(doc_id, Counter())
+        self._partitions[ALL_PARTITION].remove(doc_id, term_freqs)
+        category = self._category(doc)
+        partition = self._partitions.get(category)
+        if partition is not None:
+            partition.remove(doc_id, term_freqs)
+            if not len(partition):
+                del self._partitions[category]
+        return True
+
+    def rebuild(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Replace the whole index with ``docs``."""
+        fresh = BM25Index(self.k1, self.b, self.epsilon)
+        for doc in docs:
+            fresh._add_locked(doc)
+
+        with self._lock:
+            self._docs = fresh._docs
+            self._term_freqs = fresh._term_freqs
+            self._partitions = fresh._partitions
+            self.last_refresh = datetime.now(timezone.utc)
+
+    def upsert(self, docs: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        with self._lock:
+            for doc in docs:
+                self._add_locked(doc)
+                count += 1
+            self.last_refresh = datetime.now(timezone.utc)
+        return count
+
+    def delete(self, doc_ids: Iterable[int]) -> int:
+        with self._lock:
+            removed = sum(1 for doc_id in doc_ids if self._remove_locked(int(doc_id)))
+            self.last_refresh = datetime.now(timezone.utc)
+        return removed
+
+    def get(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._docs.get(doc_id)
+
+    def document_count(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    def search(self, query: str, category: Optional[str] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """Score ``query`` against the index.
+
+        Returns the (doc_id, score) pairs of documents that share at least one
+        term with the query, plus the number of scorable documents in the
+        searched partition (unmatched documents implicitly score 0).
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return [], 0
+
+        with self._lock:
+            partition = self._partitions.get(category or ALL_PARTITION)
+            if partition is None:
+                return [], 0
+            scores = partition.scores(query_tokens, self.k1, self.b, self.epsilon)
+            return list(scores.items()), len(partition)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._partitions[ALL_PARTITION].postings),
+                "partitions": {
+                    name: len(partition)
+                    for name, partition in self._partitions.items()
+                    if name != ALL_PARTITION
+                },
+                "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            }
@@ -1,5 +1,5 @@
-import re
 import json
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, date
 from typing import Any, Dict, List, Optional, Tuple
@@ -8,11 +8,12 @@ import psycopg
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
-from openai import OpenAI
 from pydantic import BaseModel, Field
 from psycopg_pool import ConnectionPool
 
+from bm25_index import BM25Index
 from services.shared.base_service import BaseService, LATENCY, log_startup
+from services.shared.embedding_client import EmbeddingClient
 
 # ---------------------------------------------------------------------------
 # Service bootstrap
@@ -39,12 +40,24 @@ DB_PASS = service.get_env_var("DB_PASS")
 OPENAI_API_KEY = service.get_env_var("OPENAI_API_KEY")
 EMBEDDINGS_MODEL = service.get_env_var("EMBEDDINGS_MODEL")
 
+# ANN search parameters for the pgvector index on doc_embeddings.embedding
+VECTOR_EF_SEARCH = service.get_env_int("VECTOR_EF_SEARCH", 40)
+VECTOR_IVFFLAT_PROBES = service.get_env_int("VECTOR_IVFFLAT_PROBES", 10)
+# The category filter runs on the index's candidates, so filtered searches widen them
+VECTOR_CATEGORY_EF_SEARCH = service.get_env_int("VECTOR_CATEGORY_EF_SEARCH", 200)
+VECTOR_CATEGORY_PROBES = service.get_env_int("VECTOR_CATEGORY_PROBES", 40)
+
 DB_CONN_STRING = (
     f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} "
     f"user={DB_USER} password={DB_PASS}"
 )
 
 db_pool: Optional[ConnectionPool] = None
+embedding_client = EmbeddingClient("knowledge-engine", api_key=OPENAI_API_KEY, model=EMBEDDINGS_MODEL)
+bm25_index = BM25Index()
+# Minimum seconds between on-demand rebuilds of an empty BM25 index
+BM25_REBUILD_RETRY_SECONDS = 30.0
+_last_bm25_rebuild = 0.0
 
 # ---------------------------------------------------------------------------
 # Models
@@ -98,6 +111,17 @@ class CrewDetailsResponse(BaseModel):
     max_hours: Optional[int]
 
 
+class IndexUpdateRequest(BaseModel):
+    upsert: List[int] = Field(default_factory=list, description="Doc IDs inserted or updated")
+    delete: List[int] = Field(default_factory=list, description="Doc IDs removed")
+
+
+class RecallCheckRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, description="Sample queries to evaluate")
+    k: int = Field(10, ge=1, le=100, description="Neighbours compared per query")
+    category: Optional[str] = Field(None, description="Optional document category filter")
+
+
 class PassengerProfileRecord(BaseModel):
     pnr: str
     passenger_name: str
@@ -105,6 +129,22 @@ class PassengerProfileRecord(BaseModel):
     connecting_flight_no: Optional[str] = None
 
 
+FLIGHT_CONTEXT_FIELDS = ("flight", "impact", "crew_details", "passenger_profiles")
+
+
+class FlightContextRequest(FlightLookupRequest):
+    fields: Optional[List[str]] = Field(
+        None, description=f"Subset of {', '.join(FLIGHT_CONTEXT_FIELDS)} to return (default: all)"
+    )
+
+
+class FlightContextResponse(BaseModel):
+    flight: Optional[FlightLookupResponse] = None
+    impact: Optional[ImpactAssessmentResponse] = None
+    crew_details: Optional[List[CrewDetailsResponse]] = None
+    passenger_profiles: Optional[List[PassengerProfileRecord]] = None
+
+
 # ---------------------------------------------------------------------------
 # Utility helpers
 # ---------------------------------------------------------------------------
@@ -141,46 +181,110 @@ def _get_connection():
 
 def embed(text: str) -> List[float]:
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.embeddings.create(input=[text], model=EMBEDDINGS_MODEL)
-        return resp.data[0].embedding
+        return embedding_client.embed(text)
     except Exception as exc:  # pragma: no cover - relies on external API
         service.log_error(exc, "embedding generation")
         raise HTTPException(status_code=500, detail="Embedding generation failed") from exc
 
 
-def tokenize(text: str) -> List[str]:
-    return re.findall(r"\\b\\w+\\b", text.lower())
-
-
-def get_bm25_scores(query: str, documents: List[Dict[str, Any]]) -> List[Tuple[int, float]]:
-    if not documents:
-        return []
+def _row_to_doc(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {
+        "doc_id": row[0],
+        "title": row[1],
+        "content": row[2],
+        "meta": row[3] or {},
+    }
 
-    from rank_bm25 import BM25Okapi
 
-    tokenized_docs: List[Tuple[Dict[str, Any], List[str]]] = []
-    for doc in documents:
-        content = doc.get("content") or ""
-        tokens = tokenize(content)
-        if tokens:
-            tokenized_docs.append((doc, tokens))
+def _fetch_docs(doc_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    with _get_connection() as conn:
+        with conn.cursor() as cur:
+            if doc_ids is None:
+                cur.execute("SELECT id, title, content, meta FROM docs")
+            else:
+                cur.execute(
+                    "SELECT id, title, content, meta FROM docs WHERE id = ANY(%s)",
+                    (list(doc_ids),),
+                )
+            return [_row_to_doc(row) for row in cur.fetchall()]
 
-    if not tokenized_docs:
-        service.logger.warning("BM25 skipped: no tokenized documents available")
-        return []
 
-    query_tokens = tokenize(query)
-    if not query_tokens:
-        service.logger.info("BM25 skipped: empty query tokens")
-        return []
+def rebuild_bm25_index() -> None:
+    try:
+        docs = _fetch_docs()
+    except psycopg.errors.UndefinedTable:
+        service.logger.warning("BM25 index build skipped: docs table does not exist yet")
+        docs = []
+    bm25_index.rebuild(docs)
+    service.logger.info("BM25 index built: %s", bm25_index.stats())
+
+
+def _ensure_bm25_index() -> bool:
+    """Rebuild an empty BM25 index from the database (failed startup build, missed notifications).
+
+    Attempts are throttled so an empty corpus does not trigger a full scan per
+    search. Returns whether the index has documents.
+    """
+    global _last_bm25_rebuild
+    if bm25_index.document_count():
+        return True
+    now = time.monotonic()
+    if now - _last_bm25_rebuild >= BM25_REBUILD_RETRY_SECONDS:
+        _last_bm25_rebuild = now
+        try:
+            rebuild_bm25_index()
+        except Exception as exc:
+            service.log_error(exc, "BM25 index rebuild")
+    return bool(bm25_index.document_count())
 
-    doc_tokens = [tokens for _, tokens in tokenized_docs]
-    filtered_docs = [doc for doc, _ in tokenized_docs]
 
-    bm25 = BM25Okapi(doc_tokens)
-    scores = bm25.get_scores(query_tokens)
-    return [(doc["doc_id"], float(score)) for doc, score in zip(filtered_docs, scores)]
+def _configure_connection(conn: psycopg.Connection) -> None:
+    """Apply ANN search parameters once per pooled connection."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SET hnsw.ef_search = {VECTOR_EF_SEARCH}")
+            cur.execute(f"SET ivfflat.probes = {VECTOR_IVFFLAT_PROBES}")
+        conn.commit()
+    except psycopg.Error as exc:
+        conn.rollback()
+        service.logger.warning(f"Unable to apply ANN search parameters: {exc}")
+
+
+# OpenAI embeddings are unit length, so cosine distance ranks exactly like the
+# L2/inner-product operators used previously and matches the index opclass.
+VECTOR_QUERY = """
+    SELECT de.doc_id, 1 - (de.embedding <=> %(vec)s::vector) AS score
+    FROM doc_embeddings de
+    ORDER BY de.embedding <=> %(vec)s::vector
+    LIMIT %(k)s
+"""
+
+VECTOR_QUERY_BY_CATEGORY = """
+    SELECT de.doc_id, 1 - (de.embedding <=> %(vec)s::vector) AS score
+    FROM doc_embeddings de
+    JOIN docs d ON d.id = de.doc_id
+    WHERE d.meta->>'category' = %(category)s
+    ORDER BY de.embedding <=> %(vec)s::vector
+    LIMIT %(k)s
+"""
+
+
+def _run_vector_query(
+    cur: psycopg.Cursor, vec: List[float], k: int, category: Optional[str] = None
+) -> List[Tuple[int, float]]:
+    query = VECTOR_QUERY_BY_CATEGORY if category else VECTOR_QUERY
+    if category:
+        # Scoped to the current transaction; pgvector caps hnsw.ef_search at 1000
+        cur.execute(f"SET LOCAL hnsw.ef_search = {min(1000, max(VECTOR_CATEGORY_EF_SEARCH, VECTOR_EF_SEARCH, k))}")
+        cur.execute(f"SET LOCAL ivfflat.probes = {max(VECTOR_CATEGORY_PROBES, VECTOR_IVFFLAT_PROBES)}")
+    cur.execute(query, {"vec": vec, "k": k, "category": category})
+    results: List[Tuple[int, float]] = []
+    for doc_id, score in cur.fetchall():
+        try:
+            results.append((int(doc_id), float(score or 0.0)))
+        except (TypeError, ValueError):
+            results.append((int(doc_id), 0.0))
+    return results
 
 
 def get_vector_scores(query: str, k: int, category: Optional[str] = None) -> List[Tuple[int, float]]:
@@ -191,89 +295,62 @@ def get_vector_scores(query: str, k: int, category: Optional[str] = None) -> Lis
 
     with _get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM doc_embeddings")
-            cnt = cur.fetchone()[0]
-            if cnt == 0:
-                return []
+            scores = _run_vector_query(cur, vec, k, category)
+            if category and len(scores) < k:
+                # A category too rare for even the widened candidate list: scan it exactly
+                cur.execute("SET LOCAL enable_indexscan = off")
+                scores = _run_vector_query(cur, vec, k, category)
+            return scores
 
-            cur.execute("CREATE TEMP TABLE IF NOT EXISTS tmp_query(q vector(1536))")
-            cur.execute("TRUNCATE tmp_query")
-            cur.execute("INSERT INTO tmp_query VALUES (%s)", (vec,))
 
-            if category:
-                cur.execute(
-                    """
-                    SELECT d.id,
-                           CASE WHEN de.embedding <#> t.q IS NOT NULL
-                                THEN 1 - (de.embedding <#> t.q)
-                                ELSE 0.0
-                           END AS score
-                    FROM doc_embeddings de
-                    JOIN docs d ON d.id = de.doc_id
-                    JOIN tmp_query t ON TRUE
-                    WHERE d.meta->>'category' = %s
-                    ORDER BY de.embedding <-> t.q
-                    LIMIT %s
-                    """,
-                    (category, k),
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT d.id,
-                           CASE WHEN de.embedding <#> t.q IS NOT NULL
-                                THEN 1 - (de.embedding <#> t.q)
-                                ELSE 0.0
-                           END AS score
-                    FROM doc_embeddings de
-                    JOIN docs d ON d.id = de.doc_id
-                    JOIN tmp_query t ON TRUE
-                    ORDER BY de.embedding <-> t.q
-                    LIMIT %s
-                    """,
-                    (k,),
-                )
-
-            results: List[Tuple[int, float]] = []
-            for doc_id, score in cur.fetchall():
-                try:
-                    results.append((int(doc_id), float(score or 0.0)))
-                except (TypeError, ValueError):
-                    results.append((int(doc_id), 0.0))
-            return results
-
-
-def hybrid_search(query: str, k: int = 5, category: Optional[str] = None) -> List[Dict[str, Any]]:
+def vector_recall_check(queries: List[str], k: int, category: Optional[str] = None) -> Dict[str, Any]:
+    """Compare ANN results with an exact (sequential scan) search for each query."""
+    per_query: List[Dict[str, Any]] = []
     with _get_connection() as conn:
-        with conn.cursor() as cur:
-            if category:
-                cur.execute(
-                    "SELECT id, title, content, meta FROM docs WHERE meta->>'category' = %s",
-                    (category,),
-                )
-            else:
-                cur.execute("SELECT id, title, content, meta FROM docs")
-
-            docs = [
+        for query in queries:
+            vec = embed(query)
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    ann = _run_vector_query(cur, vec, k, category)
+                    cur.execute("SET LOCAL enable_indexscan = off")
+                    exact = _run_vector_query(cur, vec, k, category)
+
+            exact_ids = {doc_id for doc_id, _ in exact}
+            ann_ids = {doc_id for doc_id, _ in ann}
+            recall = len(exact_ids & ann_ids) / len(exact_ids) if exact_ids else 1.0
+            per_query.append(
                 {
-                    "doc_id": row[0],
-                    "title": row[1],
-                    "content": row[2],
-                    "meta": row[3] or {},
+                    "query": query,
+                    "recall": recall,
+                    "ann_doc_ids": [doc_id for doc_id, _ in ann],
+                    "exact_doc_ids": [doc_id for doc_id, _ in exact],
                 }
-                for row in cur.fetchall()
-            ]
+            )
+
+    mean_recall = sum(item["recall"] for item in per_query) / len(per_query) if per_query else 1.0
+    return {
+        "k": k,
+        "category": category,
+        "ef_search": VECTOR_EF_SEARCH,
+        "ivfflat_probes": VECTOR_IVFFLAT_PROBES,
+        "category_ef_search": VECTOR_CATEGORY_EF_SEARCH if category else None,
+        "mean_recall": mean_recall,
+        "queries": per_query,
+    }
 
-    if not docs:
-        return []
 
-    bm25_scores = get_bm25_scores(query, docs)
+def hybrid_search(query: str, k: int = 5, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    # With no BM25 index the ranking falls back to vector scores alone
+    index_ready = _ensure_bm25_index()
+    bm25_scores, scored_docs = bm25_index.search(query, category)
     vector_scores = get_vector_scores(query, k * 2, category)
 
-    def normalize(scores: List[Tuple[int, float]]) -> Dict[int, float]:
+    def normalize(scores: List[Tuple[int, float]], floor: Optional[float] = None) -> Dict[int, float]:
         if not scores:
             return {}
         min_score = min(score for _, score in scores)
+        if floor is not None:
+            min_score = min(min_score, floor)
         max_score = max(score for _, score in scores)
         if max_score == min_score:
             return {doc_id: 1.0 for doc_id, _ in scores}
@@ -282,7 +359,9 @@ def hybrid_search(query: str, k: int = 5, category: Optional[str] = None) -> Lis
             for doc_id, score in scores
         }
 
-    bm25_norm = normalize(bm25_scores)
+    # Documents without a query term are absent from bm25_scores but still
+    # count as zero-scored when normalising.
+    bm25_norm = normalize(bm25_scores, 0.0 if len(bm25_scores) < scored_docs else None)
     vector_norm = normalize(vector_scores)
 
     combined: Dict[int, float] = {}
@@ -290,7 +369,16 @@ def hybrid_search(query: str, k: int = 5, category: Optional[str] = None) -> Lis
         combined[doc_id] = 0.5 * bm25_norm.get(doc_id, 0.0) + 0.5 * vector_norm.get(doc_id, 0.0)
 
     ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)[:k]
-    doc_lookup = {doc["doc_id"]: doc for doc in docs}
+    doc_lookup = {doc_id: bm25_index.get(doc_id) for doc_id, _ in ranked}
+
+    missing = [doc_id for doc_id, doc in doc_lookup.items() if doc is None]
+    if missing:
+        # Vector hits the index has not seen yet (e.g. a missed update notification)
+        fetched = _fetch_docs(missing)
+        if index_ready:
+            # An empty index is left for _ensure_bm25_index to rebuild in full
+            bm25_index.upsert(fetched)
+        doc_lookup.update({doc["doc_id"]: doc for doc in fetched})
 
     results: List[Dict[str, Any]] = []
     for doc_id, score in ranked:
@@ -384,7 +472,7 @@ def _impact_assessment(flight_no: str, flight_date: date) -> ImpactAssessmentRes
             )
             crew_row = cur.fetchone() or (0, "Unknown")
             crew = crew_row[0] or 0
-            crew_roles = crew_row[1] or "Unknown"
+            crew_roles = crew_row[1]
 
             cur.execute(
                 """
@@ -396,9 +484,21 @@ def _impact_assessment(flight_no: str, flight_date: date) -> ImpactAssessmentRes
                 (flight_no, flight_date),
             )
             aircraft_row = cur.fetchone() or (None, "Unknown", "Unknown")
-            aircraft_status = aircraft_row[1] or "Unknown"
-            aircraft_location = aircraft_row[2] or "Unknown"
 
+    return _build_impact(passengers, connecting, crew, crew_roles, aircraft_row[1], aircraft_row[2])
+
+
+def _build_impact(
+    passengers: int,
+    connecting: int,
+    crew: int,
+    crew_roles: Optional[str],
+    aircraft_status: Optional[str],
+    aircraft_location: Optional[str],
+) -> ImpactAssessmentResponse:
+    crew_roles = crew_roles or "Unknown"
+    aircraft_status = aircraft_status or "Unknown"
+    aircraft_location = aircraft_location or "Unknown"
     summary = (
         f"{passengers} passengers ({connecting} with connections) and {crew} crew affected. "
         f"Aircraft status: {aircraft_status} at {aircraft_location}."
@@ -430,18 +530,17 @@ def _crew_details(flight_no: str, flight_date: date) -> List[CrewDetailsResponse
             )
             rows = cur.fetchall()
 
-    details: List[CrewDetailsResponse] = []
-    for row in rows:
-        details.append(
-            CrewDetailsResponse(
-                crew_id=row[0],
-                role=row[1],
-                name=row[2] or "Unknown",
-                duty_start=_iso_or_none(row[3]) if isinstance(row[3], datetime) else row[3],
-                max_hours=row[4],
-            )
-        )
-    return details
+    return [_crew_detail_from_row(row) for row in rows]
+
+
+def _crew_detail_from_row(row: Tuple[Any, ...]) -> CrewDetailsResponse:
+    return CrewDetailsResponse(
+        crew_id=row[0],
+        role=row[1],
+        name=row[2] or "Unknown",
+        duty_start=_iso_or_none(row[3]) if isinstance(row[3], datetime) else row[3],
+        max_hours=row[4],
+    )
 
 
 def _passenger_profiles(flight_no: str, flight_date: date) -> List[PassengerProfileRecord]:
@@ -458,20 +557,109 @@ def _passenger_profiles(flight_no: str, flight_date: date) -> List[PassengerProf
             )
             rows = cur.fetchall()
 
-    profiles: List[PassengerProfileRecord] = []
-    for row in rows:
-        has_connection = row[2]
-        if isinstance(has_connection, str):
-            has_connection = has_connection.upper() == "TRUE"
-        profiles.append(
-            PassengerProfileRecord(
-                pnr=row[0],
-                passenger_name=row[1],
-                has_connection=bool(has_connection),
-                connecting_flight_no=row[3],
+    return [_passenger_profile_from_row(row) for row in rows]
+
+
+def _passenger_profile_from_row(row: Tuple[Any, ...]) -> PassengerProfileRecord:
+    has_connection = row[2]
+    if isinstance(has_connection, str):
+        has_connection = has_connection.upper() == "TRUE"
+    return PassengerProfileRecord(
+        pnr=row[0],
+        passenger_name=row[1],
+        has_connection=bool(has_connection),
+        connecting_flight_no=row[3],
+    )
+
+
+# One round trip for everything disruption analysis needs about a flight. The
+# CTEs are only evaluated for the columns selected below, so field selection
+# also trims the work done by Postgres.
+FLIGHT_CONTEXT_CTE = """
+    WITH flight AS (
+        SELECT f.flight_no, f.origin, f.destination, f.sched_dep_time, f.sched_arr_time,
+               f.status, f.tail_number, a.status AS aircraft_status, a.current_location AS aircraft_location
+        FROM flights f
+        LEFT JOIN aircraft_status a ON f.tail_number = a.tail_number
+        WHERE f.flight_no = %(flight_no)s AND f.flight_date = %(flight_date)s
+        LIMIT 1
+    ),
+    pax AS (
+        SELECT pnr, passenger_name, has_connection, connecting_flight_no
+        FROM bookings
+        WHERE flight_no = %(flight_no)s AND flight_date = %(flight_date)s
+    ),
+    crew AS (
+        SELECT cr.crew_id, cr.crew_role, cd.crew_name, cd.duty_start_time, cd.max_duty_hours
+        FROM crew_roster cr
+        LEFT JOIN crew_details cd ON cr.crew_id = cd.crew_id
+        WHERE cr.flight_no = %(flight_no)s AND cr.flight_date = %(flight_date)s
+    )
+"""
+
+FLIGHT_CONTEXT_COLUMNS = {
+    "flight": """(SELECT json_build_array(flight_no, origin, destination, sched_dep_time, sched_arr_time,
+                                          status, tail_number, aircraft_status, aircraft_location)
+                  FROM flight)""",
+    "impact": """(SELECT json_build_array(
+                      COUNT(*),
+                      COUNT(CASE WHEN has_connection = 'TRUE' THEN 1 END))
+                  FROM pax)""",
+    "crew_summary": """(SELECT json_build_array(COUNT(*), STRING_AGG(DISTINCT crew_role, ', '))
+                        FROM crew)""",
+    "crew_details": """(SELECT COALESCE(json_agg(json_build_array(crew_id, crew_role, crew_name,
+                                                                  duty_start_time, max_duty_hours)
+                                                 ORDER BY crew_role), '[]')
+                        FROM crew)""",
+    "passenger_profiles": """(SELECT COALESCE(json_agg(json_build_array(pnr, passenger_name, has_connection,
+                                                                        connecting_flight_no)
+                                                       ORDER BY passenger_name), '[]')
+                              FROM pax)""",
+}
+
+
+def _flight_context(flight_no: str, flight_date: date, fields: List[str]) -> FlightContextResponse:
+    columns = []
+    if "flight" in fields or "impact" in fields:
+        columns.append("flight")
+    if "impact" in fields:
+        columns.extend(["impact", "crew_summary"])
+    if "crew_details" in fields:
+        columns.append("crew_details")
+    if "passenger_profiles" in fields:
+        columns.append("passenger_profiles")
+
+    select_list = ",\n".join(f"{FLIGHT_CONTEXT_COLUMNS[name]} AS {name}" for name in columns)
+    with _get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"{FLIGHT_CONTEXT_CTE} SELECT {select_list}",
+                {"flight_no": flight_no, "flight_date": flight_date},
             )
+            values = dict(zip(columns, cur.fetchone()))
+
+    response = FlightContextResponse()
+    flight_row = values.get("flight")
+    if "flight" in fields and flight_row:
+        response.flight = FlightLookupResponse(
+            flight_no=flight_row[0],
+            origin=flight_row[1],
+            destination=flight_row[2],
+            sched_dep=flight_row[3],
+            sched_arr=flight_row[4],
+            status=flight_row[5],
+            tail_number=flight_row[6],
         )
-    return profiles
+    if "impact" in fields:
+        passengers, connecting = values["impact"]
+        crew, crew_roles = values["crew_summary"]
+        aircraft = flight_row[7:9] if flight_row else (None, None)
+        response.impact = _build_impact(passengers, connecting, crew, crew_roles, *aircraft)
+    if "crew_details" in fields:
+        response.crew_details = [_crew_detail_from_row(row) for row in values["crew_details"]]
+    if "passenger_profiles" in fields:
+        response.passenger_profiles = [_passenger_profile_from_row(row) for row in values["passenger_profiles"]]
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -484,7 +672,12 @@ async def lifespan(app: FastAPI):
     global db_pool
 
     log_startup("knowledge-engine")
-    db_pool = ConnectionPool(DB_CONN_STRING, min_size=2, max_size=10)
+    db_pool = ConnectionPool(DB_CONN_STRING, min_size=2, max_size=10, configure=_configure_connection)
+
+    try:
+        rebuild_bm25_index()
+    except Exception as exc:
+        service.log_error(exc, "BM25 index build")
 
     yield
 
@@ -503,7 +696,12 @@ app.router.lifespan_context = lifespan
 def health_check():
     if not db_pool:
         raise HTTPException(status_code=503, detail="Database pool not initialised")
-    return {"status": "ok", "service": "knowledge-engine"}
+    return {
+        "status": "ok",
+        "service": "knowledge-engine",
+        "bm25_index": bm25_index.stats(),
+        "embedding_cache": embedding_client.cache_info(),
+    }
 
 
 @app.post("/search", response_model=SearchResponse)
@@ -585,6 +783,24 @@ def passenger_profiles(payload: FlightLookupRequest, request: Request):
         return response
 
 
+@app.post("/tools/flight_context", response_model=FlightContextResponse, response_model_exclude_none=True)
+def flight_context(payload: FlightContextRequest, request: Request):
+    """Flight, impact, crew and passenger data for one flight in a single query."""
+    with LATENCY.labels("knowledge-engine", "/tools/flight_context", "POST").time():
+        fields = payload.fields or list(FLIGHT_CONTEXT_FIELDS)
+        unknown = sorted(set(fields) - set(FLIGHT_CONTEXT_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown flight context fields: {', '.join(unknown)}")
+
+        flight_date = _parse_date(payload.date)
+        response = _flight_context(payload.flight_no, flight_date, fields)
+        service.log_request(
+            request,
+            {"status": "success", "flight_no": payload.flight_no, "fields": fields},
+        )
+        return response
+
+
 # Compatibility alias for legacy knowledge service clients
 @app.post("/kb/search", response_model=SearchResponse)
 def kb_search(payload: SearchRequest, request: Request):
@@ -608,6 +824,33 @@ def kb_search_operational(payload: SearchRequest, request: Request):
 # ---------------------------------------------------------------------------
 
 
+@app.post("/index/docs")
+def update_index(payload: IndexUpdateRequest, request: Request):
+    """Apply doc inserts/updates/deletes made by ingest-svc or the gateway."""
+    with LATENCY.labels("knowledge-engine", "/index/docs", "POST").time():
+        removed = bm25_index.delete(payload.delete) if payload.delete else 0
+        upserted = bm25_index.upsert(_fetch_docs(payload.upsert)) if payload.upsert else 0
+        service.log_request(request, {"status": "success", "upserted": upserted, "removed": removed})
+        return {"upserted": upserted, "removed": removed, "bm25_index": bm25_index.stats()}
+
+
+@app.post("/index/vector-recall")
+def vector_recall(payload: RecallCheckRequest, request: Request):
+    """Validate ANN recall@k against exact search for the configured parameters."""
+    with LATENCY.labels("knowledge-engine", "/index/vector-recall", "POST").time():
+        result = vector_recall_check(payload.queries, payload.k, payload.category)
+        service.log_request(request, {"status": "success", "mean_recall": result["mean_recall"]})
+        return result
+
+
+@app.post("/index/rebuild")
+def rebuild_index(request: Request):
+    with LATENCY.labels("knowledge-engine", "/index/rebuild", "POST").time():
+        rebuild_bm25_index()
+        service.log_request(request, {"status": "success"})
+        return {"bm25_index": bm25_index.stats()}
+
+
 @app.get("/documents")
 def list_documents():
     with _get_connection() as conn:
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark /bulk_predict scoring: per-flight loop vs the columnar engine.
+
+Runs both paths over the same synthetic day of flights, checks that they
+return identical predictions and reports the scoring time of each. The
+per-flight path performs one weather lookup per flight; the engine performs
+one per origin airport.
+
+    python bulk_benchmark.py --sizes 1000 10000 50000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from bulk_scoring import FLIGHT_COLUMNS, build_flight_frame, score_flights, score_flights_iteratively
+
+AIRPORTS = ["AKL", "WLG", "CHC", "SYD", "LAX", "ZQN", "NSN"]
+STATUSES = ["Scheduled", "Scheduled", "Scheduled", "On Time", "Delayed", "Cancelled"]
+AIRCRAFT_STATUSES = ["Ready", "Ready", "Ready", "Maintenance", "Delayed"]
+BENCH_DAY = datetime(2025, 1, 17)
+
+
+def synthetic_frame(size: int) -> pd.DataFrame:
+    rng = random.Random(size)
+    tails = [f"ZK-{i:04d}" for i in range(max(1, size // 6))]
+    flights = []
+    for i in range(size):
+        origin, destination = rng.sample(AIRPORTS, 2)
+        dep = BENCH_DAY + timedelta(minutes=rng.randint(300, 1380))
+        flights.append((f"NZ{i % 4000:04d}", origin, destination, dep, rng.choice(STATUSES), rng.choice(tails + [None])))
+    flights.sort(key=lambda row: row[3])
+    aircraft = [(tail, rng.choice(AIRCRAFT_STATUSES)) for tail in tails if rng.random() > 0.1]
+    history = [(f"NZ{i:04d}", rng.random() * 0.6) for i in range(min(size, 4000)) if rng.random() > 0.05]
+    return build_flight_frame(
+        pd.DataFrame(flights, columns=FLIGHT_COLUMNS),
+        pd.DataFrame(aircraft, columns=["tail_number", "aircraft_status"]),
+        pd.DataFrame(history, columns=["flight_no", "delay_rate"]),
+    )
+
+
+def mock_weather(airport: str) -> Dict[str, Any]:
+    # Same shape as predictive-svc get_weather_data, deterministic per airport
+    rng = random.Random(airport)
+    return {"wind_speed": rng.randint(10, 40), "visibility": 8, "precipitation": 0.1}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark columnar bulk disruption scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Flights per day")
+    args = parser.parse_args()
+
+    print(f"{'flights':>8} {'loop ms':>9} {'engine ms':>10} {'speedup':>8} {'identical':>10}")
+    for size in args.sizes:
+        frame = synthetic_frame(size)
+
+        start = time.perf_counter()
+        reference = score_flights_iteratively(frame, mock_weather)
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        predictions: List[Dict[str, Any]] = score_flights(frame, mock_weather)
+        engine_ms = (time.perf_counter() - start) * 1000
+
+        identical = predictions == reference
+        print(f"{size:>8} {loop_ms:>9.1f} {engine_ms:>10.1f} {loop_ms / engine_ms:>7.1f}x {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
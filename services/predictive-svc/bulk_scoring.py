@@ -0,0 +1,173 @@
+"""
+Columnar disruption scoring for predictive-svc /bulk_predict.
+
+The day's flights and the aircraft status of their tails are loaded with
+two set-based queries into pandas frames and joined with the precomputed
+per-flight delay rates from delay_stats. Weather is looked up once per
+origin airport and every risk factor is evaluated as a NumPy array over all
+flights at once.
+``score_flight`` is the per-flight reference; ``score_flights`` returns
+identical results for the same inputs.
+"""
+
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from delay_stats import DEFAULT_DELAY_RATE
+
+DISRUPTED_STATUSES = ("Delayed", "Cancelled")
+DISRUPTED_SCORE = 0.8
+HIGH_WIND_KNOTS = 25
+HIGH_WIND_SCORE = 0.3
+AIRCRAFT_SCORES = {"Maintenance": 0.4, "Delayed": 0.2}
+AIRCRAFT_FACTORS = {"Maintenance": "Aircraft in maintenance", "Delayed": "Aircraft already delayed"}
+HIGH_DELAY_RATE = 0.3
+HIGH_DELAY_RATE_SCORE = 0.2
+
+FLIGHT_COLUMNS = ["flight_no", "origin", "destination", "sched_dep_time", "status", "tail_number"]
+
+WeatherLookup = Callable[[str], Dict[str, Any]]
+
+
+def risk_level(risk_score: float) -> str:
+    if risk_score >= 0.7:
+        return "high"
+    if risk_score >= 0.4:
+        return "medium"
+    return "low"
+
+
+def load_flight_frame(cur, flight_date: date, delay_rates: pd.DataFrame) -> pd.DataFrame:
+    """Flights on ``flight_date`` joined with aircraft status and ``delay_rates`` (flight_no, delay_rate)."""
+    cur.execute("""
+        SELECT flight_no, origin, destination, sched_dep_time, status, tail_number
+        FROM flights
+        WHERE flight_date = %s
+        ORDER BY sched_dep_time
+    """, (flight_date,))
+    flights = pd.DataFrame(cur.fetchall(), columns=FLIGHT_COLUMNS)
+
+    cur.execute("""
+        SELECT a.tail_number, a.status
+        FROM aircraft_status a
+        WHERE a.tail_number IN (SELECT tail_number FROM flights WHERE flight_date = %s)
+    """, (flight_date,))
+    aircraft = pd.DataFrame(cur.fetchall(), columns=["tail_number", "aircraft_status"])
+
+    return build_flight_frame(flights, aircraft, delay_rates)
+
+
+def build_flight_frame(flights: pd.DataFrame, aircraft: pd.DataFrame, history: pd.DataFrame) -> pd.DataFrame:
+    """Left-join aircraft status and delay rates onto ``flights``, keeping its row order."""
+    frame = flights.merge(aircraft, on="tail_number", how="left")
+    frame = frame.merge(history, on="flight_no", how="left")
+    frame["delay_rate"] = frame["delay_rate"].astype(float).fillna(DEFAULT_DELAY_RATE)
+    return frame
+
+
+def score_flight(
+    status: Optional[str],
+    wind_speed: float,
+    aircraft_status: Optional[str],
+    delay_rate: float,
+) -> Tuple[float, List[str]]:
+    """Risk score and factors for one flight."""
+    risk_score = 0.0
+    factors = []
+
+    if status in DISRUPTED_STATUSES:
+        risk_score = DISRUPTED_SCORE
+        factors.append("Already disrupted")
+
+    if wind_speed > HIGH_WIND_KNOTS:
+        risk_score += HIGH_WIND_SCORE
+        factors.append("High wind at origin")
+
+    if aircraft_status in AIRCRAFT_SCORES:
+        risk_score += AIRCRAFT_SCORES[aircraft_status]
+        factors.append(AIRCRAFT_FACTORS[aircraft_status])
+
+    if delay_rate > HIGH_DELAY_RATE:
+        risk_score += HIGH_DELAY_RATE_SCORE
+        factors.append("High historical delay rate")
+
+    return min(risk_score, 1.0), factors
+
+
+def score_flights(frame: pd.DataFrame, weather: WeatherLookup) -> List[Dict[str, Any]]:
+    """Bulk predictions for ``frame`` (see build_flight_frame), sorted by risk score."""
+    if frame.empty:
+        return []
+
+    origins = frame["origin"].to_numpy(dtype=object)
+    wind_by_origin = {origin: weather(origin).get("wind_speed", 0) for origin in pd.unique(origins)}
+    wind = np.array([wind_by_origin[origin] for origin in origins], dtype=float)
+
+    disrupted = frame["status"].isin(DISRUPTED_STATUSES).to_numpy()
+    windy = wind > HIGH_WIND_KNOTS
+    aircraft_status = frame["aircraft_status"].to_numpy(dtype=object)
+    aircraft_flags = {status: aircraft_status == status for status in AIRCRAFT_SCORES}
+    historic = frame["delay_rate"].to_numpy(dtype=float) > HIGH_DELAY_RATE
+
+    # Added in the same order as score_flight so the floating-point sums match exactly
+    scores = np.where(disrupted, DISRUPTED_SCORE, 0.0)
+    scores = scores + np.where(windy, HIGH_WIND_SCORE, 0.0)
+    for status, flags in aircraft_flags.items():
+        scores = scores + np.where(flags, AIRCRAFT_SCORES[status], 0.0)
+    scores = scores + np.where(historic, HIGH_DELAY_RATE_SCORE, 0.0)
+    scores = np.minimum(scores, 1.0)
+
+    factor_columns = [(disrupted, "Already disrupted"), (windy, "High wind at origin")]
+    factor_columns += [(flags, AIRCRAFT_FACTORS[status]) for status, flags in aircraft_flags.items()]
+    factor_columns.append((historic, "High historical delay rate"))
+    # Encode each flight's factors as a bitmask and materialise one list per distinct mask
+    masks = np.zeros(len(frame), dtype=np.int64)
+    for bit, (flags, _label) in enumerate(factor_columns):
+        masks |= flags.astype(np.int64) << bit
+    factor_lists = {
+        mask: [label for bit, (_flags, label) in enumerate(factor_columns) if mask >> bit & 1]
+        for mask in np.unique(masks).tolist()
+    }
+    mask_list = masks.tolist()
+
+    levels = np.select([scores >= 0.7, scores >= 0.4], ["high", "medium"], default="low")
+    order = np.argsort(-scores, kind="stable")
+
+    flight_nos = frame["flight_no"].tolist()
+    destinations = frame["destination"].tolist()
+    departures = frame["sched_dep_time"].tolist()
+    score_list = scores.tolist()
+    level_list = levels.tolist()
+
+    return [
+        {
+            "flight_no": flight_nos[i],
+            "route": f"{origins[i]} → {destinations[i]}",
+            "departure_time": departures[i],
+            "risk_level": level_list[i],
+            "risk_score": score_list[i],
+            "factors": list(factor_lists[mask_list[i]]),
+        }
+        for i in order.tolist()
+    ]
+
+
+def score_flights_iteratively(frame: pd.DataFrame, weather: WeatherLookup) -> List[Dict[str, Any]]:
+    """Per-flight reference path over the same frame (one weather lookup per flight)."""
+    predictions = []
+    for row in frame.itertuples(index=False):
+        aircraft_status = row.aircraft_status if isinstance(row.aircraft_status, str) else None
+        risk_score, factors = score_flight(row.status, weather(row.origin).get("wind_speed", 0), aircraft_status, row.delay_rate)
+        predictions.append({
+            "flight_no": row.flight_no,
+            "route": f"{row.origin} → {row.destination}",
+            "departure_time": row.sched_dep_time,
+            "risk_level": risk_level(risk_score),
+            "risk_score": risk_score,
+            "factors": factors,
+        })
+    predictions.sort(key=lambda x: x["risk_score"], reverse=True)
+    return predictions
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Precomputed historical delay statistics for predictive-svc.
+
+The aggregation job rolls the flights table up into per-flight-number,
+per-route and per-origin-airport delay rates with month seasonality, and the
+Kaggle airline delay-cause dataset into per-airport (plus an overall
+baseline) delay rates, cause mix and seasonality. Results live in the
+delay_stats table; DelayStatsStore keeps them in memory so predictions look
+statistics up by key instead of aggregating flights per request.
+
+Refreshes are incremental: given flight numbers, only the flight, route and
+airport rows those flights touch are recomputed, and the delay-cause file is
+re-aggregated only when its fingerprint changes.
+
+    python delay_stats.py --dsn "host=localhost dbname=flightops user=postgres" [--full]
+"""
+
+import argparse
+import calendar
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from loguru import logger
+from psycopg.types.json import Jsonb
+
+FLIGHTS_SOURCE = "flights"
+DELAY_CAUSE_SOURCE = "kaggle"
+BASELINE_KEY = "ALL"
+DEFAULT_DELAY_RATE = 0.1
+# Seconds before a failed reload is retried (lookups keep using the last good snapshot meanwhile)
+RELOAD_RETRY_SECONDS = 30.0
+SEASONAL_PEAK_FACTOR = 1.2
+
+CAUSE_COLUMNS = {
+    "carrier": "carrier_ct",
+    "weather": "weather_ct",
+    "nas": "nas_ct",
+    "security": "security_ct",
+    "late_aircraft": "late_aircraft_ct",
+}
+
+STATS_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS delay_stats (
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        source TEXT NOT NULL,
+        total_flights DOUBLE PRECISION NOT NULL,
+        delay_count DOUBLE PRECISION NOT NULL,
+        cancelled_count DOUBLE PRECISION NOT NULL,
+        delay_rate DOUBLE PRECISION NOT NULL,
+        cause_mix JSONB,
+        monthly_delay_rate JSONB,
+        refreshed_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (scope, key, source)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS delay_stats_sources (
+        source TEXT PRIMARY KEY,
+        fingerprint TEXT,
+        refreshed_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+]
+
+FLIGHT_AGGREGATE_QUERY = """
+    SELECT flight_no, origin, destination, EXTRACT(MONTH FROM flight_date)::int AS month,
+           COUNT(*) AS flights,
+           COUNT(*) FILTER (WHERE status IN ('Delayed', 'Cancelled')) AS disrupted,
+           COUNT(*) FILTER (WHERE status = 'Cancelled') AS cancelled
+    FROM flights
+"""
+FLIGHT_AGGREGATE_GROUP_BY = " GROUP BY flight_no, origin, destination, month"
+FLIGHT_AGGREGATE_COLUMNS = ["flight_no", "origin", "destination", "month", "flights", "disrupted", "cancelled"]
+
+
+@dataclass
+class DelayStats:
+    scope: str  # flight, route, airport or baseline
+    key: str
+    source: str
+    total_flights: float
+    delay_count: float
+    cancelled_count: float
+    delay_rate: float
+    cause_mix: Optional[Dict[str, float]] = None
+    monthly_delay_rate: Dict[int, float] = field(default_factory=dict)
+
+    def seasonality(self, month: Optional[int]) -> Optional[float]:
+        """Delay rate in ``month`` relative to the overall rate (1.0 = average)."""
+        monthly = self.monthly_delay_rate.get(month) if month else None
+        if monthly is None or not self.delay_rate:
+            return None
+        return round(monthly / self.delay_rate, 3)
+
+    def summary(self, month: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "total_flights": self.total_flights,
+            "delay_rate": round(self.delay_rate, 4),
+            "cancel_rate": round(self.cancelled_count / self.total_flights, 4) if self.total_flights else 0.0,
+            "cause_mix": self.cause_mix,
+            "seasonality": self.seasonality(month),
+        }
+
+
+def route_key(origin: Optional[str], destination: Optional[str]) -> Optional[str]:
+    return f"{origin}-{destination}" if origin and destination else None
+
+
+# ----------------------------------------------------------------------
+# Aggregation
+# ----------------------------------------------------------------------
+
+def _rate(numerator: float, denominator: float) -> float:
+    return float(numerator) / float(denominator) if denominator else 0.0
+
+
+def _stats_from_groups(
+    scope: str,
+    source: str,
+    totals: pd.DataFrame,
+    monthly: pd.DataFrame,
+    cause_mix: Optional[pd.DataFrame] = None,
+) -> List[DelayStats]:
+    """``totals`` and ``monthly`` hold flights/disrupted/cancelled sums indexed by key and (key, month)."""
+    months: Dict[str, Dict[int, float]] = {}
+    for (key, month), row in monthly.iterrows():
+        months.setdefault(key, {})[int(month)] = round(_rate(row["disrupted"], row["flights"]), 4)
+
+    stats = []
+    for key, row in totals.iterrows():
+        mix = None
+        if cause_mix is not None and key in cause_mix.index:
+            mix = {cause: round(float(share), 4) for cause, share in cause_mix.loc[key].items()}
+        stats.append(DelayStats(
+            scope=scope,
+            key=str(key),
+            source=source,
+            total_flights=float(row["flights"]),
+            delay_count=float(row["disrupted"]),
+            cancelled_count=float(row["cancelled"]),
+            delay_rate=_rate(row["disrupted"], row["flights"]),
+            cause_mix=mix,
+            monthly_delay_rate=months.get(key, {}),
+        ))
+    return stats
+
+
+def aggregate_flight_rows(rows: Iterable[Tuple[Any, ...]]) -> List[DelayStats]:
+    """Roll FLIGHT_AGGREGATE_QUERY rows up to flight, route and origin-airport statistics."""
+    frame = pd.DataFrame(list(rows), columns=FLIGHT_AGGREGATE_COLUMNS)
+    if frame.empty:
+        return []
+
+    sums = ["flights", "disrupted", "cancelled"]
+    frame[sums] = frame[sums].astype(float)
+    keys = {
+        "flight": frame["flight_no"],
+        "route": frame["origin"].str.cat(frame["destination"], sep="-"),  # NaN unless both are set
+        "airport": frame["origin"],
+    }
+
+    stats: List[DelayStats] = []
+    for scope, key in keys.items():
+        scoped = frame.assign(key=key).dropna(subset=["key"])
+        totals = scoped.groupby("key")[sums].sum()
+        monthly = scoped.dropna(subset=["month"]).groupby(["key", "month"])[sums].sum()
+        stats.extend(_stats_from_groups(scope, FLIGHTS_SOURCE, totals, monthly))
+    return stats
+
+
+def aggregate_delay_causes(csv_path: str) -> List[DelayStats]:
+    """Per-airport and overall statistics from the Kaggle Airline_Delay_Cause dataset."""
+    frame = pd.read_csv(csv_path).dropna(subset=["airport", "month"])
+    numeric = ["arr_flights", "arr_del15", "arr_cancelled", *CAUSE_COLUMNS.values()]
+    frame[numeric] = frame[numeric].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    frame = frame.assign(
+        flights=frame["arr_flights"],
+        disrupted=frame["arr_del15"] + frame["arr_cancelled"],
+        cancelled=frame["arr_cancelled"],
+        month=frame["month"].astype(int),
+    )
+
+    sums = ["flights", "disrupted", "cancelled"]
+    causes = list(CAUSE_COLUMNS.values())
+    stats: List[DelayStats] = []
+    for scope, key in (("airport", frame["airport"]), ("baseline", pd.Series(BASELINE_KEY, index=frame.index))):
+        scoped = frame.assign(key=key)
+        totals = scoped.groupby("key")[sums].sum()
+        monthly = scoped.groupby(["key", "month"])[sums].sum()
+        cause_counts = scoped.groupby("key")[causes].sum()
+        cause_mix = cause_counts.div(cause_counts.sum(axis=1).where(lambda total: total > 0), axis=0).fillna(0.0)
+        cause_mix.columns = list(CAUSE_COLUMNS)
+        stats.extend(_stats_from_groups(scope, DELAY_CAUSE_SOURCE, totals, monthly, cause_mix))
+    return stats
+
+
+# ----------------------------------------------------------------------
+# Storage
+# ----------------------------------------------------------------------
+
+def ensure_stats_tables(cur) -> None:
+    for ddl in STATS_TABLES:
+        cur.execute(ddl)
+
+
+def write_stats(
+    cur,
+    source: str,
+    stats: Sequence[DelayStats],
+    scope_keys: Optional[Dict[str, Sequence[str]]] = None,
+) -> None:
+    """Replace ``source`` rows (all of them, or only ``scope_keys``) with ``stats``."""
+    if scope_keys is None:
+        cur.execute("DELETE FROM delay_stats WHERE source = %s", (source,))
+    else:
+        for scope, keys in scope_keys.items():
+            if keys:
+                cur.execute(
+                    "DELETE FROM delay_stats WHERE source = %s AND scope = %s AND key = ANY(%s)",
+                    (source, scope, list(keys)),
+                )
+    if stats:
+        cur.executemany(
+            """
+            INSERT INTO delay_stats (scope, key, source, total_flights, delay_count, cancelled_count,
+                                     delay_rate, cause_mix, monthly_delay_rate)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            [
+                (
+                    s.scope, s.key, s.source, s.total_flights, s.delay_count, s.cancelled_count, s.delay_rate,
+                    Jsonb(s.cause_mix) if s.cause_mix is not None else None,
+                    Jsonb({str(month): rate for month, rate in s.monthly_delay_rate.items()}),
+                )
+                for s in stats
+            ],
+        )
+
+
+def _mark_source(cur, source: str, fingerprint: Optional[str]) -> None:
+    cur.execute(
+        """
+        INSERT INTO delay_stats_sources (source, fingerprint, refreshed_at) VALUES (%s, %s, NOW())
+        ON CONFLICT (source) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, refreshed_at = NOW()
+        """,
+        (source, fingerprint),
+    )
+
+
+def refresh_flight_stats(
+    cur,
+    flight_nos: Optional[Sequence[str]] = None,
+    routes: Sequence[Tuple[str, str]] = (),
+) -> int:
+    """Recompute flights-table statistics; only rows touched by ``flight_nos`` when given.
+
+    ``routes`` are (origin, destination) pairs the flights used before an update or
+    delete, so their route and airport rows are recomputed (or dropped) as well.
+    """
+    if flight_nos is None:
+        cur.execute(FLIGHT_AGGREGATE_QUERY + FLIGHT_AGGREGATE_GROUP_BY)
+        stats = aggregate_flight_rows(cur.fetchall())
+        write_stats(cur, FLIGHTS_SOURCE, stats)
+        _mark_source(cur, FLIGHTS_SOURCE, None)
+        return len(stats)
+
+    flight_nos = list(dict.fromkeys(flight_nos))
+    if not flight_nos:
+        return 0
+    cur.execute("SELECT DISTINCT origin, destination FROM flights WHERE flight_no = ANY(%s)", (flight_nos,))
+    routes = list(dict.fromkeys([tuple(route) for route in routes] + [tuple(row) for row in cur.fetchall()]))
+    origins = sorted({origin for origin, _destination in routes if origin})
+    scope_keys = {
+        "flight": flight_nos,
+        "route": sorted({key for key in (route_key(o, d) for o, d in routes) if key}),
+        "airport": origins,
+    }
+
+    # Every flight of the affected flight numbers and origins, so route and airport totals are complete
+    cur.execute(
+        FLIGHT_AGGREGATE_QUERY + " WHERE flight_no = ANY(%s) OR origin = ANY(%s)" + FLIGHT_AGGREGATE_GROUP_BY,
+        (flight_nos, origins),
+    )
+    wanted = {scope: set(keys) for scope, keys in scope_keys.items()}
+    stats = [s for s in aggregate_flight_rows(cur.fetchall()) if s.key in wanted[s.scope]]
+    write_stats(cur, FLIGHTS_SOURCE, stats, scope_keys)
+    return len(stats)
+
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def refresh_delay_cause_stats(cur, csv_path: str, force: bool = False) -> Optional[int]:
+    """Re-aggregate the delay-cause dataset if it changed; returns rows written, 0 if unchanged, None if missing."""
+    if not csv_path or not os.path.exists(csv_path):
+        return None
+
+    fingerprint = file_fingerprint(csv_path)
+    cur.execute("SELECT fingerprint FROM delay_stats_sources WHERE source = %s", (DELAY_CAUSE_SOURCE,))
+    row = cur.fetchone()
+    if row and row[0] == fingerprint and not force:
+        return 0
+
+    stats = aggregate_delay_causes(csv_path)
+    write_stats(cur, DELAY_CAUSE_SOURCE, stats)
+    _mark_source(cur, DELAY_CAUSE_SOURCE, fingerprint)
+    return len(stats)
+
+
+def refresh_delay_stats(
+    cur,
+    csv_path: Optional[str],
+    flight_nos: Optional[Sequence[str]] = None,
+    full: bool = False,
+    routes: Sequence[Tuple[str, str]] = (),
+) -> Dict[str, Any]:
+    """Run the aggregation job; a full refresh recomputes every flights-table row."""
+    ensure_stats_tables(cur)
+    start = time.perf_counter()
+    flight_rows = refresh_flight_stats(cur, None if full else flight_nos, routes)
+    cause_rows = refresh_delay_cause_stats(cur, csv_path, force=full) if csv_path else None
+    return {
+        "mode": "full" if full or flight_nos is None else "incremental",
+        "flight_rows": flight_rows,
+        "delay_cause_rows": cause_rows,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# ----------------------------------------------------------------------
+# In-memory lookups
+# ----------------------------------------------------------------------
+
+class DelayStatsStore:
+    """delay_stats held in memory, keyed by (scope, key, source); reloaded after ``ttl_seconds``.
+
+    If a reload fails, lookups keep the last good snapshot (or none, in which
+    case callers fall back to DEFAULT_DELAY_RATE) and the reload is retried
+    after RELOAD_RETRY_SECONDS.
+    """
+
+    def __init__(self, connection: Callable[[], Any], ttl_seconds: float = 300.0) -> None:
+        self._connection = connection
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str], DelayStats] = {}
+        self._delay_rates = pd.DataFrame(columns=["flight_no", "delay_rate"])
+        self._loaded_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    def reload(self) -> None:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT scope, key, source, total_flights, delay_count, cancelled_count,
+                           delay_rate, cause_mix, monthly_delay_rate
+                    FROM delay_stats
+                """)
+                rows = cur.fetchall()
+
+        stats = {}
+        for scope, key, source, total, delayed, cancelled, rate, cause_mix, monthly in rows:
+            stats[(scope, key, source)] = DelayStats(
+                scope, key, source, total, delayed, cancelled, rate, cause_mix,
+                {int(month): value for month, value in (monthly or {}).items()},
+            )
+        delay_rates = pd.DataFrame(
+            [(s.key, s.delay_rate) for s in stats.values() if s.scope == "flight" and s.source == FLIGHTS_SOURCE],
+            columns=["flight_no", "delay_rate"],
+        )
+
+        with self._lock:
+            self._stats = stats
+            self._delay_rates = delay_rates
+            self._loaded_at = time.monotonic()
+            self._failed_at = None
+            self._last_error = None
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stale = self._loaded_at is None or now - self._loaded_at > self.ttl_seconds
+            backing_off = self._failed_at is not None and now - self._failed_at < RELOAD_RETRY_SECONDS
+        if not stale or backing_off:
+            return
+        try:
+            self.reload()
+        except Exception as e:
+            with self._lock:
+                self._failed_at = time.monotonic()
+                self._last_error = str(e)
+                snapshot = "last good snapshot" if self._loaded_at is not None else "default delay rate"
+            logger.warning(f"Delay statistics reload failed, using {snapshot}: {e}")
+
+    def get(self, scope: str, key: Optional[str], source: str = FLIGHTS_SOURCE) -> Optional[DelayStats]:
+        if not key:
+            return None
+        self._ensure_fresh()
+        return self._stats.get((scope, key, source))
+
+    def delay_rates(self) -> pd.DataFrame:
+        """Historical delay rate per flight number, as consumed by bulk_scoring."""
+        self._ensure_fresh()
+        return self._delay_rates
+
+    def historical_patterns(
+        self,
+        flight_no: str,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        month: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        flight = self.get("flight", flight_no)
+        route = self.get("route", route_key(origin, destination))
+        airport = self.get("airport", origin)
+        airport_causes = self.get("airport", origin, DELAY_CAUSE_SOURCE)
+        baseline = self.get("baseline", BASELINE_KEY, DELAY_CAUSE_SOURCE)
+
+        total_flights = int(flight.total_flights) if flight else 0
+        delay_rate = flight.delay_rate if flight else DEFAULT_DELAY_RATE
+
+        patterns = ["Peak delay times: 6-8 AM, 2-4 PM"] if delay_rate > 0.2 else []
+        cause_source = airport_causes or baseline
+        if cause_source and cause_source.cause_mix:
+            cause, share = max(cause_source.cause_mix.items(), key=lambda item: item[1])
+            where = origin if cause_source is airport_causes else "industry-wide"
+            patterns.append(f"Main delay cause ({where}): {cause.replace('_', ' ')} ({share:.0%})")
+        # Most specific seasonality available: flight, route, airport, then dataset-wide
+        factors = [s.seasonality(month) for s in (flight, route, airport, airport_causes, baseline) if s]
+        seasonality = next((factor for factor in factors if factor is not None), None)
+        if month and seasonality and seasonality >= SEASONAL_PEAK_FACTOR:
+            patterns.append(f"Delays historically {seasonality:.1f}x higher in {calendar.month_name[month]}")
+
+        airport_summary = airport.summary(month) if airport else None
+        if airport_causes:
+            airport_summary = {**(airport_summary or {}), "cause_mix": airport_causes.cause_mix,
+                               "reference_delay_rate": round(airport_causes.delay_rate, 4)}
+
+        return {
+            "total_flights": total_flights,
+            "delay_count": int(flight.delay_count) if flight else 0,
+            "delay_rate": delay_rate,
+            "patterns": patterns,
+            "route": route.summary(month) if route else None,
+            "airport": airport_summary,
+            "seasonality": seasonality,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for scope, _key, source in self._stats:
+                counts[f"{source}:{scope}"] = counts.get(f"{source}:{scope}", 0) + 1
+            return {
+                "rows": counts,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+                "last_error": self._last_error,
+            }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the predictive-svc delay statistics store")
+    parser.add_argument("--dsn", required=True, help="Postgres DSN")
+    parser.add_argument("--csv", default=os.environ.get("DELAY_CAUSE_CSV", "data/kaggle/Airline_Delay_Cause.csv"),
+                        help="Kaggle Airline_Delay_Cause.csv")
+    parser.add_argument("--flight-no", action="append", dest="flight_nos", help="Only refresh these flights (repeatable)")
+    parser.add_argument("--full", action="store_true", help="Recompute everything, even if the dataset is unchanged")
+    args = parser.parse_args()
+
+    import psycopg
+
+    with psycopg.connect(args.dsn) as conn:
+        with conn.cursor() as cur:
+            print(refresh_delay_stats(cur, args.csv, args.flight_nos, full=args.full))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import json
 import random
 from contextlib import asynccontextmanager
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import psycopg
 from fastapi import HTTPException, Request
@@ -12,6 +12,8 @@ from psycopg_pool import ConnectionPool
 from services.shared.base_service import BaseService, LATENCY, log_startup
 from services.shared.prompt_manager import PromptManager
 from services.shared.llm_client import create_llm_client
+from bulk_scoring import load_flight_frame, score_flights
+from delay_stats import DelayStatsStore, ensure_stats_tables, refresh_delay_stats
 
 # Initialize base service
 service = BaseService("predictive-svc", "1.0.0")
@@ -24,12 +26,17 @@ DB_NAME = service.get_env_var("DB_NAME")
 DB_USER = service.get_env_var("DB_USER")
 DB_PASS = service.get_env_var("DB_PASS")
 
+# Historical delay statistics store (see delay_stats.py)
+DELAY_CAUSE_CSV = service.get_env_var("DELAY_CAUSE_CSV", "/data/kaggle/Airline_Delay_Cause.csv")
+DELAY_STATS_TTL = service.get_env_int("DELAY_STATS_TTL", 300)
+
 # Initialize LLM client
 llm_client = create_llm_client("predictive-svc")
 
 # Create database connection pool
 DB_CONN_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASS}"
 db_pool = None
+delay_stats: Optional[DelayStatsStore] = None
 
 class PredictionRequest(BaseModel):
     flight_no: Optional[str] = None
@@ -50,13 +57,36 @@ class DisruptionPrediction(BaseModel):
     recommendations: List[str]
     time_to_disruption: Optional[str] = None
 
+class DelayStatsRefreshRequest(BaseModel):
+    flight_nos: Optional[List[str]] = None
+    full: bool = False
+    # (origin, destination) the flights used before an update or delete
+    routes: List[Tuple[str, str]] = []
+
+def _warm_delay_stats() -> None:
+    """Build the statistics on first start (or pick up a changed delay-cause file) and load them."""
+    try:
+        with db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                ensure_stats_tables(cur)
+                cur.execute("SELECT EXISTS (SELECT 1 FROM delay_stats WHERE source = 'flights')")
+                populated = cur.fetchone()[0]
+                # Without flight_nos the flights rows are recomputed; with an empty list only the dataset is checked
+                result = refresh_delay_stats(cur, DELAY_CAUSE_CSV, flight_nos=[] if populated else None)
+        service.logger.info(f"Delay statistics ready: {result}")
+        delay_stats.reload()
+    except Exception as e:
+        service.logger.warning(f"Delay statistics warm-up failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app):
-    global db_pool
+    global db_pool, delay_stats
     log_startup("predictive-svc")
     
     # Initialize connection pool
     db_pool = ConnectionPool(DB_CONN_STRING, min_size=2, max_size=10)
+    delay_stats = DelayStatsStore(db_pool.connection, ttl_seconds=DELAY_STATS_TTL)
+    _warm_delay_stats()
     
     yield
     
@@ -101,10 +131,12 @@ def get_weather_data(airport: str, date: str) -> Dict[str, Any]:
     
     base_weather = weather_conditions.get(airport, {"wind_speed": 15, "visibility": 10, "precipitation": 0.0, "conditions": "clear"})
     
-    # Add some randomness to simulate changing conditions
-    base_weather["wind_speed"] += random.randint(-5, 10)
-    base_weather["visibility"] += random.randint(-2, 2)
-    base_weather["precipitation"] += random.uniform(-0.1, 0.2)
+    # Add some randomness to simulate changing conditions; seeded per airport
+    # and day so every lookup within a forecast sees the same reading
+    rng = random.Random(f"{airport}:{date}")
+    base_weather["wind_speed"] += rng.randint(-5, 10)
+    base_weather["visibility"] += rng.randint(-2, 2)
+    base_weather["precipitation"] += rng.uniform(-0.1, 0.2)
     
     return base_weather
 
@@ -167,30 +199,10 @@ def analyze_aircraft_status(tail_number: str) -> Dict[str, Any]:
                 "factors": factors
             }
 
-def get_historical_patterns(flight_no: str, days_back: int = 30) -> Dict[str, Any]:
-    """Analyze historical delay patterns for a flight"""
-    with db_pool.connection() as conn:
-        with conn.cursor() as cur:
-            # Get historical data (mock - in production, use actual historical data)
-            cur.execute("""
-                SELECT status, COUNT(*) as count
-                FROM flights
-                WHERE flight_no = %s
-                GROUP BY status
-            """, (flight_no,))
-            results = cur.fetchall()
-            
-            total_flights = sum(row[1] for row in results)
-            delay_count = sum(row[1] for row in results if row[0] in ["Delayed", "Cancelled"])
-            
-            delay_rate = delay_count / total_flights if total_flights > 0 else 0.1
-            
-            return {
-                "total_flights": total_flights,
-                "delay_count": delay_count,
-                "delay_rate": delay_rate,
-                "patterns": ["Peak delay times: 6-8 AM, 2-4 PM"] if delay_rate > 0.2 else []
-            }
+def get_historical_patterns(flight_no: str, origin: Optional[str] = None,
+                            destination: Optional[str] = None, month: Optional[int] = None) -> Dict[str, Any]:
+    """Historical delay patterns for a flight from the precomputed delay statistics"""
+    return delay_stats.historical_patterns(flight_no, origin, destination, month)
 
 def generate_llm_insights(flight_data: Dict[str, Any], weather_data: Dict[str, Any], 
                          crew_analysis: Dict[str, Any], aircraft_analysis: Dict[str, Any],
@@ -354,7 +366,9 @@ def predict_disruptions(req: PredictionRequest, request: Request):
             if req.include_aircraft and flight_data.get("tail_number"):
                 aircraft_analysis = analyze_aircraft_status(flight_data["tail_number"])
             
-            historical_data = get_historical_patterns(flight_no)
+            historical_data = get_historical_patterns(
+                flight_no, flight_data["origin"], flight_data["destination"], flight_dt.month
+            )
             
             # Generate insights using LLM or rule-based analysis
             insights = generate_llm_insights(flight_data, weather_data, crew_analysis, aircraft_analysis, historical_data)
@@ -391,55 +405,13 @@ def bulk_predict_disruptions(request: Request):
         try:
             tomorrow_date = (datetime.now() + timedelta(days=1)).date()
 
-            # Get all flights for tomorrow
+            # Load flights, aircraft status and delay history as columns, then score them in one pass
             with db_pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute("""
-                        SELECT flight_no, origin, destination, sched_dep_time, status, tail_number
-                        FROM flights
-                        WHERE flight_date = %s
-                        ORDER BY sched_dep_time
-                    """, (tomorrow_date,))
-                    flights = cur.fetchall()
-
-            predictions = []
-            for flight in flights:
-                flight_no, origin, destination, sched_dep_time, status, tail_number = flight
-                
-                # Quick risk assessment for bulk prediction
-                risk_score = 0.0
-                factors = []
-                
-                # Check if already delayed
-                if status in ["Delayed", "Cancelled"]:
-                    risk_score = 0.8
-                    factors.append("Already disrupted")
-                
-                # Check weather at origin
-                weather = get_weather_data(origin, tomorrow_date.isoformat())
-                if weather.get("wind_speed", 0) > 25:
-                    risk_score += 0.3
-                    factors.append("High wind at origin")
-                
-                # Determine risk level
-                if risk_score >= 0.7:
-                    risk_level = "high"
-                elif risk_score >= 0.4:
-                    risk_level = "medium"
-                else:
-                    risk_level = "low"
-                
-                predictions.append({
-                    "flight_no": flight_no,
-                    "route": f"{origin} → {destination}",
-                    "departure_time": sched_dep_time,
-                    "risk_level": risk_level,
-                    "risk_score": min(risk_score, 1.0),
-                    "factors": factors
-                })
-            
-            # Sort by risk score
-            predictions.sort(key=lambda x: x["risk_score"], reverse=True)
+                    frame = load_flight_frame(cur, tomorrow_date, delay_stats.delay_rates())
+
+            forecast_date = tomorrow_date.isoformat()
+            predictions = score_flights(frame, lambda airport: get_weather_data(airport, forecast_date))
             
             service.log_request(request, {"status": "success", "predictions_count": len(predictions)})
             return {"predictions": predictions, "date": tomorrow_date.isoformat()}
@@ -448,10 +420,29 @@ def bulk_predict_disruptions(request: Request):
             service.log_error(e, "bulk_predict endpoint")
             raise
 
+@app.post("/stats/refresh")
+def refresh_stats(req: DelayStatsRefreshRequest, request: Request):
+    """Re-run the delay statistics aggregation (incrementally when flight_nos are given)"""
+    with LATENCY.labels("predictive-svc", "/stats/refresh", "POST").time():
+        try:
+            with db_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    result = refresh_delay_stats(cur, DELAY_CAUSE_CSV, req.flight_nos, full=req.full, routes=req.routes)
+            delay_stats.reload()
+            service.log_request(request, {"status": "success", **result})
+            return {"ok": True, **result, "store": delay_stats.stats()}
+        except Exception as e:
+            service.log_error(e, "stats_refresh endpoint")
+            raise
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "predictive-svc"}
+    return {
+        "status": "healthy",
+        "service": "predictive-svc",
+        "delay_stats": delay_stats.stats() if delay_stats else None,
+    }
 
 if __name__ == "__main__":
     log_startup("predictive-svc")
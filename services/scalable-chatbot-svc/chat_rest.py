@@ -99,7 +99,7 @@ def create_chat_router(
 
             await process_chat_message(
                 message.session_id,
-                {"message": message.message},
+                {"message": message.message, "client_ip": req.client.host if req.client else None},
                 message.client_id or "rest",
             )
 
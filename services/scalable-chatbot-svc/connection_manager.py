@@ -1,18 +1,25 @@
 """Connection manager for scalable chatbot service."""
 
 from datetime import datetime
-from typing import Any, Dict, Set
+from typing import Any, Dict, Optional, Set
 
 from fastapi import WebSocket
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for scalable chat sessions."""
+    """Manages WebSocket connections for scalable chat sessions.
 
-    def __init__(self) -> None:
+    With a SessionBus attached, messages for clients or sessions connected to
+    another replica are relayed through Redis.
+    """
+
+    def __init__(self, bus=None) -> None:
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_connections: Dict[str, Set[str]] = {}
         self.connection_metadata: Dict[str, Dict[str, Any]] = {}
+        self.bus = bus
+        if bus is not None:
+            bus.attach(self)
 
     async def connect(self, websocket: WebSocket, session_id: str, client_id: str) -> None:
         """Accept a new WebSocket connection."""
@@ -29,6 +36,9 @@ class ConnectionManager:
             "last_activity": datetime.now(),
         }
 
+        if self.bus is not None:
+            await self.bus.subscribe(session_id)
+
     def disconnect(self, client_id: str) -> None:
         """Remove a WebSocket connection."""
         if client_id in self.active_connections:
@@ -42,19 +52,30 @@ class ConnectionManager:
         if client_id in self.connection_metadata:
             del self.connection_metadata[client_id]
 
-    async def send_personal_message(self, message: str, client_id: str) -> None:
-        """Send message to specific client."""
+    async def send_personal_message(self, message: str, client_id: str, session_id: Optional[str] = None) -> None:
+        """Send message to specific client, via the bus when it is connected to another replica."""
         if client_id in self.active_connections:
             try:
                 await self.active_connections[client_id].send_text(message)
             except Exception:
                 self.disconnect(client_id)
+        elif session_id is not None and self.bus is not None:
+            await self.bus.publish(session_id, message, client_id=client_id)
 
     async def send_to_session(self, message: str, session_id: str) -> None:
-        """Send message to all clients in a session."""
-        if session_id in self.session_connections:
-            for client_id in list(self.session_connections[session_id]):
-                await self.send_personal_message(message, client_id)
+        """Send message to all clients in a session, on every replica."""
+        await self.deliver_local(message, session_id)
+        if self.bus is not None:
+            await self.bus.publish(session_id, message)
+
+    async def deliver_local(self, message: str, session_id: str, client_id: Optional[str] = None) -> bool:
+        """Send to this replica's sockets for the session (or one client); True if any was found."""
+        targets = self.session_connections.get(session_id, set())
+        if client_id is not None:
+            targets = targets & {client_id}
+        for target in list(targets):
+            await self.send_personal_message(message, target)
+        return bool(targets)
 
     async def broadcast(self, message: str) -> None:
         """Broadcast message to all active connections."""
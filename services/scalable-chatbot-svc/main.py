@@ -16,11 +16,14 @@ import uvicorn
 
 from services.shared.base_service import BaseService
 from services.shared.llm_client import LLMClient
+from services.shared.embedding_client import EmbeddingClient
 from services.shared.prompt_manager import PromptManager
 from connection_manager import ConnectionManager
 from redis_manager import RedisManager
-from rate_limiter import RateLimiter
+from rate_limiter import RateLimit, RateLimiter
 from chat_rest import create_chat_router
+from session_bus import SessionBus
+from semantic_cache import SemanticResponseCache
 import os
 import debugpy
 
@@ -44,16 +47,26 @@ app.add_middleware(
 )
 
 # Global instances
-manager = ConnectionManager()
 redis_manager = RedisManager()
+session_bus = SessionBus(redis_manager)
+manager = ConnectionManager(session_bus)
 rate_limiter = RateLimiter(redis_manager)
 llm_client = LLMClient("scalable-chatbot-svc", model="gpt-4o-mini")
+embedding_client = EmbeddingClient("scalable-chatbot-svc")
+response_cache = SemanticResponseCache(
+    redis_manager,
+    embedding_client,
+    ttl=int(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92")),
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000")),
+)
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """Manage service startup and shutdown without deprecated events."""
     logger.info("startup_event begin")
     await redis_manager.connect()
+    await session_bus.start()
     cleanup_task_handle = asyncio.create_task(cleanup_task())
     logger.info("startup_event complete - scalable-chatbot-svc ready")
 
@@ -64,6 +77,7 @@ async def lifespan(_app: FastAPI):
         cleanup_task_handle.cancel()
         with suppress(asyncio.CancelledError):
             await cleanup_task_handle
+        await session_bus.stop()
         await redis_manager.disconnect()
         logger.info("shutdown_event complete")
 
@@ -73,6 +87,12 @@ app.router.lifespan_context = lifespan
 KNOWLEDGE_SERVICE_URL = os.getenv("KNOWLEDGE_SERVICE_URL", "http://knowledge-engine:8081")
 DB_ROUTER_URL = os.getenv("DB_ROUTER_URL", "http://db-router-svc:8000")
 
+# Rate limits (requests per window, shared by all replicas through Redis)
+RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))
+RATE_LIMIT_SESSION = int(os.getenv("RATE_LIMIT_SESSION", "30"))
+RATE_LIMIT_CLIENT_IP = int(os.getenv("RATE_LIMIT_CLIENT_IP", "120"))
+RATE_LIMIT_OPENAI = int(os.getenv("RATE_LIMIT_OPENAI", "600"))
+
 async def cleanup_task():
     """Background task to clean up stale connections"""
     while True:
@@ -97,6 +117,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, client_id: s
             # Receive message from client
             data = await websocket.receive_text()
             message_data = json.loads(data)
+            message_data["client_ip"] = websocket.client.host if websocket.client else None
             
             # Update connection metadata
             if client_id in manager.connection_metadata:
@@ -136,40 +157,44 @@ async def process_chat_message(session_id: str, message_data: Dict[str, Any], cl
         # Get session context
         session_context = await redis_manager.get_session_context(session_id)
         
-        # Check rate limiting for ChatGPT calls
-        rate_limit_key = f"chatgpt:{session_id}"
-        if await rate_limiter.is_rate_limited(rate_limit_key, limit=30, window=60):
-            error_response = {
-                "type": "error",
-                "content": "Rate limit exceeded. Please wait a moment before sending another message.",
-                "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
-            }
-            await manager.send_personal_message(json.dumps(error_response), client_id)
-            logger.info(
-                "process_chat_message exit session_id=%s client_id=%s reason=rate_limited",
-                session_id,
-                client_id
-            )
+        # Check per-session and per-client-IP rate limits
+        client_ip = message_data.get("client_ip") or "unknown"
+        exceeded = await rate_limiter.check(
+            RateLimit(f"chatgpt:session:{session_id}", RATE_LIMIT_SESSION, RATE_LIMIT_WINDOW),
+            RateLimit(f"chatgpt:ip:{client_ip}", RATE_LIMIT_CLIENT_IP, RATE_LIMIT_WINDOW),
+        )
+        if exceeded:
+            await send_rate_limited(session_id, client_id, *exceeded)
             return
         
-        # Check for cached response
-        query_hash = f"{session_id}:{hash(user_message)}"
-        cached_response = await redis_manager.get_cached_response(query_hash)
+        # Check the cross-session cache of grounded knowledge-base answers
+        cached = await response_cache.lookup(user_message)
         
-        if cached_response:
+        if cached:
             # Send cached response immediately
-            cached_data = json.loads(cached_response)
-            cached_data["type"] = "complete"
-            cached_data["from_cache"] = True
-            await manager.send_personal_message(json.dumps(cached_data), client_id)
+            cached_response = {
+                "type": "complete",
+                "content": cached["content"],
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "from_cache": True,
+                "metadata": {**cached["metadata"], "cache": cached["cache"], "similarity": cached["similarity"]}
+            }
+            await manager.send_personal_message(json.dumps(cached_response), client_id, session_id)
             logger.info(
-                "process_chat_message exit session_id=%s client_id=%s reason=cached_response",
+                "process_chat_message exit session_id=%s client_id=%s reason=cached_response cache=%s",
                 session_id,
-                client_id
+                client_id,
+                cached["cache"]
             )
             return
         
+        # Cache misses spend the OpenAI budget shared by every replica
+        exceeded = await rate_limiter.check(RateLimit("chatgpt:global", RATE_LIMIT_OPENAI, RATE_LIMIT_WINDOW))
+        if exceeded:
+            await send_rate_limited(session_id, client_id, *exceeded)
+            return
+        
         # Generate new response using ChatGPT
         await generate_streaming_response(session_id, user_message, session_context, client_id)
         logger.info(
@@ -190,7 +215,29 @@ async def process_chat_message(session_id: str, message_data: Dict[str, Any], cl
             "session_id": session_id,
             "timestamp": datetime.now().isoformat()
         }
-        await manager.send_personal_message(json.dumps(error_response), client_id)
+        await manager.send_personal_message(json.dumps(error_response), client_id, session_id)
+
+
+async def send_rate_limited(session_id: str, client_id: str, rate_limit: RateLimit, retry_after: float):
+    """Tell the client which limit it hit and when to retry"""
+    if rate_limit.key == "chatgpt:global":
+        content = "We're handling a high volume of requests right now. Please try again in a moment."
+    else:
+        content = "Rate limit exceeded. Please wait a moment before sending another message."
+    error_response = {
+        "type": "error",
+        "content": content,
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat(),
+        "retry_after": round(retry_after, 1)
+    }
+    await manager.send_personal_message(json.dumps(error_response), client_id, session_id)
+    logger.info(
+        "process_chat_message exit session_id=%s client_id=%s reason=rate_limited limit=%s",
+        session_id,
+        client_id,
+        rate_limit.key
+    )
 
 
 async def generate_streaming_response(session_id: str, user_message: str, session_context: Dict[str, Any], client_id: str):
@@ -267,16 +314,29 @@ async def generate_streaming_response(session_id: str, user_message: str, sessio
             "session_id": session_id,
             "timestamp": datetime.now().isoformat()
         }
-        await manager.send_personal_message(json.dumps(thinking_response), client_id)
+        await manager.send_personal_message(json.dumps(thinking_response), client_id, session_id)
         
-        # Get response from ChatGPT
-        response = await llm_client.chat_completion_async(
+        # Stream the answer from ChatGPT, forwarding each delta as soon as it arrives
+        response: Dict[str, Any] = {}
+        stream = llm_client.chat_completion_stream(
             messages=messages,
             temperature=0.3,
             max_tokens=500,
             function_name="generate_streaming_response",
-            metadata={"session_id": session_id, "client_id": client_id}
+            metadata={"session_id": session_id, "client_id": client_id},
+            result=response
         )
+        try:
+            async for delta in stream:
+                chunk_response = {
+                    "type": "chunk",
+                    "content": delta,
+                    "session_id": session_id,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await manager.send_personal_message(json.dumps(chunk_response), client_id, session_id)
+        finally:
+            await stream.aclose()
         
         # Parse the response
         chatgpt_response = response["content"]
@@ -290,28 +350,9 @@ async def generate_streaming_response(session_id: str, user_message: str, sessio
             final_response = chatgpt_response
             sentiment_analysis = {}
         
-        # Format response according to AiAir guidelines
+        # Format response according to AiAir guidelines; the complete message carries the final text
         final_response = format_ai_air_response(final_response, response_metadata["sources"])
         
-        # Simulate streaming by sending chunks
-        words = final_response.split()
-        chunk_size = 3  # Send 3 words at a time
-        
-        for i in range(0, len(words), chunk_size):
-            chunk = " ".join(words[i:i + chunk_size])
-            if i + chunk_size < len(words):
-                chunk += " "
-                
-            chunk_response = {
-                "type": "chunk",
-                "content": chunk,
-                "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            await manager.send_personal_message(json.dumps(chunk_response), client_id)
-            await asyncio.sleep(0.05)  # Small delay for streaming effect
-        
         # Send completion message
         complete_response = {
             "type": "complete",
@@ -322,17 +363,17 @@ async def generate_streaming_response(session_id: str, user_message: str, sessio
                 "sentiment_analysis": sentiment_analysis,
                 "tokens_used": response.get("tokens_used"),
                 "response_time_ms": response.get("duration_ms"),
+                "time_to_first_token_ms": response.get("time_to_first_token_ms"),
                 "query_type": response_metadata["query_type"],
                 "sources": response_metadata["sources"],
                 "kb_context": response_metadata["kb_context"]
             }
         }
         
-        await manager.send_personal_message(json.dumps(complete_response), client_id)
+        await manager.send_personal_message(json.dumps(complete_response), client_id, session_id)
         
-        # Cache the response
-        query_hash = f"{session_id}:{hash(user_message)}"
-        await redis_manager.cache_response(query_hash, json.dumps(complete_response))
+        # Share grounded KB answers across sessions (session-specific answers are skipped)
+        await response_cache.store(user_message, final_response, complete_response["metadata"], session_context)
         
         # Update session context
         updated_context = session_context.copy()
@@ -366,7 +407,7 @@ async def generate_streaming_response(session_id: str, user_message: str, sessio
             "session_id": session_id,
             "timestamp": datetime.now().isoformat()
         }
-        await manager.send_personal_message(json.dumps(error_response), client_id)
+        await manager.send_personal_message(json.dumps(error_response), client_id, session_id)
 
 
 chat_router = create_chat_router(service, redis_manager, process_chat_message)
@@ -434,6 +475,10 @@ async def get_stats(req: Request):
             "active_connections": len(manager.active_connections),
             "active_sessions": len(manager.session_connections),
             "connection_metadata": manager.connection_metadata,
+            "cluster": await session_bus.cluster_stats(),
+            "session_bus": session_bus.stats(),
+            "response_cache": response_cache.stats(),
+            "rate_limiter": rate_limiter.stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -445,6 +490,17 @@ async def get_stats(req: Request):
         raise HTTPException(status_code=500, detail="Failed to get metrics")
 
 
+@app.post("/cache/invalidate")
+async def invalidate_response_cache(req: Request):
+    """Drop every cached answer; called when the knowledge base is re-ingested"""
+    try:
+        generation = await response_cache.invalidate()
+        return {"status": "invalidated", "generation": generation}
+    except Exception as e:
+        service.log_error(e, "invalidate_response_cache")
+        raise HTTPException(status_code=500, detail="Failed to invalidate response cache")
+
+
 @app.get("/test")
 def test_endpoint(req: Request):
     """Test endpoint"""
@@ -1,32 +1,156 @@
-"""Rate limiting utilities for the scalable chatbot service."""
+"""Rate limiting utilities for the scalable chatbot service.
+
+Limits are sliding windows kept in Redis sorted sets and checked by one Lua
+script, so every replica shares the same budget and a request is admitted
+or rejected atomically across all of its limits (e.g. session, client IP and
+the global OpenAI budget): a rejected request consumes none of them. When
+Redis is unavailable the same check runs against an in-process window,
+which is per-replica but keeps the service up.
+"""
 
 import time
-from typing import Dict, List
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from loguru import logger
 
 from redis_manager import RedisManager
 
+# KEYS: one sorted set per limit; ARGV: request token, then (limit, window_ms) per key.
+# Returns {0, 0} when admitted, else {index of the first exceeded limit, ms until it frees up}.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[2 * i])
+  local window = tonumber(ARGV[2 * i + 1])
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+  if redis.call('ZCARD', key) >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] == nil then
+      return {i, window}
+    end
+    return {i, tonumber(oldest[2]) + window - now}
+  end
+end
+for i, key in ipairs(KEYS) do
+  redis.call('ZADD', key, now, now .. ':' .. ARGV[1])
+  redis.call('PEXPIRE', key, tonumber(ARGV[2 * i + 1]))
+end
+return {0, 0}
+"""
+
+
+class RateLimit(NamedTuple):
+    """At most ``limit`` requests per ``window`` seconds for ``key``."""
+
+    key: str
+    limit: int
+    window: int
+
+
+class LocalSlidingWindow:
+    """In-process sliding window used while Redis is unreachable; idle keys are evicted."""
+
+    def __init__(self, prune_every: int = 1000) -> None:
+        self.windows: Dict[str, Tuple[Deque[float], int]] = {}
+        self.prune_every = prune_every
+        self._calls = 0
+
+    def check(self, limits: Sequence[RateLimit], now: Optional[float] = None) -> Optional[Tuple[RateLimit, float]]:
+        now = time.time() if now is None else now
+        self._calls += 1
+        if self._calls % self.prune_every == 0:
+            self.prune(now)
+
+        timestamps: List[Deque[float]] = []
+        for rate_limit in limits:
+            entry = self.windows.get(rate_limit.key)
+            window = entry[0] if entry else deque()
+            self.windows[rate_limit.key] = (window, rate_limit.window)
+            while window and now - window[0] >= rate_limit.window:
+                window.popleft()
+            if len(window) >= rate_limit.limit:
+                retry_after = window[0] + rate_limit.window - now if window else rate_limit.window
+                return rate_limit, retry_after
+            timestamps.append(window)
+
+        for window in timestamps:
+            window.append(now)
+        return None
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop keys whose newest request has left their window."""
+        now = time.time() if now is None else now
+        for key, (window, seconds) in list(self.windows.items()):
+            if not window or now - window[-1] >= seconds:
+                del self.windows[key]
+
 
 class RateLimiter:
-    """Rate limiting for ChatGPT API calls."""
+    """Distributed sliding-window rate limiting for ChatGPT API calls."""
 
-    def __init__(self, redis_manager: RedisManager) -> None:
+    def __init__(self, redis_manager: RedisManager, prefix: str = "ratelimit") -> None:
         self.redis_manager = redis_manager
-        self.local_limits: Dict[str, List[float]] = {}
+        self.prefix = prefix
+        self.local = LocalSlidingWindow()
+        self._script = None
+        self._script_client = None
+        self._redis_healthy = True
+        self.counts = {"allowed": 0, "limited": 0, "local_fallback": 0}
 
-    async def is_rate_limited(self, key: str, limit: int = 60, window: int = 60) -> bool:
-        """Return True when the rate limit is exceeded for the given key."""
-        current_time = time.time()
+    def _get_script(self):
+        client = self.redis_manager.redis_client
+        if client is None:
+            return None
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._script_client = client
+        return self._script
 
-        if key in self.local_limits:
-            self.local_limits[key] = [
-                timestamp for timestamp in self.local_limits[key]
-                if current_time - timestamp < window
-            ]
-        else:
-            self.local_limits[key] = []
+    async def _check_redis(self, script, limits: Sequence[RateLimit]) -> Optional[Tuple[RateLimit, float]]:
+        keys = [f"{self.prefix}:{rate_limit.key}" for rate_limit in limits]
+        args: List[object] = [uuid.uuid4().hex]
+        for rate_limit in limits:
+            args.extend([rate_limit.limit, rate_limit.window * 1000])
+        index, retry_ms = await script(keys=keys, args=args)
+        if int(index) == 0:
+            return None
+        return limits[int(index) - 1], max(int(retry_ms), 0) / 1000
 
-        if len(self.local_limits[key]) >= limit:
-            return True
+    async def check(self, *limits: RateLimit) -> Optional[Tuple[RateLimit, float]]:
+        """Admit the request against every limit, or return the first exceeded limit and its retry-after seconds."""
+        if not limits:
+            return None
+
+        exceeded = None
+        script = self._get_script()
+        if script is not None:
+            try:
+                exceeded = await self._check_redis(script, limits)
+                if not self._redis_healthy:
+                    logger.info("Rate limiter using Redis again")
+                    self._redis_healthy = True
+            except Exception as exc:
+                if self._redis_healthy:
+                    logger.warning("Rate limiter falling back to local windows: {error}", error=exc)
+                    self._redis_healthy = False
+                script = None
+        if script is None:
+            self.counts["local_fallback"] += 1
+            exceeded = self.local.check(limits)
+
+        self.counts["limited" if exceeded else "allowed"] += 1
+        return exceeded
+
+    async def is_rate_limited(self, key: str, limit: int = 60, window: int = 60) -> bool:
+        """Return True when the rate limit is exceeded for the given key."""
+        return await self.check(RateLimit(key, limit, window)) is not None
 
-        self.local_limits[key].append(current_time)
-        return False
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self.counts,
+            "backend": "redis" if self.redis_manager.redis_client is not None and self._redis_healthy else "local",
+            "local_keys": len(self.local.windows),
+        }
@@ -0,0 +1,275 @@
+"""
+Cross-session semantic response cache for the scalable chatbot.
+
+Grounded knowledge-base answers are stored in Redis under the normalized
+question text, with a TTL, so a question asked in any session on any replica
+can be answered from cache. A question with different wording is matched
+against the cached questions by embedding cosine similarity; the question
+embeddings live in one Redis hash per cache generation and are mirrored into
+a NumPy matrix on each replica.
+
+Invalidation bumps the generation counter (done when the knowledge base is
+re-ingested), which orphans every entry at once; orphaned keys expire by TTL.
+Questions that carry session-specific details (flight numbers, PNRs, dates,
+contact details) are never cached, and neither are answers that mention the
+customer's own session data.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from services.shared.base_service import RESPONSE_CACHE
+from services.shared.embedding_client import EmbeddingClient, normalize_text
+from chatbot_toolkit import extract_entities, route_query
+
+GENERATION_KEY = "semcache:generation"
+PNR_PATTERN = re.compile(r"\b(?=[A-Z0-9]*\d)(?=[A-Z0-9]*[A-Z])[A-Z0-9]{6}\b")
+PUNCTUATION = re.compile(r"[^\w\s-]")
+SESSION_FIELDS = ("customer_name", "customer_email", "flight_no")
+
+
+def normalize_query(message: str) -> str:
+    """Casefold, drop punctuation and collapse whitespace."""
+    return normalize_text(PUNCTUATION.sub(" ", message or ""))
+
+
+def is_session_specific(message: str) -> bool:
+    """True when the question refers to a particular flight, booking, date or contact."""
+    if PNR_PATTERN.search(message or ""):
+        return True
+    return any(extract_entities(message or "").values())
+
+
+class SemanticResponseCache:
+    """Redis-backed answer cache keyed on normalized text plus embedding similarity."""
+
+    def __init__(
+        self,
+        redis_manager,
+        embedding_client: EmbeddingClient,
+        service_name: str = "scalable-chatbot-svc",
+        ttl: int = 3600,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 2000,
+    ):
+        self.redis_manager = redis_manager
+        self.embedding_client = embedding_client
+        self.service_name = service_name
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+
+        # Replica-local mirror of the current generation's question embeddings
+        self._generation: Optional[int] = None
+        self._ids: List[str] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._sync_lock = asyncio.Lock()
+        self._counts = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "ineligible": 0,
+            "stores": 0,
+            "store_skipped": 0,
+            "errors": 0,
+            "invalidations": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Keys and helpers
+    # ------------------------------------------------------------------
+
+    @property
+    def _redis(self):
+        return self.redis_manager.redis_client
+
+    @staticmethod
+    def _entry_id(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _answer_key(generation: int, entry_id: str) -> str:
+        return f"semcache:{generation}:answer:{entry_id}"
+
+    @staticmethod
+    def _vectors_key(generation: int) -> str:
+        return f"semcache:{generation}:vectors"
+
+    def _record(self, result: str) -> None:
+        self._counts[result] += 1
+        RESPONSE_CACHE.labels(self.service_name, result).inc()
+
+    async def _current_generation(self) -> int:
+        return int(await self._redis.get(GENERATION_KEY) or 0)
+
+    async def _embed(self, normalized: str) -> np.ndarray:
+        vector = np.asarray(await self.embedding_client.embed_async(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _pack(vector: np.ndarray, expires_at: float) -> str:
+        return json.dumps({"e": expires_at, "v": base64.b64encode(vector.astype(np.float32).tobytes()).decode()})
+
+    @staticmethod
+    def _unpack(payload: str) -> Tuple[float, np.ndarray]:
+        data = json.loads(payload)
+        return data["e"], np.frombuffer(base64.b64decode(data["v"]), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Local embedding index
+    # ------------------------------------------------------------------
+
+    async def _sync_index(self, generation: int) -> None:
+        """Bring the local matrix in line with the generation's Redis hash (cheap when unchanged)."""
+        async with self._sync_lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._ids = []
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+            vectors_key = self._vectors_key(generation)
+            if await self._redis.hlen(vectors_key) == len(self._ids):
+                return
+
+            remote_ids = await self._redis.hkeys(vectors_key)
+            known = set(self._ids)
+            missing = [entry_id for entry_id in remote_ids if entry_id not in known]
+            payloads = await self._redis.hmget(vectors_key, missing) if missing else []
+
+            now = time.time()
+            remote = set(remote_ids)
+            keep = [i for i, entry_id in enumerate(self._ids) if entry_id in remote]
+            ids = [self._ids[i] for i in keep]
+            rows = [self._matrix[i] for i in keep]
+            expired = []
+            for entry_id, payload in zip(missing, payloads):
+                if not payload:
+                    continue
+                expires_at, vector = self._unpack(payload)
+                if expires_at <= now:
+                    expired.append(entry_id)
+                    continue
+                ids.append(entry_id)
+                rows.append(vector)
+            if expired:
+                await self._redis.hdel(vectors_key, *expired)
+
+            self._ids = ids
+            self._matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+
+    def _nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self._ids or self._matrix.shape[1] != vector.shape[0]:
+            return None, 0.0
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._ids[best], float(scores[best])
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def is_cacheable(self, message: str) -> bool:
+        """Only knowledge-base questions without session-specific details are shared."""
+        return route_query(message) == "kb" and not is_session_specific(message)
+
+    async def lookup(self, message: str) -> Optional[Dict[str, Any]]:
+        """Cached answer for ``message`` (exact normalized text first, then nearest embedding)."""
+        if self._redis is None or not self.is_cacheable(message):
+            self._record("ineligible")
+            return None
+
+        normalized = normalize_query(message)
+        try:
+            generation = await self._current_generation()
+            entry_id = self._entry_id(normalized)
+            cached = await self._redis.get(self._answer_key(generation, entry_id))
+            if cached:
+                self._record("exact_hits")
+                return {**json.loads(cached), "cache": "exact", "similarity": 1.0}
+
+            vector, _ = await asyncio.gather(self._embed(normalized), self._sync_index(generation))
+            entry_id, similarity = self._nearest(vector)
+            if entry_id is not None and similarity >= self.similarity_threshold:
+                cached = await self._redis.get(self._answer_key(generation, entry_id))
+                if cached:
+                    self._record("semantic_hits")
+                    return {**json.loads(cached), "cache": "semantic", "similarity": round(similarity, 4)}
+                # Answer expired; drop its embedding so the next sync forgets it
+                await self._redis.hdel(self._vectors_key(generation), entry_id)
+        except Exception as exc:
+            self._record("errors")
+            logger.warning("Semantic cache lookup failed: {error}", error=exc)
+            return None
+
+        self._record("misses")
+        return None
+
+    async def store(
+        self,
+        message: str,
+        content: str,
+        metadata: Dict[str, Any],
+        session_context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Cache a grounded KB answer unless it mentions the customer's own session data."""
+        if self._redis is None or not self.is_cacheable(message):
+            return False
+        session_values = [str((session_context or {}).get(field) or "").strip() for field in SESSION_FIELDS]
+        if not metadata.get("kb_context") or any(value and value in content for value in session_values):
+            self._record("store_skipped")
+            return False
+
+        normalized = normalize_query(message)
+        entry_id = self._entry_id(normalized)
+        try:
+            generation = await self._current_generation()
+            vectors_key = self._vectors_key(generation)
+            if await self._redis.hlen(vectors_key) >= self.max_entries:
+                self._record("store_skipped")
+                return False
+
+            vector = await self._embed(normalized)
+            payload = json.dumps({"content": content, "metadata": metadata, "query": message})
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.setex(self._answer_key(generation, entry_id), self.ttl, payload)
+            pipe.hset(vectors_key, entry_id, self._pack(vector, time.time() + self.ttl))
+            pipe.expire(vectors_key, self.ttl)
+            await pipe.execute()
+        except Exception as exc:
+            self._record("errors")
+            logger.warning("Semantic cache store failed: {error}", error=exc)
+            return False
+
+        self._record("stores")
+        return True
+
+    async def invalidate(self) -> int:
+        """Start a new cache generation on every replica; returns the new generation."""
+        if self._redis is None:
+            # Nothing is cached without Redis, so there is nothing to invalidate
+            return self._generation or 0
+        generation = int(await self._redis.incr(GENERATION_KEY))
+        self._record("invalidations")
+        logger.info("Semantic cache invalidated, generation={generation}", generation=generation)
+        return generation
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self._counts["exact_hits"] + self._counts["semantic_hits"]
+        lookups = hits + self._counts["misses"]
+        return {
+            **self._counts,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "generation": self._generation,
+            "indexed_questions": len(self._ids),
+            "similarity_threshold": self.similarity_threshold,
+            "ttl": self.ttl,
+        }
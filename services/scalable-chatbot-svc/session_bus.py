@@ -0,0 +1,225 @@
+"""Cross-replica session message bus for the scalable chatbot service.
+
+Every replica subscribes to a Redis pub/sub channel per chat session it hosts
+a WebSocket for. A message for a client or session that is not connected to
+this replica is published on the session's channel, and whichever replica
+holds the socket delivers it. Replicas also heartbeat their connection
+counts and hosted sessions into Redis so /stats can report cluster totals.
+"""
+
+import asyncio
+import json
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from redis_manager import RedisManager
+
+
+class SessionBus:
+    """Redis pub/sub fan-out keyed by session, plus per-node heartbeats."""
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        node_id: Optional[str] = None,
+        prefix: str = "chat",
+        heartbeat_interval: float = 10.0,
+    ) -> None:
+        self.redis_manager = redis_manager
+        self.node_id = node_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.prefix = prefix
+        self.heartbeat_interval = heartbeat_interval
+        self.manager = None
+        self._pubsub = None
+        self._tasks = []
+        self.counts = {"published": 0, "received": 0, "delivered": 0}
+
+    def attach(self, manager) -> None:
+        """Bind the ConnectionManager that owns this replica's sockets."""
+        self.manager = manager
+
+    @property
+    def _redis(self):
+        return self.redis_manager.redis_client
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}"
+
+    @property
+    def _nodes_key(self) -> str:
+        return f"{self.prefix}:nodes"
+
+    def _node_sessions_key(self, node_id: str) -> str:
+        return f"{self.prefix}:node:{node_id}:sessions"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._redis is None:
+            return
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe()
+                await self._pubsub.close()
+            except Exception as exc:
+                logger.warning("Session bus unsubscribe failed: {error}", error=exc)
+            self._pubsub = None
+        if self._redis is not None:
+            try:
+                await self._redis.hdel(self._nodes_key, self.node_id)
+                await self._redis.delete(self._node_sessions_key(self.node_id))
+            except Exception as exc:
+                logger.warning("Session bus deregistration failed: {error}", error=exc)
+
+    # ------------------------------------------------------------------
+    # Subscriptions and publishing
+    # ------------------------------------------------------------------
+
+    async def subscribe(self, session_id: str) -> None:
+        """Receive messages for ``session_id`` (called when a socket for it connects here)."""
+        if self._pubsub is None:
+            return
+        channel = self._channel(session_id)
+        if channel in self._pubsub.channels:
+            return
+        try:
+            await self._pubsub.subscribe(channel)
+        except Exception as exc:
+            logger.warning("Session bus subscribe failed for {session}: {error}", session=session_id, error=exc)
+
+    async def _reconcile_subscriptions(self) -> None:
+        """Unsubscribe from sessions that no longer have a socket on this replica."""
+        if self._pubsub is None or self.manager is None:
+            return
+        hosted = {self._channel(session_id) for session_id in self.manager.session_connections}
+        stale = [
+            channel.decode() if isinstance(channel, bytes) else channel
+            for channel in self._pubsub.channels
+        ]
+        stale = [channel for channel in stale if channel not in hosted]
+        if stale:
+            await self._pubsub.unsubscribe(*stale)
+
+    async def publish(self, session_id: str, message: str, client_id: Optional[str] = None) -> bool:
+        """Hand ``message`` to the replicas hosting ``session_id``; targets one client when given."""
+        if self._redis is None:
+            return False
+        envelope = json.dumps({"node": self.node_id, "client_id": client_id, "message": message})
+        try:
+            receivers = await self._redis.publish(self._channel(session_id), envelope)
+        except Exception as exc:
+            logger.warning("Session bus publish failed for {session}: {error}", session=session_id, error=exc)
+            return False
+        self.counts["published"] += 1
+        return bool(receivers)
+
+    async def _handle(self, raw: Dict[str, Any]) -> None:
+        channel = raw["channel"]
+        channel = channel.decode() if isinstance(channel, bytes) else channel
+        envelope = json.loads(raw["data"])
+        if envelope["node"] == self.node_id:
+            return
+        self.counts["received"] += 1
+        session_id = channel[len(self._channel("")):]
+        if await self.manager.deliver_local(envelope["message"], session_id, envelope.get("client_id")):
+            self.counts["delivered"] += 1
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                raw = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if raw is not None and self.manager is not None:
+                    await self._handle(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Session bus listener error: {error}", error=exc)
+                await asyncio.sleep(1.0)
+
+    # ------------------------------------------------------------------
+    # Cluster-wide statistics
+    # ------------------------------------------------------------------
+
+    async def heartbeat(self) -> None:
+        """Publish this replica's connection counts and hosted sessions."""
+        if self._redis is None or self.manager is None:
+            return
+        sessions = list(self.manager.session_connections)
+        stats = {
+            "connections": len(self.manager.active_connections),
+            "sessions": len(sessions),
+            "updated_at": time.time(),
+        }
+        sessions_key = self._node_sessions_key(self.node_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(self._nodes_key, self.node_id, json.dumps(stats))
+        pipe.delete(sessions_key)
+        if sessions:
+            pipe.sadd(sessions_key, *sessions)
+        pipe.expire(sessions_key, int(self.heartbeat_interval * 3))
+        await pipe.execute()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                await self._reconcile_subscriptions()
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Session bus heartbeat failed: {error}", error=exc)
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def cluster_stats(self) -> Dict[str, Any]:
+        """Connection and session totals over every replica with a recent heartbeat."""
+        if self._redis is None:
+            return {}
+        nodes = await self._redis.hgetall(self._nodes_key)
+        cutoff = time.time() - self.heartbeat_interval * 3
+        live, stale = {}, []
+        for node_id, payload in nodes.items():
+            stats = json.loads(payload)
+            if stats["updated_at"] >= cutoff:
+                live[node_id] = stats
+            else:
+                stale.append(node_id)
+        if stale:
+            await self._redis.hdel(self._nodes_key, *stale)
+
+        session_keys = [self._node_sessions_key(node_id) for node_id in live]
+        sessions = await self._redis.sunion(session_keys) if session_keys else set()
+        return {
+            "nodes": len(live),
+            "active_connections": sum(stats["connections"] for stats in live.values()),
+            # A session with sockets on several replicas is counted once
+            "active_sessions": len(sessions),
+            "per_node": live,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        channels = len(self._pubsub.channels) if self._pubsub is not None else 0
+        return {"node_id": self.node_id, "subscribed_sessions": channels, **self.counts}
@@ -12,14 +12,19 @@ from datetime import datetime
 from unittest.mock import Mock, patch, AsyncMock
 import sys
 import os
+import time
+from types import SimpleNamespace
 
 # Add the parent directory to the path so we can import the main module
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
 
-from main import app, manager, redis_manager, rate_limiter, llm_client
+from main import app, manager, redis_manager, rate_limiter, llm_client, generate_streaming_response
 from connection_manager import ConnectionManager
+from rate_limiter import RateLimit, RateLimiter
+from session_bus import SessionBus
+from semantic_cache import SemanticResponseCache, normalize_query
 from chatbot_toolkit import (
     fetch_flight_context, 
     fetch_policy_context, 
@@ -62,6 +67,25 @@ async def mock_llm_client():
     return mock_llm
 
 
+class FakeCompletionStream:
+    """Stands in for openai.AsyncStream: yields one delta every ``delay`` seconds, then usage."""
+
+    def __init__(self, tokens, delay=0.02, total_tokens=42):
+        self.tokens = tokens
+        self.delay = delay
+        self.total_tokens = total_tokens
+        self.closed = False
+
+    async def __aiter__(self):
+        for token in self.tokens:
+            await asyncio.sleep(self.delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=self.total_tokens))
+
+    async def close(self):
+        self.closed = True
+
+
 class TestChatbotService:
     """Test suite for the chatbot service"""
     
@@ -122,6 +146,42 @@ class TestWebSocketConnections(TestChatbotService):
         assert "connected_at" in metadata
         assert "last_activity" in metadata
 
+    @pytest.mark.asyncio
+    async def test_messages_reach_clients_on_other_replicas(self):
+        """Responses for a socket held by another replica are relayed over the session channel"""
+        buses = []
+
+        async def publish(channel, envelope):
+            # Stand-in for Redis pub/sub: deliver to every bus subscribed to the channel
+            subscribers = [bus for bus in buses if channel in bus._pubsub.channels]
+            for bus in subscribers:
+                await bus._handle({"channel": channel, "data": envelope})
+            return len(subscribers)
+
+        redis_client = Mock()
+        redis_client.publish = AsyncMock(side_effect=publish)
+        for node_id in ("node-1", "node-2"):
+            bus = SessionBus(Mock(redis_client=redis_client), node_id=node_id)
+            bus._pubsub = Mock(channels={})
+            bus._pubsub.subscribe = AsyncMock(side_effect=lambda channel, pubsub=bus._pubsub: pubsub.channels.update({channel: None}))
+            buses.append(bus)
+        replica_1, replica_2 = ConnectionManager(buses[0]), ConnectionManager(buses[1])
+
+        socket_a, socket_b, socket_c = AsyncMock(), AsyncMock(), AsyncMock()
+        await replica_1.connect(socket_a, "shared-session", "client-a")
+        await replica_2.connect(socket_b, "shared-session", "client-b")
+        await replica_2.connect(socket_c, "other-session", "client-c")
+
+        # e.g. a REST message handled by replica 1 for a client connected to replica 2
+        await replica_1.send_personal_message("for-b", "client-b", "shared-session")
+        socket_b.send_text.assert_called_once_with("for-b")
+        assert not socket_a.send_text.called
+
+        await replica_1.send_to_session("to-all", "shared-session")
+        socket_a.send_text.assert_called_once_with("to-all")
+        assert socket_b.send_text.call_count == 2
+        assert not socket_c.send_text.called
+
 
 class TestSessionManagement(TestChatbotService):
     """Test session management functionality"""
@@ -258,6 +318,92 @@ class TestCachingAndRateLimiting(TestChatbotService):
         # This should be rate limited
         assert await rate_limiter.is_rate_limited(key, limit=5, window=60)
 
+    @pytest.mark.asyncio
+    async def test_hierarchical_rate_limits(self):
+        """A request must fit every limit, and a rejected request consumes none of them"""
+        limiter = RateLimiter(Mock(redis_client=None))
+        shared_budget = RateLimit("global", limit=3, window=60)
+
+        assert await limiter.check(RateLimit("session:a", 2, 60), shared_budget) is None
+        assert await limiter.check(RateLimit("session:a", 2, 60), shared_budget) is None
+        exceeded, retry_after = await limiter.check(RateLimit("session:a", 2, 60), shared_budget)
+        assert exceeded.key == "session:a"
+        assert 0 < retry_after <= 60
+
+        # The rejected request above did not spend the shared budget
+        assert await limiter.check(RateLimit("session:b", 2, 60), shared_budget) is None
+        exceeded, _ = await limiter.check(RateLimit("session:c", 2, 60), shared_budget)
+        assert exceeded.key == "global"
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_uses_redis_script_and_falls_back(self):
+        """Limits are checked atomically in Redis, with local windows while Redis is down"""
+        script = AsyncMock(return_value=[0, 0])
+        redis_client = Mock()
+        redis_client.register_script = Mock(return_value=script)
+        limiter = RateLimiter(Mock(redis_client=redis_client))
+
+        assert await limiter.check(RateLimit("session:a", 2, 60), RateLimit("ip:10.0.0.1", 5, 30)) is None
+        assert script.call_args.kwargs["keys"] == ["ratelimit:session:a", "ratelimit:ip:10.0.0.1"]
+        assert script.call_args.kwargs["args"][1:] == [2, 60000, 5, 30000]
+
+        script.return_value = [2, 1500]
+        exceeded, retry_after = await limiter.check(RateLimit("session:a", 2, 60), RateLimit("ip:10.0.0.1", 5, 30))
+        assert exceeded.key == "ip:10.0.0.1"
+        assert retry_after == 1.5
+
+        script.side_effect = ConnectionError("redis down")
+        assert not await limiter.is_rate_limited("session:a", limit=1, window=60)
+        assert await limiter.is_rate_limited("session:a", limit=1, window=60)
+        assert limiter.stats()["backend"] == "local"
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_eligibility(self):
+        """Only KB questions without flight/PNR/contact details are shared across sessions"""
+        cache = SemanticResponseCache(Mock(redis_client=None), Mock())
+
+        assert normalize_query("  What's the BAGGAGE allowance?? ") == normalize_query("what s the baggage allowance")
+        assert cache.is_cacheable("What is the baggage allowance?")
+        assert not cache.is_cacheable("Baggage allowance on NZ123?")
+        assert not cache.is_cacheable("Baggage allowance for booking X7K2PQ")
+        assert not cache.is_cacheable("Which gate does my flight board from?")
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_invalidate_without_redis(self):
+        """Invalidation is a no-op returning the current generation when Redis is unavailable"""
+        cache = SemanticResponseCache(Mock(redis_client=None), Mock())
+
+        assert await cache.invalidate() == 0
+        assert cache.stats()["invalidations"] == 0
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_exact_hit_across_sessions(self):
+        """An answer stored from one session is served to another without embedding the question"""
+        stored = {}
+        redis_client = AsyncMock()
+        redis_client.get.side_effect = lambda key: stored.get(key, "3" if key == "semcache:generation" else None)
+        redis_client.hlen.return_value = 0
+        pipe = Mock()
+        pipe.setex.side_effect = lambda key, ttl, value: stored.__setitem__(key, value)
+        pipe.execute = AsyncMock()
+        redis_client.pipeline = Mock(return_value=pipe)
+        embeddings = Mock()
+        embeddings.embed_async = AsyncMock(return_value=[0.6, 0.8])
+        cache = SemanticResponseCache(Mock(redis_client=redis_client), embeddings)
+
+        metadata = {"kb_context": [{"source": "baggage.md"}], "sources": ["baggage.md"]}
+        assert await cache.store("What is the baggage allowance?", "23kg checked [1]", metadata, {"customer_name": "Ana"})
+        # Answers that echo the customer's session data are never shared
+        assert not await cache.store("What is the pet policy?", "Ana, pets travel in the hold", metadata, {"customer_name": "Ana"})
+
+        embeddings.embed_async.reset_mock()
+        hit = await cache.lookup("what is the baggage allowance")
+        assert hit["content"] == "23kg checked [1]"
+        assert hit["cache"] == "exact"
+        assert not embeddings.embed_async.called
+        assert cache.stats()["exact_hits"] == 1
+        assert cache.stats()["hit_rate"] == 1.0
+
 
 class TestContextManagement(TestChatbotService):
     """Test context management functionality"""
@@ -619,5 +765,89 @@ class TestPerformance(TestChatbotService):
         assert len(sanitized_messages) == 100
 
 
+    @pytest.mark.asyncio
+    async def test_stream_time_to_first_token(self):
+        """chat_completion_stream yields the first delta without waiting for the full completion"""
+        tokens = ["Your ", "flight ", "NZ123 ", "is ", "on ", "time ", "today ", "at ", "gate ", "5."]
+        fake_stream = FakeCompletionStream(tokens)
+        result = {}
+
+        with patch.object(llm_client.client.chat.completions, "create", AsyncMock(return_value=fake_stream)) as create, \
+             patch.object(llm_client.tracking_sink, "submit") as submit:
+            start = time.perf_counter()
+            first_token_at = None
+            received = []
+            async for delta in llm_client.chat_completion_stream(
+                messages=[{"role": "user", "content": "Is NZ123 on time?"}],
+                function_name="test_stream",
+                result=result
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - start
+                    # Tracking happens once, after the stream completes
+                    assert not submit.called
+                received.append(delta)
+            total = time.perf_counter() - start
+
+        assert "".join(received) == "".join(tokens)
+        assert create.call_args.kwargs["stream"] is True
+        assert fake_stream.closed
+        assert first_token_at < total / 3
+        assert result["content"] == "".join(tokens)
+        assert result["tokens_used"] == 42
+        assert 0 < result["time_to_first_token_ms"] < result["duration_ms"]
+        submit.assert_called_once()
+        assert submit.call_args.args[0]["metadata"]["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_is_tracked_as_cancelled(self):
+        """A consumer that stops iterating early records a partial, cancelled call rather than an error"""
+        fake_stream = FakeCompletionStream(["Your ", "flight ", "is ", "on ", "time."])
+        result = {}
+
+        with patch.object(llm_client.client.chat.completions, "create", AsyncMock(return_value=fake_stream)), \
+             patch.object(llm_client.tracking_sink, "submit") as submit:
+            stream = llm_client.chat_completion_stream(
+                messages=[{"role": "user", "content": "Is NZ123 on time?"}],
+                function_name="test_stream",
+                result=result
+            )
+            async for delta in stream:
+                break
+            await stream.aclose()
+
+        assert fake_stream.closed
+        assert result["content"] == "Your "
+        submit.assert_called_once()
+        tracked = submit.call_args.args[0]
+        assert tracked["metadata"]["cancelled"] is True
+        assert "error" not in tracked["metadata"]
+
+    @pytest.mark.asyncio
+    async def test_websocket_receives_first_chunk_before_completion(self):
+        """generate_streaming_response forwards model deltas to the client as they arrive"""
+        tokens = [f"word{i} " for i in range(20)]
+        sent = []
+        start = time.perf_counter()
+
+        async def record(message, client_id, session_id=None):
+            sent.append((time.perf_counter() - start, json.loads(message)))
+
+        with patch.object(llm_client.client.chat.completions, "create", AsyncMock(return_value=FakeCompletionStream(tokens))), \
+             patch.object(llm_client.tracking_sink, "submit"), \
+             patch.object(manager, "send_personal_message", side_effect=record), \
+             patch("main.redis_manager", AsyncMock()):
+            await generate_streaming_response("stream-session", "hello there", {}, "stream-client")
+
+        chunks = [(at, message) for at, message in sent if message["type"] == "chunk"]
+        complete_at, complete = sent[-1]
+        assert complete["type"] == "complete"
+        # Thinking indicator followed by one chunk per model delta
+        assert [message["content"] for _, message in chunks[1:]] == tokens
+        assert chunks[1][0] < complete_at / 4
+        assert complete["metadata"]["time_to_first_token_ms"] is not None
+        assert complete["metadata"]["tokens_used"] == 42
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,5 +1,6 @@
 from .base_service import BaseService
+from .embedding_client import EmbeddingClient
 from .llm_client import LLMClient, create_llm_client
 from .llm_tracker import LLMTracker, track_openai_call
 
-__all__ = ["BaseService", "LLMClient", "create_llm_client", "LLMTracker", "track_openai_call"]
+__all__ = ["BaseService", "EmbeddingClient", "LLMClient", "create_llm_client", "LLMTracker", "track_openai_call"]
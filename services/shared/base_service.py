@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, Counter, Histogram
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, Counter, Gauge, Histogram
 import os
 import logging
 from typing import Optional
@@ -16,6 +16,61 @@ LATENCY = Histogram(
     "Request latency",
     ["service", "path", "method"],
 )
+EMBEDDING_CACHE = Counter(
+    "embedding_cache_requests_total",
+    "Embedding cache lookups by tier and result",
+    ["service", "tier", "result"],
+)
+RESPONSE_CACHE = Counter(
+    "response_cache_requests_total",
+    "Chatbot semantic response cache outcomes (hits, misses, stores, invalidations)",
+    ["service", "result"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_latency_seconds",
+    "Whitelisted intent query latency by source (result cache, database or batched database query)",
+    ["service", "intent", "source"],
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_latency_seconds",
+    "Latency of calls to upstream services",
+    ["service", "upstream", "method"],
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_request_errors_total",
+    "Failed calls to upstream services by reason",
+    ["service", "upstream", "reason"],
+)
+UPSTREAM_CIRCUIT_OPEN = Gauge(
+    "upstream_circuit_open",
+    "1 while the circuit breaker for an upstream is open or half-open",
+    ["service", "upstream"],
+)
+TOOL_LATENCY = Histogram(
+    "tool_call_latency_seconds",
+    "Latency of agent tool calls",
+    ["service", "tool"],
+)
+TOOL_DEDUPLICATED = Counter(
+    "tool_calls_deduplicated_total",
+    "Tool calls served from an identical in-flight or completed call in the same request",
+    ["service", "tool"],
+)
+LLM_TRACKING_QUEUED = Gauge(
+    "llm_tracking_queue_depth",
+    "LLM tracking messages waiting to be sent to the gateway",
+    ["service"],
+)
+LLM_TRACKING_DROPPED = Counter(
+    "llm_tracking_dropped_total",
+    "LLM tracking messages dropped by reason (backpressure or failed send)",
+    ["service", "reason"],
+)
+LLM_TRACKING_BATCHES = Counter(
+    "llm_tracking_batches_total",
+    "LLM tracking batches posted to the gateway by outcome",
+    ["service", "outcome"],
+)
 
 ENV_KEYS_TO_LOG = [
     "DB_HOST",
@@ -41,6 +96,7 @@ class BaseService:
         self._setup_routes()
         self.request_count = REQUEST_COUNT
         self.latency_histogram = LATENCY
+        self.embedding_cache_counter = EMBEDDING_CACHE
     
     def _setup_cors(self):
         """Setup CORS middleware for all services"""
@@ -0,0 +1,228 @@
+"""
+Shared embedding client for AeroOps services.
+Wraps the OpenAI embeddings API with a reused client, retry with backoff and a
+two-tier cache: an in-process LRU keyed by (model, normalized text) and an
+optional Redis tier with TTL shared across replicas.
+"""
+
+import asyncio
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from openai import OpenAI
+import openai
+
+try:
+    from .base_service import EMBEDDING_CACHE
+except ImportError:  # pragma: no cover - fallback for path-based imports
+    from base_service import EMBEDDING_CACHE
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is an optional dependency
+    redis = None
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: casefold and collapse whitespace."""
+    return " ".join((text or "").casefold().split())
+
+
+class EmbeddingClient:
+    """Embedding client with LRU + optional Redis caching and Prometheus counters."""
+
+    def __init__(
+        self,
+        service_name: str,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        redis_ttl: Optional[int] = None,
+        max_retries: int = 3,
+    ):
+        """
+        Initialize the embedding client.
+
+        Args:
+            service_name: Name of the service using this client (metrics label)
+            api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+            model: Embedding model (defaults to EMBEDDINGS_MODEL env var)
+            cache_size: In-process LRU entries (EMBEDDING_CACHE_SIZE, 0 disables)
+            redis_url: Redis URL for the shared tier (EMBEDDING_CACHE_REDIS_URL, unset disables)
+            redis_ttl: Redis entry TTL in seconds (EMBEDDING_CACHE_TTL)
+            max_retries: Retries for transient API errors, with exponential backoff
+        """
+        self.service_name = service_name
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model = model or os.getenv("EMBEDDINGS_MODEL", "text-embedding-3-small")
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+        self.redis_ttl = redis_ttl if redis_ttl is not None else int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+        self.max_retries = max_retries
+
+        self._client: Optional[OpenAI] = None
+        self._lru: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._redis = None
+        redis_url = redis_url or os.getenv("EMBEDDING_CACHE_REDIS_URL")
+        if redis_url:
+            if redis is None:
+                logger.warning("EMBEDDING_CACHE_REDIS_URL is set but the redis package is not installed")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            # Retries are handled here so backoff is not compounded by the SDK's own
+            self._client = OpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    # ------------------------------------------------------------------
+    # Cache tiers
+    # ------------------------------------------------------------------
+
+    def _record(self, tier: str, result: str, count: int = 1) -> None:
+        if count:
+            EMBEDDING_CACHE.labels(self.service_name, tier, result).inc(count)
+
+    def _redis_key(self, key: Tuple[str, str]) -> str:
+        digest = hashlib.sha256(key[1].encode("utf-8")).hexdigest()
+        return f"embedding:{key[0]}:{digest}"
+
+    def _lru_get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        if not self.cache_size:
+            return None
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: Tuple[str, str], vector: List[float]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.cache_size:
+                self._lru.popitem(last=False)
+
+    def _redis_get_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[float]]:
+        if self._redis is None or not keys:
+            return {}
+        try:
+            payloads = self._redis.mget([self._redis_key(key) for key in keys])
+        except Exception as exc:
+            logger.warning("Embedding cache Redis read failed: {error}", error=exc)
+            return {}
+        found: Dict[Tuple[str, str], List[float]] = {}
+        for key, payload in zip(keys, payloads):
+            if payload:
+                found[key] = list(struct.unpack(f"<{len(payload) // 4}f", payload))
+        return found
+
+    def _redis_put_many(self, items: Dict[Tuple[str, str], List[float]]) -> None:
+        if self._redis is None or not items:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for key, vector in items.items():
+                pipe.setex(self._redis_key(key), self.redis_ttl, struct.pack(f"<{len(vector)}f", *vector))
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("Embedding cache Redis write failed: {error}", error=exc)
+
+    def cache_info(self) -> Dict[str, object]:
+        with self._lock:
+            size = len(self._lru)
+        return {
+            "model": self.model,
+            "lru_size": size,
+            "lru_capacity": self.cache_size,
+            "redis_enabled": self._redis is not None,
+        }
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    # ------------------------------------------------------------------
+    # Embedding API
+    # ------------------------------------------------------------------
+
+    def _create(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = self.client.embeddings.create(input=texts, model=self.model)
+                return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+            except RETRYABLE_ERRORS as exc:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(
+                    "Embedding request for {count} texts failed ({error}); retrying in {delay}s",
+                    count=len(texts),
+                    error=exc,
+                    delay=delay,
+                )
+                time.sleep(delay)
+        return []  # pragma: no cover - loop always returns or raises
+
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` in one API call, serving repeats from the cache tiers."""
+        keys = [(self.model, normalize_text(text)) for text in texts]
+        vectors: Dict[Tuple[str, str], List[float]] = {}
+
+        for key in keys:
+            if key not in vectors:
+                vector = self._lru_get(key)
+                if vector is not None:
+                    vectors[key] = vector
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        self._record("memory", "hit", len(vectors))
+        self._record("memory", "miss", len(pending))
+
+        if pending and self._redis is not None:
+            found = self._redis_get_many(pending)
+            for key, vector in found.items():
+                vectors[key] = vector
+                self._lru_put(key, vector)
+            self._record("redis", "hit", len(found))
+            self._record("redis", "miss", len(pending) - len(found))
+            pending = [key for key in pending if key not in found]
+
+        if pending:
+            first_text = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            created = self._create([first_text[key] for key in pending])
+            fresh = dict(zip(pending, created))
+            for key, vector in fresh.items():
+                vectors[key] = vector
+                self._lru_put(key, vector)
+            self._redis_put_many(fresh)
+
+        return [vectors[key] for key in keys]
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text (e.g. a search query)."""
+        return self.embed_many([text])[0]
+
+    async def embed_async(self, text: str) -> List[float]:
+        """Embed a single text without blocking the event loop."""
+        return await asyncio.to_thread(self.embed, text)
@@ -7,15 +7,16 @@ import asyncio
 import json
 import os
 import time
-from typing import Any, Dict, List, Optional, Union, Awaitable
+from typing import Any, AsyncIterator, Dict, List, Optional, Union, Awaitable
 
-import requests
 from loguru import logger
 from openai import AsyncOpenAI
 try:
     from .llm_tracker import LLMTracker
+    from .tracking_sink import get_tracking_sink
 except ImportError:  # pragma: no cover - fallback for path-based imports
     from llm_tracker import LLMTracker
+    from tracking_sink import get_tracking_sink
 
 
 class LLMClient:
@@ -39,6 +40,13 @@ class LLMClient:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
         
         self.client = AsyncOpenAI(api_key=self.api_key)
+        self.tracking_sink = get_tracking_sink(
+            self.gateway_url,
+            service_name,
+            batch_size=int(os.getenv("LLM_TRACKING_BATCH_SIZE", "50")),
+            flush_interval=float(os.getenv("LLM_TRACKING_FLUSH_INTERVAL", "0.5")),
+            max_queue=int(os.getenv("LLM_TRACKING_QUEUE_SIZE", "1000")),
+        )
 
     def _extract_prompt(self, messages: List[Dict[str, str]]) -> str:
         """Return the first user message content for tracking."""
@@ -101,25 +109,8 @@ class LLMClient:
         return llm_message
     
     async def _send_message_to_gateway(self, message: Dict[str, Any]) -> None:
-        """Send a tracked LLM message to the gateway API without blocking the event loop."""
-
-        def _post_message() -> None:
-            try:
-                response = requests.post(
-                    f"{self.gateway_url}/llm/track",
-                    json=message,
-                    timeout=5
-                )
-                if response.status_code != 200:
-                    logger.warning(
-                        "LLM tracking post returned status {status}",
-                        status=response.status_code
-                    )
-            except Exception as exc:  # pragma: no cover - defensive path
-                # Don't fail the main operation if tracking fails
-                logger.warning("Failed to send LLM message to gateway: {error}", error=exc)
-
-        await asyncio.to_thread(_post_message)
+        """Queue a tracked LLM message for the gateway; batches are posted in the background."""
+        self.tracking_sink.submit(message)
     
     async def chat_completion_async(
         self,
@@ -227,6 +218,144 @@ class LLMClient:
             # Re-raise the exception
             raise e
     
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        function_name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        result: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as the model produces them.
+
+        The call is tracked once the stream finishes (or fails / is abandoned).
+        A stream the caller stops consuming early is tracked as cancelled with
+        the partial content, not as an error.
+        When ``result`` is given it is filled with the same keys as
+        ``chat_completion_async`` plus ``time_to_first_token_ms``.
+        """
+        start_time = time.time()
+        model = model or self.model
+        prompt = self._extract_prompt(messages)
+        result = result if result is not None else {}
+
+        logger.info(
+            "chat_completion_stream begin service={} model={} temperature={} max_tokens={}",
+            self.service_name,
+            model,
+            temperature,
+            max_tokens
+        )
+
+        parts: List[str] = []
+        tokens_used: Optional[int] = None
+        first_token_ms: Optional[float] = None
+        error: Optional[BaseException] = None
+        cancelled = False
+        stream = None
+        try:
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs
+            )
+            async for chunk in stream:
+                # The final chunk carries usage and no choices
+                tokens_used = self._extract_tokens(chunk) or tokens_used
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = (time.time() - start_time) * 1000
+                parts.append(delta)
+                yield delta
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer closed the stream or its task was cancelled
+            cancelled = True
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if stream is not None:
+                await stream.close()
+
+            content = "".join(parts)
+            duration_ms = (time.time() - start_time) * 1000
+            if error is None:
+                tracking_metadata = self._merge_metadata(
+                    metadata,
+                    function=function_name,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    time_to_first_token_ms=first_token_ms,
+                    **({"cancelled": True, "partial": True} if cancelled else {})
+                )
+                response_text = content
+            else:
+                tracking_metadata = self._merge_metadata(
+                    metadata,
+                    function=function_name,
+                    stream=True,
+                    error=True,
+                    error_type=type(error).__name__,
+                    error_message=str(error)
+                )
+                response_text = f"Error: {error}"
+
+            llm_message = await self._track_and_send(
+                prompt=prompt,
+                response_text=response_text,
+                model=model,
+                duration_ms=duration_ms,
+                metadata=tracking_metadata,
+                tokens_used=tokens_used
+            )
+            result.update({
+                "content": content,
+                "llm_message": llm_message,
+                "tokens_used": tokens_used,
+                "duration_ms": duration_ms,
+                "time_to_first_token_ms": first_token_ms
+            })
+
+            if cancelled:
+                logger.info(
+                    "chat_completion_stream cancelled service={} model={} chars={} duration_ms={:.2f}",
+                    self.service_name,
+                    model,
+                    len(content),
+                    duration_ms
+                )
+            elif error is None:
+                logger.info(
+                    "chat_completion_stream success service={} model={} tokens_used={} duration_ms={:.2f}",
+                    self.service_name,
+                    model,
+                    tokens_used,
+                    duration_ms
+                )
+            else:
+                logger.warning(
+                    "chat_completion_stream error service={} model={} duration_ms={:.2f} error={}",
+                    self.service_name,
+                    model,
+                    duration_ms,
+                    error
+                )
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
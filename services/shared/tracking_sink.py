@@ -0,0 +1,149 @@
+"""
+Background LLM tracking sink for AeroOps services.
+Tracked LLM messages are put on a bounded in-memory queue and posted to the
+gateway's /llm/track/batch endpoint in batches by a single worker thread, so
+an LLM call never waits on (or spends a thread on) its tracking request.
+When the queue is full the oldest message is dropped; pending messages are
+flushed at interpreter exit.
+"""
+
+import atexit
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+try:
+    from .base_service import LLM_TRACKING_BATCHES, LLM_TRACKING_DROPPED, LLM_TRACKING_QUEUED
+except ImportError:  # pragma: no cover - fallback for path-based imports
+    from base_service import LLM_TRACKING_BATCHES, LLM_TRACKING_DROPPED, LLM_TRACKING_QUEUED
+
+
+class TrackingSink:
+    """Bounded, batching, drop-oldest queue of tracked LLM messages for one gateway."""
+
+    def __init__(
+        self,
+        gateway_url: str,
+        service_name: str = "unknown",
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_queue: int = 1000,
+        timeout: float = 5.0,
+    ):
+        self.url = f"{gateway_url.rstrip('/')}/llm/track/batch"
+        self.service_name = service_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max(1, max_queue))
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._client: Optional[httpx.Client] = None
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0
+
+    def submit(self, message: Dict[str, Any]) -> None:
+        """Queue ``message`` without blocking; evicts the oldest message when full."""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+                LLM_TRACKING_DROPPED.labels(self.service_name, "backpressure").inc()
+            self._queue.append(message)
+            LLM_TRACKING_QUEUED.labels(self.service_name).set(len(self._queue))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="llm-tracking-sink", daemon=True)
+                self._worker.start()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            LLM_TRACKING_QUEUED.labels(self.service_name).set(len(self._queue))
+            return batch
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+        try:
+            response = self._client.post(self.url, json={"messages": batch})
+            response.raise_for_status()
+            self.sent += len(batch)
+            LLM_TRACKING_BATCHES.labels(self.service_name, "success").inc()
+        except Exception as exc:
+            # Tracking is best-effort; never let it affect the LLM call path
+            self.dropped += len(batch)
+            LLM_TRACKING_DROPPED.labels(self.service_name, "send_failed").inc(len(batch))
+            LLM_TRACKING_BATCHES.labels(self.service_name, "error").inc()
+            logger.warning("Failed to send {count} LLM messages to gateway: {error}", count=len(batch), error=exc)
+
+    def _drain(self) -> None:
+        with self._send_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                self._send(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._queue) < self.batch_size:
+                    # Wake early once a full batch is queued, otherwise send what we have
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self._drain()
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Send everything queued so far from the calling thread."""
+        self._drain()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting messages and flush what is pending (called at exit)."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        self._drain()
+        if self._client is not None:
+            self._client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = len(self._queue)
+        return {"queued": queued, "sent": self.sent, "dropped": self.dropped}
+
+
+_sinks: Dict[str, TrackingSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_tracking_sink(gateway_url: str, service_name: str, **options: Any) -> TrackingSink:
+    """Process-wide sink per gateway URL, shared by every LLMClient in the service."""
+    with _sinks_lock:
+        sink = _sinks.get(gateway_url)
+        if sink is None:
+            sink = TrackingSink(gateway_url, service_name, **options)
+            _sinks[gateway_url] = sink
+        return sink
+
+
+@atexit.register
+def _close_sinks() -> None:
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.close()
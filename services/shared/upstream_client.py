@@ -0,0 +1,173 @@
+"""
+Pooled service-to-service HTTP client for AeroOps services.
+One long-lived httpx.AsyncClient per upstream with keep-alive, connection
+limits, a per-upstream timeout, a circuit breaker and Prometheus metrics.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from loguru import logger
+
+try:
+    from .base_service import UPSTREAM_CIRCUIT_OPEN, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+except ImportError:  # pragma: no cover - fallback for path-based imports
+    from base_service import UPSTREAM_CIRCUIT_OPEN, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+
+class CircuitOpenError(HTTPException):
+    """Raised without contacting the upstream while its circuit is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"Upstream {upstream} is unavailable (circuit open, retry in {retry_after:.0f}s)",
+            headers={"Retry-After": str(max(1, int(retry_after)))},
+        )
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Let another half-open trial through when the last one was inconclusive."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class UpstreamClient:
+    """Long-lived HTTP client for one upstream service."""
+
+    def __init__(
+        self,
+        service_name: str,
+        name: str,
+        base_url: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.service_name = service_name
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    def _set_circuit_gauge(self) -> None:
+        UPSTREAM_CIRCUIT_OPEN.labels(self.service_name, self.name).set(
+            0 if self.breaker.state == "closed" else 1
+        )
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a request; 5xx responses and transport errors count as failures."""
+        if not self.breaker.allow_request():
+            UPSTREAM_ERRORS.labels(self.service_name, self.name, "circuit_open").inc()
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.TimeoutException:
+            self._failed("timeout")
+            raise
+        except httpx.TransportError:
+            self._failed("transport")
+            raise
+        except BaseException:
+            # Cancellation or a programming error says nothing about upstream health
+            self.breaker.release_trial()
+            raise
+        finally:
+            UPSTREAM_LATENCY.labels(self.service_name, self.name, method).observe(
+                time.perf_counter() - start
+            )
+
+        if response.status_code >= 500:
+            self._failed(f"http_{response.status_code}")
+        else:
+            self.breaker.record_success()
+            self._set_circuit_gauge()
+        return response
+
+    def _failed(self, reason: str) -> None:
+        UPSTREAM_ERRORS.labels(self.service_name, self.name, reason).inc()
+        was_closed = self.breaker.state == "closed"
+        self.breaker.record_failure()
+        self._set_circuit_gauge()
+        if was_closed and self.breaker.state != "closed":
+            logger.warning(
+                "Circuit opened for upstream {name} after {failures} failures",
+                name=self.name,
+                failures=self.breaker.failures,
+            )
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_after_s": round(self.breaker.retry_after(), 1),
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
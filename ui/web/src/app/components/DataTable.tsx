@@ -162,7 +162,8 @@ export default function DataTable({
 
     if (column.type === 'vector') {
       const isArray = Array.isArray(value)
-      const dimensions = isArray ? value.length : 0
+      // Listings may send only the vector size (embedding_dims) instead of the vector itself
+      const dimensions = isArray ? value.length : (row[`${column.key}_dims`] ?? 0)
       const hasData = isArray && dimensions > 0
       
       return (
@@ -186,7 +187,7 @@ export default function DataTable({
               </code>
             </div>
           )}
-          {!hasData && (
+          {dimensions === 0 && (
             <span className="text-xs text-gray-400 italic">No embedding data</span>
           )}
         </div>
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { 
   MessageSquare, 
   ChevronDown, 
@@ -26,6 +26,7 @@ export default function LLMMessageDisplay({ className = '' }: LLMMessageDisplayP
   const [copiedId, setCopiedId] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
   const [llmApi] = useState(() => new LLMApi())
+  const cursorRef = useRef<number | null>(null)
 
   // Load messages from API on mount
   useEffect(() => {
@@ -53,10 +54,18 @@ export default function LLMMessageDisplay({ className = '' }: LLMMessageDisplayP
     try {
       console.log('Loading LLM messages...')
       console.log('API URL:', process.env.NEXT_PUBLIC_GATEWAY_URL || 'http://localhost:8080')
-      const response = await llmApi.getMessages(50)
-      console.log('LLM messages response:', response)
-      console.log('Messages count:', response.messages?.length || 0)
-      setMessages(response.messages)
+      if (cursorRef.current === null) {
+        const response = await llmApi.getMessages(50)
+        console.log('Messages count:', response.messages?.length || 0)
+        setMessages(response.messages)
+        cursorRef.current = response.cursor
+      } else {
+        // Only fetch what was tracked since the last load
+        const response = await llmApi.getMessagesSince(cursorRef.current, 50)
+        const newest = [...response.messages].reverse()
+        setMessages(prev => [...newest, ...prev].slice(0, 50))
+        cursorRef.current = response.cursor
+      }
     } catch (error) {
       console.error('Failed to load LLM messages:', error)
       console.error('Error details:', error)
@@ -82,6 +91,7 @@ export default function LLMMessageDisplay({ className = '' }: LLMMessageDisplayP
     try {
       await llmApi.clearMessages()
       setMessages([])
+      cursorRef.current = null
       toast.success('Messages cleared')
     } catch (error) {
       console.error('Failed to clear messages:', error)
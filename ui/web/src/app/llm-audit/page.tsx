@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { LLMApi, LLMMessage } from '../services/llmApi';
 
 interface LLMAuditPageProps {}
@@ -16,6 +16,7 @@ export default function LLMAuditPage({}: LLMAuditPageProps) {
   const [sortOrder, setSortOrder] = useState<'asc' | 'desc'>('desc');
 
   const llmApi = new LLMApi();
+  const cursorRef = useRef<number | null>(null);
 
   // Get unique services from messages
   const services = Array.from(new Set(messages.map(msg => msg.service)));
@@ -48,10 +49,19 @@ export default function LLMAuditPage({}: LLMAuditPageProps) {
 
   const loadMessages = async () => {
     try {
-      setLoading(true);
       setError(null);
-      const response = await llmApi.getMessages(1000); // Get more messages for audit trail
-      setMessages(response.messages);
+      if (cursorRef.current === null) {
+        setLoading(true);
+        const response = await llmApi.getMessages(1000); // Get more messages for audit trail
+        setMessages(response.messages);
+        cursorRef.current = response.cursor;
+      } else {
+        // Refresh incrementally: only messages tracked since the last load
+        const response = await llmApi.getMessagesSince(cursorRef.current, 1000);
+        const newest = [...response.messages].reverse();
+        setMessages(prev => [...newest, ...prev].slice(0, 1000));
+        cursorRef.current = response.cursor;
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load messages');
     } finally {
@@ -63,6 +73,7 @@ export default function LLMAuditPage({}: LLMAuditPageProps) {
     try {
       await llmApi.clearMessages();
       setMessages([]);
+      cursorRef.current = null;
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to clear messages');
     }
@@ -45,7 +45,15 @@ export interface Policy {
   title: string
   content: string
   meta: any
-  embedding?: number[]
+  embedding?: number[] | string
+  embedding_dims?: number | null
+}
+
+export interface PolicyPage {
+  items: Policy[]
+  count: number
+  next_after_id: number | null
+  embedding_format: 'base64' | 'list' | null
 }
 
 // Generic API functions
@@ -127,7 +135,18 @@ export const aircraftStatusApi = {
 
 // Policies API
 export const policiesApi = {
-  getAll: (): Promise<Policy[]> => apiRequest('/data/policies'),
+  // Pages through policies by keyset cursor; vectors are left out, only their dims are returned
+  getAll: async (): Promise<Policy[]> => {
+    const policies: Policy[] = []
+    let afterId: number | null = null
+    do {
+      const cursor: string = afterId === null ? '' : `&after_id=${afterId}`
+      const page: PolicyPage = await apiRequest(`/data/policies?limit=500${cursor}`)
+      policies.push(...page.items)
+      afterId = page.next_after_id
+    } while (afterId !== null)
+    return policies
+  },
   getById: (id: string): Promise<Policy> => apiRequest(`/data/policies/${id}`),
   create: (data: Omit<Policy, 'id'>): Promise<Policy> => 
     apiRequest('/data/policies', { method: 'POST', body: JSON.stringify(data) }),
@@ -6,6 +6,7 @@ const GATEWAY_URL = process.env.NEXT_PUBLIC_GATEWAY_URL || 'http://localhost:808
 
 export interface LLMMessage {
   id: string
+  seq?: number
   timestamp: string
   service: string
   prompt: string
@@ -19,6 +20,7 @@ export interface LLMMessage {
 export interface LLMMessagesResponse {
   messages: LLMMessage[]
   total: number
+  cursor: number
 }
 
 export class LLMApi {
@@ -41,6 +43,26 @@ export class LLMApi {
     return response.json()
   }
 
+  /**
+   * Fetch only messages tracked after `cursor` (oldest first); pass the returned cursor to the next call
+   */
+  async getMessagesSince(cursor: number, limit: number = 50, service?: string): Promise<LLMMessagesResponse> {
+    const params = new URLSearchParams()
+    params.append('after', cursor.toString())
+    params.append('limit', limit.toString())
+    if (service) {
+      params.append('service', service)
+    }
+
+    const response = await fetch(`${GATEWAY_URL}/llm/messages?${params}`)
+
+    if (!response.ok) {
+      throw new Error(`Failed to fetch LLM messages: ${response.statusText}`)
+    }
+
+    return response.json()
+  }
+
   /**
    * Track a new LLM message
    */